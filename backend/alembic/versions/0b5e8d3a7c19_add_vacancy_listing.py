@@ -0,0 +1,108 @@
+"""Add vacancy listing read model
+
+Revision ID: 0b5e8d3a7c19
+Revises: f3a9c7e1d254
+Create Date: 2026-10-19 01:47:13.260584
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e8d3a7c19'
+down_revision: Union[str, None] = 'f3a9c7e1d254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_DELETE_CLEANUP = """
+    CREATE OR REPLACE FUNCTION vacancy_delete_cleanup() RETURNS trigger AS $$
+    BEGIN
+        -- rows moved to another partition are deleted and inserted back;
+        -- the partition maintenance moves them before attaching the target
+        IF current_setting('vacancy.moving_rows', true) = 'on'
+           OR EXISTS (SELECT 1 FROM "Vacancy" WHERE id = OLD.id) THEN
+            RETURN NULL;
+        END IF;
+        DELETE FROM "VacancySignature" WHERE vacancy_id = OLD.id;
+        DELETE FROM "VacancyLshBand" WHERE vacancy_id = OLD.id;
+        DELETE FROM "BackfillTask" WHERE vacancy_id = OLD.id;
+        DELETE FROM "Vacancy_EmploymentType" WHERE vacancy_id = OLD.id;
+        DELETE FROM "User_Favorite_Vacancies" WHERE vacancy_id = OLD.id;
+        DELETE FROM "VacancyKey" WHERE vacancy_id = OLD.id;
+        UPDATE "Vacancy" SET canonical_id = NULL WHERE canonical_id = OLD.id;
+        {listing}
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+# the listing rows of a deleted vacancy go with it
+_LISTING_CLEANUP = """
+        DELETE FROM "VacancyListing" WHERE id = OLD.id;
+        UPDATE "VacancyListing" SET canonical_id = NULL
+        WHERE canonical_id = OLD.id;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'VacancyListing',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('published_at', sa.TIMESTAMP(timezone=True),
+                  nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('company', sa.String(length=255), nullable=True),
+        sa.Column('location', sa.String(length=100), nullable=True),
+        sa.Column('salary_type', sa.String(length=50), nullable=True),
+        sa.Column('salary_currency', sa.String(length=50), nullable=True),
+        sa.Column('salary_value', sa.Numeric(precision=10, scale=2),
+                  nullable=True),
+        sa.Column('salary_period', sa.String(length=20), nullable=True),
+        sa.Column('salary_from', sa.Numeric(precision=10, scale=2),
+                  nullable=True),
+        sa.Column('salary_to', sa.Numeric(precision=10, scale=2),
+                  nullable=True),
+        sa.Column('salary_range', postgresql.NUMRANGE(), nullable=True),
+        sa.Column('experience_category_id', sa.Integer(), nullable=True),
+        sa.Column('location_id', sa.Integer(), nullable=True),
+        sa.Column('canonical_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""
+        INSERT INTO "VacancyListing"
+        SELECT v.id, v.published_at, v.title, v.description, c.name,
+               l.region, s.name, v.salary_currency, v.salary_value,
+               v.salary_period, v.salary_from, v.salary_to, v.salary_range,
+               v.experience_category_id, v.location_id, v.canonical_id
+        FROM "Vacancy" v
+        LEFT JOIN "Company" c ON c.id = v.company_id
+        LEFT JOIN "Location" l ON l.id = v.location_id
+        LEFT JOIN "SalaryType" s ON s.id = v.salary_type_id
+    """)
+    # indexes are built after the copy, which is faster than maintaining
+    # them row by row
+    op.create_index('ix_VacancyListing_experience_category_id',
+                    'VacancyListing', ['experience_category_id'],
+                    unique=False)
+    op.create_index('ix_VacancyListing_published_at', 'VacancyListing',
+                    ['published_at', 'id'], unique=False)
+    op.create_index('ix_VacancyListing_location_id_published_at',
+                    'VacancyListing', ['location_id', 'published_at', 'id'],
+                    unique=False)
+    op.create_index('ix_VacancyListing_salary_range', 'VacancyListing',
+                    ['salary_range'], unique=False, postgresql_using='gist')
+    op.create_index('ix_VacancyListing_title_trgm', 'VacancyListing',
+                    ['title'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'title': 'gin_trgm_ops'})
+    op.execute(_DELETE_CLEANUP.format(listing=_LISTING_CLEANUP.strip()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(_DELETE_CLEANUP.format(listing=''))
+    op.drop_table('VacancyListing')
@@ -0,0 +1,62 @@
+"""Add near-duplicate vacancy index
+
+Revision ID: 4c9a0e7d2b61
+Revises: b7e2d1c94f3a
+Create Date: 2026-10-18 12:41:07.228315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c9a0e7d2b61'
+down_revision: Union[str, None] = 'b7e2d1c94f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Vacancy', sa.Column('canonical_id', sa.Integer(),
+                                       nullable=True))
+    op.create_foreign_key(
+        'Vacancy_canonical_id_fkey', 'Vacancy', 'Vacancy',
+        ['canonical_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_Vacancy_canonical_id'), 'Vacancy',
+                    ['canonical_id'], unique=False)
+
+    op.create_table(
+        'VacancySignature',
+        sa.Column('vacancy_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['vacancy_id'], ['Vacancy.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('vacancy_id')
+    )
+    op.create_table(
+        'VacancyLshBand',
+        sa.Column('band', sa.SmallInteger(), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.Column('vacancy_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['vacancy_id'], ['Vacancy.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('band', 'bucket', 'vacancy_id')
+    )
+    op.create_index(op.f('ix_VacancyLshBand_vacancy_id'), 'VacancyLshBand',
+                    ['vacancy_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_VacancyLshBand_vacancy_id'),
+                  table_name='VacancyLshBand')
+    op.drop_table('VacancyLshBand')
+    op.drop_table('VacancySignature')
+    op.drop_index(op.f('ix_Vacancy_canonical_id'), table_name='Vacancy')
+    op.drop_constraint('Vacancy_canonical_id_fkey', 'Vacancy',
+                       type_='foreignkey')
+    op.drop_column('Vacancy', 'canonical_id')
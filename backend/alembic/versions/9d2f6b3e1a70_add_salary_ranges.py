@@ -0,0 +1,62 @@
+"""Add salary ranges with GiST indexes
+
+Revision ID: 9d2f6b3e1a70
+Revises: e5f13a8c07d9
+Create Date: 2026-10-18 15:27:19.034518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f6b3e1a70'
+down_revision: Union[str, None] = 'e5f13a8c07d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Vacancy', sa.Column('salary_from',
+                                       sa.Numeric(precision=10, scale=2),
+                                       nullable=True))
+    op.add_column('Vacancy', sa.Column('salary_to',
+                                       sa.Numeric(precision=10, scale=2),
+                                       nullable=True))
+    op.add_column('Vacancy', sa.Column('salary_range', postgresql.NUMRANGE(),
+                                       nullable=True))
+    # only the midpoint is known for stored vacancies
+    op.execute(
+        'UPDATE "Vacancy" '
+        "SET salary_range = numrange(salary_monthly_rub, "
+        "salary_monthly_rub, '[]') "
+        'WHERE salary_monthly_rub IS NOT NULL'
+    )
+    op.create_index('ix_Vacancy_salary_range', 'Vacancy', ['salary_range'],
+                    unique=False, postgresql_using='gist')
+
+    op.add_column('Resume', sa.Column(
+        'salary_range', postgresql.NUMRANGE(),
+        # a NULL bound would make the range unbounded and match any filter
+        sa.Computed("CASE WHEN salary_value IS NOT NULL "
+                    "THEN numrange(salary_value, salary_value, '[]') END",
+                    persisted=True),
+        nullable=True))
+    op.create_index('ix_Resume_salary_range', 'Resume', ['salary_range'],
+                    unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Resume_salary_range', table_name='Resume',
+                  postgresql_using='gist')
+    op.drop_column('Resume', 'salary_range')
+    op.drop_index('ix_Vacancy_salary_range', table_name='Vacancy',
+                  postgresql_using='gist')
+    op.drop_column('Vacancy', 'salary_range')
+    op.drop_column('Vacancy', 'salary_to')
+    op.drop_column('Vacancy', 'salary_from')
@@ -0,0 +1,130 @@
+"""Add search and join indexes and natural key constraints
+
+Revision ID: a3c8e51f7b24
+Revises: 9d2f6b3e1a70
+Create Date: 2026-10-18 22:58:41.512307
+
+"""
+from typing import Sequence, Tuple, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e51f7b24'
+down_revision: Union[str, None] = '9d2f6b3e1a70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table, natural key, FK columns referencing it, association tables
+# (table, FK column, other key column) referencing it
+_DEDUPLICATED = [
+    ('Source', ('name',),
+     [('Vacancy', 'source_id'), ('Resume', 'source_id')], []),
+    ('Company', ('name',), [('Vacancy', 'company_id')], []),
+    ('SalaryType', ('name',),
+     [('Vacancy', 'salary_type_id'), ('Resume', 'salary_type_id')], []),
+    ('ExperienceCategory', ('name',),
+     [('Vacancy', 'experience_category_id'),
+      ('Resume', 'experience_category_id')], []),
+    ('EmploymentType', ('name',), [],
+     [('Vacancy_EmploymentType', 'employment_type_id', 'vacancy_id')]),
+    ('Location', ('region',),
+     [('Vacancy', 'location_id'), ('Resume', 'location_id')], []),
+    ('Specialization', ('specialization',),
+     [('Vacancy', 'specialization_id'), ('Resume', 'specialization_id')],
+     []),
+    # after the sources, so their duplicates are merged first
+    ('Vacancy', ('source_id', 'external_id'),
+     [('Vacancy', 'canonical_id')],
+     [('Vacancy_EmploymentType', 'vacancy_id', 'employment_type_id'),
+      ('User_Favorite_Vacancies', 'vacancy_id', 'user_id')]),
+    ('Resume', ('source_id', 'external_id'), [],
+     [('User_Favorite_Resumes', 'resume_id', 'user_id')]),
+]
+
+_INDEXES = [
+    ('Vacancy', ['company_id']),
+    ('Vacancy', ['salary_type_id']),
+    ('Vacancy', ['experience_category_id']),
+    ('Vacancy', ['specialization_id']),
+    # the location filter is usually combined with the experience one
+    ('Vacancy', ['location_id', 'experience_category_id']),
+    ('Resume', ['salary_type_id']),
+    ('Resume', ['experience_category_id']),
+    ('Resume', ['specialization_id']),
+    ('Resume', ['location_id', 'experience_category_id']),
+    # reverse sides of the many-to-many tables
+    ('Vacancy_EmploymentType', ['employment_type_id']),
+    ('User_Favorite_Vacancies', ['vacancy_id']),
+    ('User_Favorite_Resumes', ['resume_id']),
+    ('User', ['email']),
+]
+
+
+def _index_name(table: str, columns: Sequence[str]) -> str:
+    """Return the conventional index name."""
+    return f"ix_{table}_{'_'.join(columns)}"
+
+
+def _merge_duplicates(
+    table: str,
+    key: Tuple[str, ...],
+    references: Sequence[Tuple[str, str]],
+    associations: Sequence[Tuple[str, str, str]]
+) -> None:
+    """Point references of duplicate rows to the oldest row, drop the rest."""
+    columns = ', '.join(f'"{column}"' for column in key)
+    not_null = ' AND '.join(f'"{column}" IS NOT NULL' for column in key)
+    duplicates = (
+        f'SELECT id, min(id) OVER (PARTITION BY {columns}) AS keep '
+        f'FROM "{table}" WHERE {not_null}'
+    )
+    for ref_table, ref_column in references:
+        op.execute(
+            f'UPDATE "{ref_table}" r SET "{ref_column}" = d.keep '
+            f'FROM ({duplicates}) d '
+            f'WHERE r."{ref_column}" = d.id AND d.id <> d.keep'
+        )
+    for assoc_table, assoc_column, other_column in associations:
+        op.execute(
+            f'INSERT INTO "{assoc_table}" ("{assoc_column}", '
+            f'"{other_column}") '
+            f'SELECT d.keep, a."{other_column}" '
+            f'FROM "{assoc_table}" a JOIN ({duplicates}) d '
+            f'ON a."{assoc_column}" = d.id WHERE d.id <> d.keep '
+            f'ON CONFLICT DO NOTHING'
+        )
+        op.execute(
+            f'DELETE FROM "{assoc_table}" a USING ({duplicates}) d '
+            f'WHERE a."{assoc_column}" = d.id AND d.id <> d.keep'
+        )
+    op.execute(
+        f'DELETE FROM "{table}" t USING ({duplicates}) d '
+        f'WHERE t.id = d.id AND d.id <> d.keep'
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, key, references, associations in _DEDUPLICATED:
+        _merge_duplicates(table, key, references, associations)
+        op.create_unique_constraint(
+            f"uq_{table}_{'_'.join(key)}", table, list(key))
+    # a vacancy merged into its own duplicate must not point to itself
+    op.execute(
+        'UPDATE "Vacancy" SET canonical_id = NULL WHERE canonical_id = id'
+    )
+
+    for table, columns in _INDEXES:
+        op.create_index(_index_name(table, columns), table, columns,
+                        unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in reversed(_INDEXES):
+        op.drop_index(_index_name(table, columns), table_name=table)
+    for table, key, _, _ in reversed(_DEDUPLICATED):
+        op.drop_constraint(f"uq_{table}_{'_'.join(key)}", table,
+                           type_='unique')
@@ -0,0 +1,47 @@
+"""Add BackfillTask queue
+
+Revision ID: b7e2d1c94f3a
+Revises: 000a6280b81d
+Create Date: 2026-10-18 10:12:40.512034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d1c94f3a'
+down_revision: Union[str, None] = '000a6280b81d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'BackfillTask',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('vacancy_id', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0',
+                  nullable=False),
+        sa.Column('not_before', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['vacancy_id'], ['Vacancy.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('vacancy_id')
+    )
+    op.create_index(
+        'ix_BackfillTask_queue', 'BackfillTask',
+        [sa.text('priority DESC NULLS LAST'), 'not_before']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_BackfillTask_queue', table_name='BackfillTask')
+    op.drop_table('BackfillTask')
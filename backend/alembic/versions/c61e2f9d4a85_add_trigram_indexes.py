@@ -0,0 +1,39 @@
+"""Add trigram indexes for title and skills search
+
+Revision ID: c61e2f9d4a85
+Revises: a3c8e51f7b24
+Create Date: 2026-10-18 23:24:06.819245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c61e2f9d4a85'
+down_revision: Union[str, None] = 'a3c8e51f7b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = [
+    ('ix_Vacancy_title_trgm', 'Vacancy', 'title'),
+    ('ix_Resume_title_trgm', 'Resume', 'title'),
+    ('ix_Resume_skills_text_trgm', 'Resume', 'skills_text'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # serve ILIKE '%...%' as well as the word similarity operators
+    for name, table, column in _INDEXES:
+        op.create_index(name, table, [column], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table, postgresql_using='gin')
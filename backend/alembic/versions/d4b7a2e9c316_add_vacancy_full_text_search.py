@@ -0,0 +1,79 @@
+"""Add vacancy full-text search vector
+
+Revision ID: d4b7a2e9c316
+Revises: c61e2f9d4a85
+Create Date: 2026-10-18 23:51:37.264190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b7a2e9c316'
+down_revision: Union[str, None] = 'c61e2f9d4a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('Vacancy', sa.Column('search_vector',
+                                       postgresql.TSVECTOR(),
+                                       nullable=True))
+    # a generated column can't read the company name from another table
+    op.execute("""
+        CREATE FUNCTION vacancy_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('russian',
+                                      coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('russian', coalesce(
+                    (SELECT name FROM "Company"
+                     WHERE id = NEW.company_id), '')), 'B') ||
+                setweight(to_tsvector('russian',
+                                      coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER vacancy_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description, company_id
+        ON "Vacancy"
+        FOR EACH ROW EXECUTE FUNCTION vacancy_search_vector_update()
+    """)
+    op.execute("""
+        CREATE FUNCTION company_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE "Vacancy" SET company_id = company_id
+            WHERE company_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER company_search_vector_update
+        AFTER UPDATE OF name ON "Company"
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION company_search_vector_update()
+    """)
+    op.execute('UPDATE "Vacancy" SET title = title')
+    op.create_index('ix_Vacancy_search_vector', 'Vacancy', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Vacancy_search_vector', table_name='Vacancy',
+                  postgresql_using='gin')
+    op.execute(
+        'DROP TRIGGER company_search_vector_update ON "Company"')
+    op.execute('DROP FUNCTION company_search_vector_update()')
+    op.execute(
+        'DROP TRIGGER vacancy_search_vector_update ON "Vacancy"')
+    op.execute('DROP FUNCTION vacancy_search_vector_update()')
+    op.drop_column('Vacancy', 'search_vector')
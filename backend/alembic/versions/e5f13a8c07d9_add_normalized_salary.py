@@ -0,0 +1,63 @@
+"""Add normalized monthly RUB salary
+
+Revision ID: e5f13a8c07d9
+Revises: 4c9a0e7d2b61
+Create Date: 2026-10-18 14:03:55.871420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f13a8c07d9'
+down_revision: Union[str, None] = '4c9a0e7d2b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Starting rates, roubles per unit; refresh them in the table.
+INITIAL_RATES = [
+    ('RUB', 1),
+    ('USD', 92),
+    ('EUR', 100),
+    ('KZT', 0.18),
+    ('BYN', 28),
+    ('UZS', 0.0072),
+    ('UAH', 2.2),
+    ('KGS', 1.05),
+    ('AZN', 54),
+    ('GEL', 34),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    currency_rate = op.create_table(
+        'CurrencyRate',
+        sa.Column('code', sa.String(length=10), nullable=False),
+        sa.Column('rate', sa.Numeric(precision=18, scale=6), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('code')
+    )
+    op.bulk_insert(currency_rate, [
+        {'code': code, 'rate': rate} for code, rate in INITIAL_RATES
+    ])
+
+    op.add_column('Vacancy', sa.Column('salary_period', sa.String(length=20),
+                                       nullable=True))
+    op.add_column('Vacancy', sa.Column('salary_monthly_rub',
+                                       sa.Numeric(precision=12, scale=2),
+                                       nullable=True))
+    op.create_index(op.f('ix_Vacancy_salary_monthly_rub'), 'Vacancy',
+                    ['salary_monthly_rub'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_Vacancy_salary_monthly_rub'), table_name='Vacancy')
+    op.drop_column('Vacancy', 'salary_monthly_rub')
+    op.drop_column('Vacancy', 'salary_period')
+    op.drop_table('CurrencyRate')
@@ -0,0 +1,39 @@
+"""Add keyset pagination indexes
+
+Revision ID: e82c5d1f9b43
+Revises: d4b7a2e9c316
+Create Date: 2026-10-19 00:31:52.407716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e82c5d1f9b43'
+down_revision: Union[str, None] = 'd4b7a2e9c316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# unknown publication times sort as the oldest, see published_sort_key
+_PUBLISHED_KEY = sa.text("coalesce(published_at, '-infinity'::timestamptz)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_Vacancy_published_key', 'Vacancy',
+                    [_PUBLISHED_KEY, 'id'], unique=False)
+    op.create_index('ix_Vacancy_location_id_published_key', 'Vacancy',
+                    ['location_id', _PUBLISHED_KEY, 'id'], unique=False)
+    op.create_index('ix_Resume_published_key', 'Resume',
+                    [_PUBLISHED_KEY, 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Resume_published_key', table_name='Resume')
+    op.drop_index('ix_Vacancy_location_id_published_key',
+                  table_name='Vacancy')
+    op.drop_index('ix_Vacancy_published_key', table_name='Vacancy')
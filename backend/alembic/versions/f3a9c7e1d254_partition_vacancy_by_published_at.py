@@ -0,0 +1,253 @@
+"""Partition vacancies by publication month
+
+Revision ID: f3a9c7e1d254
+Revises: e82c5d1f9b43
+Create Date: 2026-10-19 01:12:40.853619
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c7e1d254'
+down_revision: Union[str, None] = 'e82c5d1f9b43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# months of partitions created ahead of the current one
+_MONTHS_AHEAD = 3
+# months of partitions created behind it, older rows go to the default one
+_KEEP_MONTHS = 12
+_ARCHIVE_SCHEMA = 'archive'
+_PUBLISHED_KEY = "coalesce(published_at, '-infinity'::timestamptz)"
+
+# index name, USING method, indexed expressions
+_INDEXES = [
+    ('ix_Vacancy_salary_monthly_rub', 'btree', 'salary_monthly_rub'),
+    ('ix_Vacancy_canonical_id', 'btree', 'canonical_id'),
+    ('ix_Vacancy_company_id', 'btree', 'company_id'),
+    ('ix_Vacancy_salary_type_id', 'btree', 'salary_type_id'),
+    ('ix_Vacancy_experience_category_id', 'btree', 'experience_category_id'),
+    ('ix_Vacancy_specialization_id', 'btree', 'specialization_id'),
+    ('ix_Vacancy_location_id_experience_category_id', 'btree',
+     'location_id, experience_category_id'),
+    ('ix_Vacancy_salary_range', 'gist', 'salary_range'),
+    ('ix_Vacancy_title_trgm', 'gin', 'title gin_trgm_ops'),
+    ('ix_Vacancy_search_vector', 'gin', 'search_vector'),
+    ('ix_Vacancy_published_key', 'btree', f'({_PUBLISHED_KEY}), id'),
+    ('ix_Vacancy_location_id_published_key', 'btree',
+     f'location_id, ({_PUBLISHED_KEY}), id'),
+]
+
+# table, column, ON DELETE action of the foreign keys to Vacancy.id
+_REFERENCES = [
+    ('Vacancy_EmploymentType', 'vacancy_id', 'NO ACTION'),
+    ('User_Favorite_Vacancies', 'vacancy_id', 'NO ACTION'),
+    ('VacancySignature', 'vacancy_id', 'CASCADE'),
+    ('VacancyLshBand', 'vacancy_id', 'CASCADE'),
+    ('BackfillTask', 'vacancy_id', 'CASCADE'),
+    ('Vacancy', 'canonical_id', 'SET NULL'),
+]
+
+# rows keyed by a vacancy ID, which can no longer reference it with a
+# foreign key, are cleaned up when the vacancy is deleted
+_DELETE_CLEANUP = """
+    CREATE OR REPLACE FUNCTION vacancy_delete_cleanup() RETURNS trigger AS $$
+    BEGIN
+        -- rows moved to another partition are deleted and inserted back;
+        -- the partition maintenance moves them before attaching the target
+        IF current_setting('vacancy.moving_rows', true) = 'on'
+           OR EXISTS (SELECT 1 FROM "Vacancy" WHERE id = OLD.id) THEN
+            RETURN NULL;
+        END IF;
+        DELETE FROM "VacancySignature" WHERE vacancy_id = OLD.id;
+        DELETE FROM "VacancyLshBand" WHERE vacancy_id = OLD.id;
+        DELETE FROM "BackfillTask" WHERE vacancy_id = OLD.id;
+        DELETE FROM "Vacancy_EmploymentType" WHERE vacancy_id = OLD.id;
+        DELETE FROM "User_Favorite_Vacancies" WHERE vacancy_id = OLD.id;
+        DELETE FROM "VacancyKey" WHERE vacancy_id = OLD.id;
+        UPDATE "Vacancy" SET canonical_id = NULL WHERE canonical_id = OLD.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def _add_months(month: date, months: int) -> date:
+    """Return the first day of the month *months* after *month*."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    """Create the indexes and the search vector trigger of `Vacancy`."""
+    for name, method, expressions in _INDEXES:
+        op.execute(f'CREATE INDEX "{name}" ON "Vacancy" '
+                   f'USING {method} ({expressions})')
+    op.execute("""
+        CREATE TRIGGER vacancy_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description, company_id
+        ON "Vacancy"
+        FOR EACH ROW EXECUTE FUNCTION vacancy_search_vector_update()
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a foreign key to a partitioned table must cover its partition key
+    op.execute("""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            FOR fk IN
+                SELECT conrelid::regclass AS tbl, conname
+                FROM pg_constraint
+                WHERE contype = 'f' AND confrelid = '"Vacancy"'::regclass
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I',
+                               fk.tbl, fk.conname);
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute('UPDATE "Vacancy" SET published_at = now() '
+               'WHERE published_at IS NULL')
+
+    op.execute('ALTER SEQUENCE "Vacancy_id_seq" OWNED BY NONE')
+    op.execute('ALTER TABLE "Vacancy" RENAME TO "Vacancy_unpartitioned"')
+    op.execute('CREATE TABLE "Vacancy" '
+               '(LIKE "Vacancy_unpartitioned" INCLUDING DEFAULTS) '
+               'PARTITION BY RANGE (published_at)')
+    op.execute('ALTER TABLE "Vacancy" '
+               'ALTER COLUMN published_at SET DEFAULT now(), '
+               'ALTER COLUMN published_at SET NOT NULL')
+
+    first = op.get_bind().execute(sa.text(
+        'SELECT min(published_at) FROM "Vacancy_unpartitioned"'
+    )).scalar()
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    # a single stray old date must not create a partition per month
+    month = _add_months(current, -_KEEP_MONTHS)
+    if first:
+        month = max(month, first.date().replace(day=1))
+    last = _add_months(current, _MONTHS_AHEAD)
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE "Vacancy_{month:%Y_%m}" PARTITION OF "Vacancy" '
+            f"FOR VALUES FROM ('{month}') TO ('{following}')"
+        )
+        month = following
+    # catches publication dates outside the prepared months
+    op.execute('CREATE TABLE "Vacancy_default" PARTITION OF "Vacancy" '
+               'DEFAULT')
+
+    op.execute('INSERT INTO "Vacancy" SELECT * FROM "Vacancy_unpartitioned"')
+    op.execute('DROP TABLE "Vacancy_unpartitioned"')
+    op.execute('ALTER SEQUENCE "Vacancy_id_seq" OWNED BY "Vacancy".id')
+
+    op.create_primary_key('Vacancy_pkey', 'Vacancy', ['id', 'published_at'])
+    for column, table in [('source_id', 'Source'), ('company_id', 'Company'),
+                          ('salary_type_id', 'SalaryType'),
+                          ('experience_category_id', 'ExperienceCategory'),
+                          ('location_id', 'Location'),
+                          ('specialization_id', 'Specialization')]:
+        op.create_foreign_key(f'Vacancy_{column}_fkey', 'Vacancy', table,
+                              [column], ['id'])
+    _create_indexes()
+
+    # a unique key of a partitioned table must include the partition key,
+    # the natural key of a vacancy is kept unique in a plain table instead
+    op.create_table(
+        'VacancyKey',
+        sa.Column('vacancy_id', sa.Integer(), autoincrement=False,
+                  server_default=sa.text("nextval('\"Vacancy_id_seq\"')"),
+                  nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=True),
+        sa.Column('external_id', sa.String(length=100), nullable=False),
+        sa.Column('first_seen_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['source_id'], ['Source.id']),
+        sa.PrimaryKeyConstraint('vacancy_id'),
+        sa.UniqueConstraint('source_id', 'external_id',
+                            name='uq_VacancyKey_source_id_external_id')
+    )
+    op.execute('INSERT INTO "VacancyKey" '
+               'SELECT id, source_id, external_id, published_at '
+               'FROM "Vacancy"')
+    # vacancies inserted without claiming their key first claim it here,
+    # a taken key fails the insert
+    op.execute("""
+        CREATE FUNCTION vacancy_key_register() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO "VacancyKey"
+                (vacancy_id, source_id, external_id, first_seen_at)
+            VALUES (NEW.id, NEW.source_id, NEW.external_id, NEW.published_at)
+            ON CONFLICT (vacancy_id) DO NOTHING;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER vacancy_key_register
+        BEFORE INSERT ON "Vacancy"
+        FOR EACH ROW EXECUTE FUNCTION vacancy_key_register()
+    """)
+
+    op.execute(_DELETE_CLEANUP)
+    op.execute("""
+        CREATE TRIGGER vacancy_delete_cleanup
+        AFTER DELETE ON "Vacancy"
+        FOR EACH ROW EXECUTE FUNCTION vacancy_delete_cleanup()
+    """)
+
+    op.execute(f'CREATE SCHEMA IF NOT EXISTS {_ARCHIVE_SCHEMA}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # archived partitions stay in the archive schema
+    op.execute('DROP TRIGGER vacancy_delete_cleanup ON "Vacancy"')
+    op.execute('DROP FUNCTION vacancy_delete_cleanup()')
+    op.execute('DROP TRIGGER vacancy_key_register ON "Vacancy"')
+    op.execute('DROP FUNCTION vacancy_key_register()')
+    op.drop_table('VacancyKey')
+    op.execute('ALTER SEQUENCE "Vacancy_id_seq" OWNED BY NONE')
+    op.execute('ALTER TABLE "Vacancy" RENAME TO "Vacancy_partitioned"')
+    op.execute('CREATE TABLE "Vacancy" '
+               '(LIKE "Vacancy_partitioned" INCLUDING DEFAULTS)')
+    op.execute('ALTER TABLE "Vacancy" '
+               'ALTER COLUMN published_at DROP DEFAULT, '
+               'ALTER COLUMN published_at DROP NOT NULL')
+    op.execute('INSERT INTO "Vacancy" SELECT * FROM "Vacancy_partitioned"')
+    op.execute('DROP TABLE "Vacancy_partitioned"')
+    op.execute('ALTER SEQUENCE "Vacancy_id_seq" OWNED BY "Vacancy".id')
+
+    op.create_primary_key('Vacancy_pkey', 'Vacancy', ['id'])
+    op.create_unique_constraint('uq_Vacancy_source_id_external_id',
+                                'Vacancy', ['source_id', 'external_id'])
+    for column, table in [('source_id', 'Source'), ('company_id', 'Company'),
+                          ('salary_type_id', 'SalaryType'),
+                          ('experience_category_id', 'ExperienceCategory'),
+                          ('location_id', 'Location'),
+                          ('specialization_id', 'Specialization')]:
+        op.create_foreign_key(f'Vacancy_{column}_fkey', 'Vacancy', table,
+                              [column], ['id'])
+    _create_indexes()
+
+    for table, column, on_delete in _REFERENCES:
+        # references to vacancies archived meanwhile have nothing to point to
+        orphaned = (f'NOT EXISTS (SELECT 1 FROM "Vacancy" v '
+                    f'WHERE v.id = t."{column}")')
+        if on_delete == 'SET NULL':
+            op.execute(f'UPDATE "{table}" t SET "{column}" = NULL '
+                       f'WHERE {orphaned}')
+        else:
+            op.execute(f'DELETE FROM "{table}" t WHERE {orphaned}')
+        op.create_foreign_key(f'{table}_{column}_fkey', table, 'Vacancy',
+                              [column], ['id'], ondelete=on_delete)
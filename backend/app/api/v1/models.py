@@ -1,7 +1,7 @@
 """API models."""
 
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 from enum import Enum
 
@@ -14,6 +14,23 @@ class UserGender(str, Enum):
     other = "other"
 
 
+class TextMatch(str, Enum):
+    """How text filters match."""
+
+    substring = "substring"
+    similar = "similar"
+
+
+class CountMode(str, Enum):
+    """How the total number of results is counted."""
+
+    exact = "exact"
+    capped = "capped"
+    estimate = "estimate"
+    cached = "cached"
+    none = "none"
+
+
 class Register(BaseModel):
     """Registration info."""
 
@@ -51,10 +68,24 @@ class UpdateMe(BaseModel):
 
 
 class View(BaseModel):
-    """Offset and count."""
+    """Offset or cursor, and count."""
 
-    offset: int
-    count: int
+    offset: int = Field(default=0, ge=0)
+    count: int = Field(ge=1)
+    cursor: str | None = None
+    """
+    `next_cursor` of the previous page. Pages after it regardless of
+    `offset`, at the same cost for every page.
+    """
+    count_mode: CountMode = CountMode.exact
+    """
+    `exact` counts every result, `capped` up to `count_cap` results,
+    `estimate` uses the query planner estimate, `cached` reuses a recent
+    exact count of the same filter and `none` skips counting, leaving
+    `has_more` to tell whether more pages follow.
+    """
+    count_cap: int = Field(default=1000, ge=1, le=100000)
+    """Results counted at most in `capped` mode."""
 
 
 class Tokens(BaseModel):
@@ -99,6 +130,15 @@ class Salary(BaseModel):
     Fixed point number.
     1 means 0.01, 11 means 0.11, 111 means 1.11, etc.
     """
+    period: str | None = None
+    """
+    Pay period: month, year, week, day, shift or hour.
+    Monthly if not set.
+    """
+    value_from: int | None = None
+    """Lower bound of a salary range, in the units of `value`."""
+    value_to: int | None = None
+    """Upper bound of a salary range, in the units of `value`."""
 
 
 class VacancyShort(BaseModel):
@@ -108,14 +148,52 @@ class VacancyShort(BaseModel):
     title: str
     description: str | None = None
     salary: Salary
+    snippet: str | None = None
+    """Description fragments matching the query, terms in `<b>`."""
 
 
 class VacancyList(BaseModel):
     """List of vacancies."""
 
-    count: int
-    """The total number of results."""
+    count: int | None
+    """The total number of results, `None` if not counted."""
+    count_mode: CountMode = CountMode.exact
+    """
+    How `count` was obtained. `capped` means at least `count` results,
+    `estimate` and `cached` are approximate.
+    """
+    has_more: bool = False
+    """Whether more results follow this page."""
     vacancies: List[VacancyShort]
+    next_cursor: str | None = None
+    """Cursor of the next page, `None` on the last one."""
+
+
+class FacetCount(BaseModel):
+    """Number of vacancies with one facet value."""
+
+    value: str
+    count: int
+
+
+class SalaryBucketCount(BaseModel):
+    """Number of vacancies in one salary bucket."""
+
+    salary_from: int | None
+    """Lower bound in roubles per month, inclusive."""
+    salary_to: int | None
+    """Upper bound in roubles per month, exclusive, `None` if unbounded."""
+    count: int
+
+
+class VacancyFacets(BaseModel):
+    """Vacancy counts by filter value for the current filter."""
+
+    locations: List[FacetCount]
+    experience_categories: List[FacetCount]
+    employment_types: List[FacetCount]
+    sources: List[FacetCount]
+    salaries: List[SalaryBucketCount]
 
 
 class ResumeShort(BaseModel):
@@ -133,9 +211,18 @@ class ResumeShort(BaseModel):
 class ResumeList(BaseModel):
     """List of resumes."""
 
-    count: int
-    """The total number of results."""
+    count: int | None
+    """The total number of results, `None` if not counted."""
+    count_mode: CountMode = CountMode.exact
+    """
+    How `count` was obtained. `capped` means at least `count` results,
+    `estimate` and `cached` are approximate.
+    """
+    has_more: bool = False
+    """Whether more results follow this page."""
     resumes: List[ResumeShort]
+    next_cursor: str | None = None
+    """Cursor of the next page, `None` on the last one."""
 
 
 class Source(BaseModel):
@@ -191,6 +278,21 @@ class VacancyFilter(BaseModel):
     location: Location | None
     date_published_from: Optional[int] | None
     date_published_to: Optional[int] | None
+    collapse_duplicates: bool = False
+    title_match: TextMatch = TextMatch.substring
+    """
+    `similar` tolerates typos and orders vacancies by title similarity.
+    """
+    similarity_threshold: float = Field(default=0.4, ge=0, le=1)
+    """Minimal word similarity of the title in `similar` mode."""
+    query: str | None = None
+    """
+    Full-text query over title, company and description, in web search
+    syntax (`"exact phrase"`, `or`, `-excluded`). Orders vacancies by
+    relevance.
+    """
+    highlight: bool = False
+    """Return description snippets highlighting the `query` terms."""
 
 
 class VacanciesView(BaseModel):
@@ -228,6 +330,13 @@ class ResumeFilter(BaseModel):
     salary_max: int | None
     experience_categories: List[ExperienceCategory]
     skills: List[str]
+    text_match: TextMatch = TextMatch.substring
+    """
+    `similar` tolerates typos in the title and skills and orders resumes
+    by similarity.
+    """
+    similarity_threshold: float = Field(default=0.4, ge=0, le=1)
+    """Minimal word similarity of the title or skills in `similar` mode."""
 
 
 class ResumesView(BaseModel):
@@ -260,6 +369,20 @@ class Resume(BaseModel):
     published_at: TimeStamp | None = None
 
 
+class LikesUpdate(BaseModel):
+    """IDs to like and unlike in one request, no ID in both lists."""
+
+    like: List[int] = Field(default=[], max_length=1000)
+    unlike: List[int] = Field(default=[], max_length=1000)
+
+
+class LikesUpdated(BaseModel):
+    """Result of a likes update."""
+
+    not_found: List[int]
+    """IDs of `like` that do not exist and were skipped."""
+
+
 class ErrorResponse(BaseModel):
     """Error response."""
 
@@ -1,26 +1,31 @@
 """API routes."""
 
 import os
+from datetime import datetime, timezone
 
 from fastapi.responses import FileResponse
 from app.core.config import get_settings
-from app.database.database import get_async_session
+from app.database.database import get_async_session, get_read_session
 from app.database.crud import get_experience_category_by_name, user, \
-    get_location_by_region, vacancy as dbvacancy, resume as dbresume
+    get_location_by_region, vacancy as dbvacancy, resume as dbresume, \
+    vacancy_listing as dbvacancy_listing
 import app.database.models as dbmodels
 from app.services.jwt import create_access_token, create_refresh_token, \
     verify_token
+from app.services.cursor import decode_cursor, encode_cursor
 from app.services.security import hash_password, verify_password
 from fastapi import APIRouter, Depends, File, HTTPException, Response, \
     UploadFile
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from .models import AccessToken, Company, EmploymentType, \
-    ExperienceCategory, Location, Login, Register, Resume, ResumeList, \
-    ResumeShort, ResumesView, Salary, Source, Specialization, TimeStamp, \
-    Tokens, RefreshToken, UpdateMe, User, Vacancy, VacancyList, \
-    VacancyShort, VacanciesView, View, ErrorResponse
+from .models import AccessToken, Company, CountMode, EmploymentType, \
+    ExperienceCategory, FacetCount, LikesUpdate, LikesUpdated, Location, \
+    Login, Register, Resume, ResumeList, ResumeShort, ResumesView, Salary, \
+    SalaryBucketCount, Source, Specialization, TextMatch, TimeStamp, \
+    Tokens, RefreshToken, UpdateMe, User, Vacancy, VacancyFacets, \
+    VacancyFilter, VacancyList, VacancyShort, VacanciesView, View, \
+    ErrorResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 from PIL import Image
 from io import BytesIO
 
@@ -357,6 +362,10 @@ async def get_me(
         "model": VacancyList,
         "description": "List of liked vacancies returned"
     },
+    400: {
+        "model": ErrorResponse,
+        "description": "Invalid cursor"
+    },
     401: {
         "model": ErrorResponse,
         "description": "Missing or invalid access token"
@@ -364,7 +373,7 @@ async def get_me(
 })
 async def liked_vacancies(
     view: View,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
 ) -> VacancyList:
     """View the list of liked vacancies. Requires authentication."""
@@ -375,12 +384,16 @@ async def liked_vacancies(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    (count, vacancies) = await user.get_favorite_vacancies(
-        session,
-        user_id,
-        view.offset,
-        view.count
-    )
+    try:
+        (count, vacancies, next_key) = await user.get_favorite_vacancies(
+            session,
+            user_id,
+            view.offset,
+            view.count,
+            view_cursor(view)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     short_vacancies = []
     for v in vacancies:
         v_rel = await dbvacancy.get_with_relations(session, v.id)
@@ -392,7 +405,9 @@ async def liked_vacancies(
 
     return VacancyList(
         count=count,
-        vacancies=short_vacancies
+        has_more=next_key is not None,
+        vacancies=short_vacancies,
+        next_cursor=encode_cursor(next_key) if next_key else None
     )
 
 
@@ -422,23 +437,17 @@ async def like_vacancy(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    db_vacancy = await dbvacancy.get_with_relations(session, id)
-    if not db_vacancy:
+    if not await user.update_favorite_vacancies(session, user_id, like=[id]):
         raise HTTPException(status_code=404, detail="Vacancy not found")
-    await user.add_favorite_vacancy(session, user_id, db_vacancy.id)
 
 
 @router.get("/unlike_vacancy/{id}", responses={
     200: {
-        "description": "Vacancy removed from likes"
+        "description": "Vacancy removed from likes, if it was liked"
     },
     401: {
         "model": ErrorResponse,
         "description": "Missing or invalid access token"
-    },
-    404: {
-        "model": ErrorResponse,
-        "description": "Vacancy not found"
     }
 })
 async def unlike_vacancy(
@@ -454,10 +463,48 @@ async def unlike_vacancy(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    db_vacancy = await dbvacancy.get_with_relations(session, id)
-    if not db_vacancy:
-        raise HTTPException(status_code=404, detail="Vacancy not found")
-    await user.remove_favorite_vacancy(session, user_id, db_vacancy.id)
+    await user.update_favorite_vacancies(session, user_id, unlike=[id])
+
+
+@router.post("/update_liked_vacancies", responses={
+    200: {
+        "model": LikesUpdated,
+        "description": "Likes updated"
+    },
+    400: {
+        "model": ErrorResponse,
+        "description": "An ID is both liked and unliked"
+    },
+    401: {
+        "model": ErrorResponse,
+        "description": "Missing or invalid access token"
+    }
+})
+async def update_liked_vacancies(
+    likes: LikesUpdate,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> LikesUpdated:
+    """Like and unlike many vacancies at once. Requires authentication."""
+    token = credentials.credentials
+    user_id = verify_token(token)
+    if not user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Access token expired or invalid"
+        )
+    overlap = likes_overlap(likes)
+    if overlap:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Both liked and unliked: {overlap}"
+        )
+    found = await user.update_favorite_vacancies(
+        session, user_id, likes.like, likes.unlike
+    )
+    return LikesUpdated(
+        not_found=[x for x in likes.like if x not in found]
+    )
 
 
 @router.post("/liked_resumes", responses={
@@ -465,6 +512,10 @@ async def unlike_vacancy(
         "model": ResumeList,
         "description": "List of liked resumes returned"
     },
+    400: {
+        "model": ErrorResponse,
+        "description": "Invalid cursor"
+    },
     401: {
         "model": ErrorResponse,
         "description": "Missing or invalid access token"
@@ -472,7 +523,7 @@ async def unlike_vacancy(
 })
 async def liked_resumes(
     view: View,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
 ) -> ResumeList:
     """View the list of liked resumes. Requires authentication."""
@@ -483,12 +534,16 @@ async def liked_resumes(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    (count, resumes) = await user.get_favorite_resumes(
-        session,
-        user_id,
-        view.offset,
-        view.count
-    )
+    try:
+        (count, resumes, next_key) = await user.get_favorite_resumes(
+            session,
+            user_id,
+            view.offset,
+            view.count,
+            view_cursor(view)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     short_resumes = []
     for r in resumes:
         r_rel = await dbresume.get_with_relations(session, r.id)
@@ -500,7 +555,9 @@ async def liked_resumes(
 
     return ResumeList(
         count=count,
-        resumes=short_resumes
+        has_more=next_key is not None,
+        resumes=short_resumes,
+        next_cursor=encode_cursor(next_key) if next_key else None
     )
 
 
@@ -530,23 +587,17 @@ async def like_resume(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    db_resume = await dbresume.get_with_relations(session, id)
-    if not db_resume:
+    if not await user.update_favorite_resumes(session, user_id, like=[id]):
         raise HTTPException(status_code=404, detail="Resume not found")
-    await user.add_favorite_vacancy(session, user_id, db_resume.id)
 
 
 @router.get("/unlike_resume/{id}", responses={
     200: {
-        "description": "Resume removed from likes"
+        "description": "Resume removed from likes, if it was liked"
     },
     401: {
         "model": ErrorResponse,
         "description": "Missing or invalid access token"
-    },
-    404: {
-        "model": ErrorResponse,
-        "description": "Resume not found"
     }
 })
 async def unlike_resume(
@@ -562,10 +613,48 @@ async def unlike_resume(
             status_code=401,
             detail="Access token expired or invalid"
         )
-    db_resume = await dbresume.get_with_relations(session, id)
-    if not db_resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    await user.remove_favorite_vacancy(session, user_id, db_resume.id)
+    await user.update_favorite_resumes(session, user_id, unlike=[id])
+
+
+@router.post("/update_liked_resumes", responses={
+    200: {
+        "model": LikesUpdated,
+        "description": "Likes updated"
+    },
+    400: {
+        "model": ErrorResponse,
+        "description": "An ID is both liked and unliked"
+    },
+    401: {
+        "model": ErrorResponse,
+        "description": "Missing or invalid access token"
+    }
+})
+async def update_liked_resumes(
+    likes: LikesUpdate,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> LikesUpdated:
+    """Like and unlike many resumes at once. Requires authentication."""
+    token = credentials.credentials
+    user_id = verify_token(token)
+    if not user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Access token expired or invalid"
+        )
+    overlap = likes_overlap(likes)
+    if overlap:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Both liked and unliked: {overlap}"
+        )
+    found = await user.update_favorite_resumes(
+        session, user_id, likes.like, likes.unlike
+    )
+    return LikesUpdated(
+        not_found=[x for x in likes.like if x not in found]
+    )
 
 
 @router.post("/vacancies", responses={
@@ -573,54 +662,73 @@ async def unlike_resume(
         "model": VacancyList,
         "description": "List of all available vacancies"
     },
+    400: {
+        "model": ErrorResponse,
+        "description": "Invalid cursor"
+    }
 })
 async def vacancies(
     vacancies_view: VacanciesView,
-    session: Annotated[AsyncSession, Depends(get_async_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ) -> VacancyList:
     """List all available vacancies."""
     filter = vacancies_view.filter
-    experience_category_ids: Optional[List[int]] = None
-    if not filter.experience_categories:
-        experience_category_ids = None
-    else:
-        experience_category_ids = []
-        for experience_category in filter.experience_categories:
-            db_experience_category = \
-                await get_experience_category_by_name(
-                    session,
-                    experience_category.name
-                )
-            if not db_experience_category:
-                continue
-            experience_category_ids.append(db_experience_category.id)
-    location_id: Optional[int] = None
-    if filter.location:
-        db_location = await get_location_by_region(
-            session,
-            filter.location.region
-        )
-        if db_location:
-            location_id = db_location.id
+    experience_category_ids, location_id = \
+        await vacancy_filter_ids(session, filter)
 
     offset = vacancies_view.view.offset
     count = vacancies_view.view.count
 
-    db_vacancies = await dbvacancy.search(
-        session,
+    search_filter = dict(
         title=filter.title,
         min_salary=filter.salary_min,
         max_salary=filter.salary_max,
         experience_category_ids=experience_category_ids,
         location_id=location_id,
         offset=offset,
-        limit=count
+        limit=count,
+        collapse_duplicates=filter.collapse_duplicates,
+        similar=filter.title_match == TextMatch.similar,
+        similarity_threshold=filter.similarity_threshold,
+        published_from=unix_to_datetime(filter.date_published_from),
+        published_to=unix_to_datetime(filter.date_published_to),
+        after=view_cursor(vacancies_view.view),
+        count_mode=vacancies_view.view.count_mode.value,
+        count_cap=vacancies_view.view.count_cap
     )
+    try:
+        if not filter.query:
+            # the listing holds everything a page shows, no joins needed
+            (total_count, db_listing, next_key) = \
+                await dbvacancy_listing.search(session, **search_filter)
+            return VacancyList(
+                count=total_count.count,
+                count_mode=CountMode(total_count.mode),
+                has_more=next_key is not None,
+                vacancies=[db_listing_to_vacancy_short(x)
+                           for x in db_listing],
+                next_cursor=encode_cursor(next_key) if next_key else None
+            )
+        # full-text search needs the search vector of `Vacancy`
+        db_vacancies = await dbvacancy.search(
+            session, query=filter.query, **search_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     vacancies = []
     vacancy_count = 0
+    count_mode = CountMode.exact
+    next_key = None
     if db_vacancies:
-        (total_count, db_vacancy_list) = db_vacancies
-        vacancy_count = total_count
+        (total_count, db_vacancy_list, next_key) = db_vacancies
+        vacancy_count = total_count.count
+        count_mode = CountMode(total_count.mode)
+        snippets = {}
+        if filter.query and filter.highlight:
+            snippets = await dbvacancy.headlines(
+                session,
+                [db_vacancy.id for db_vacancy in db_vacancy_list],
+                filter.query
+            )
         for db_vacancy in db_vacancy_list:
             v_rel = await dbvacancy.get_with_relations(
                 session,
@@ -630,11 +738,55 @@ async def vacancies(
                 continue
             vacancy = db_vacancy_to_vacancy(v_rel)
             vacancy_short = vacancy_to_vacancy_short(vacancy)
+            vacancy_short.snippet = snippets.get(db_vacancy.id)
             vacancies.append(vacancy_short)
 
     return VacancyList(
         count=vacancy_count,
-        vacancies=vacancies
+        count_mode=count_mode,
+        has_more=next_key is not None,
+        vacancies=vacancies,
+        next_cursor=encode_cursor(next_key) if next_key else None
+    )
+
+
+@router.post("/vacancies/facets", responses={
+    200: {
+        "model": VacancyFacets,
+        "description": "Vacancy counts by filter value"
+    }
+})
+async def vacancy_facets(
+    filter: VacancyFilter,
+    session: Annotated[AsyncSession, Depends(get_read_session)]
+) -> VacancyFacets:
+    """Count the vacancies matching a filter by filter value."""
+    experience_category_ids, location_id = \
+        await vacancy_filter_ids(session, filter)
+    facets = await dbvacancy.facets(
+        session,
+        title=filter.title,
+        min_salary=filter.salary_min,
+        max_salary=filter.salary_max,
+        experience_category_ids=experience_category_ids,
+        location_id=location_id,
+        collapse_duplicates=filter.collapse_duplicates,
+        similar=filter.title_match == TextMatch.similar,
+        similarity_threshold=filter.similarity_threshold,
+        published_from=unix_to_datetime(filter.date_published_from),
+        published_to=unix_to_datetime(filter.date_published_to),
+        query=filter.query
+    )
+    return VacancyFacets(
+        locations=facet_counts(facets["locations"]),
+        experience_categories=facet_counts(facets["experience_categories"]),
+        employment_types=facet_counts(facets["employment_types"]),
+        sources=facet_counts(facets["sources"]),
+        salaries=[
+            SalaryBucketCount(salary_from=bounds[0], salary_to=bounds[1],
+                              count=count)
+            for bounds, count in facets["salaries"]
+        ]
     )
 
 
@@ -650,7 +802,7 @@ async def vacancies(
 })
 async def vacancy(
     id: int,
-    session: Annotated[AsyncSession, Depends(get_async_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ) -> Vacancy:
     """Get a vacancy by ID."""
     db_vacancy = await dbvacancy.get_with_relations(session, id)
@@ -664,10 +816,14 @@ async def vacancy(
         "model": ResumeList,
         "description": "List of all available resumes"
     },
+    400: {
+        "model": ErrorResponse,
+        "description": "Invalid cursor"
+    }
 })
 async def resumes(
     resumes_view: ResumesView,
-    session: Annotated[AsyncSession, Depends(get_async_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ) -> ResumeList:
     """List all available resumes."""
     filter = resumes_view.filter
@@ -695,22 +851,33 @@ async def resumes(
             location_id = db_location.id
     offset = resumes_view.view.offset
     count = resumes_view.view.count
-    db_resumes = await dbresume.search(
-        session,
-        title=filter.title,
-        location_id=location_id,
-        min_salary=filter.salary_min,
-        max_salary=filter.salary_max,
-        experience_category_ids=experience_category_ids,
-        skills=filter.skills,
-        skip=offset,
-        limit=count
-    )
+    try:
+        db_resumes = await dbresume.search(
+            session,
+            title=filter.title,
+            location_id=location_id,
+            min_salary=filter.salary_min,
+            max_salary=filter.salary_max,
+            experience_category_ids=experience_category_ids,
+            skills=filter.skills,
+            skip=offset,
+            limit=count,
+            similar=filter.text_match == TextMatch.similar,
+            similarity_threshold=filter.similarity_threshold,
+            after=view_cursor(resumes_view.view),
+            count_mode=resumes_view.view.count_mode.value,
+            count_cap=resumes_view.view.count_cap
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     resumes = []
     resume_count = 0
+    count_mode = CountMode.exact
+    next_key = None
     if db_resumes:
-        (count, db_resume_list) = db_resumes
-        resume_count = count
+        (total, db_resume_list, next_key) = db_resumes
+        resume_count = total.count
+        count_mode = CountMode(total.mode)
         for db_resume in db_resume_list:
             r_rel = await dbresume.get_with_relations(
                 session,
@@ -724,7 +891,10 @@ async def resumes(
 
     return ResumeList(
         count=resume_count,
-        resumes=resumes
+        count_mode=count_mode,
+        has_more=next_key is not None,
+        resumes=resumes,
+        next_cursor=encode_cursor(next_key) if next_key else None
     )
 
 
@@ -740,7 +910,7 @@ async def resumes(
 })
 async def resume(
     id: int,
-    session: Annotated[AsyncSession, Depends(get_async_session)]
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ) -> Resume:
     """Get a resume by ID."""
     db_resume = await dbresume.get_with_relations(session, id)
@@ -749,6 +919,51 @@ async def resume(
     return db_resume_to_resume(db_resume)
 
 
+async def vacancy_filter_ids(
+    session: AsyncSession,
+    filter: VacancyFilter
+) -> Tuple[Optional[List[int]], Optional[int]]:
+    """Resolve experience category and location IDs of a vacancy filter."""
+    experience_category_ids: Optional[List[int]] = None
+    if filter.experience_categories:
+        experience_category_ids = []
+        for experience_category in filter.experience_categories:
+            db_experience_category = \
+                await get_experience_category_by_name(
+                    session,
+                    experience_category.name
+                )
+            if not db_experience_category:
+                continue
+            experience_category_ids.append(db_experience_category.id)
+    location_id: Optional[int] = None
+    if filter.location:
+        db_location = await get_location_by_region(
+            session,
+            filter.location.region
+        )
+        if db_location:
+            location_id = db_location.id
+    return experience_category_ids, location_id
+
+
+def facet_counts(counts: List[Tuple[str, int]]) -> List[FacetCount]:
+    """Convert database facet counts to API FacetCount list."""
+    return [FacetCount(value=value, count=count) for value, count in counts]
+
+
+def likes_overlap(likes: LikesUpdate) -> List[int]:
+    """Return the IDs that a likes update both likes and unlikes."""
+    return sorted(set(likes.like) & set(likes.unlike))
+
+
+def view_cursor(view: View) -> Optional[List]:
+    """Decode the cursor of a view, `None` in offset mode."""
+    if not view.cursor:
+        return None
+    return decode_cursor(view.cursor)
+
+
 def db_source_to_source(db_source: dbmodels.Source | None) -> Source | None:
     """Convert database Source model to API Source model."""
     if not db_source:
@@ -835,11 +1050,21 @@ def db_timestamp_to_timestamp(
     )
 
 
+def unix_to_datetime(unix_time: Optional[int]) -> Optional[datetime]:
+    """Convert API unix timestamp to an aware datetime."""
+    if unix_time is None:
+        return None
+    return datetime.fromtimestamp(unix_time, tz=timezone.utc)
+
+
 def db_vacancy_to_vacancy(db_vacancy: dbmodels.Vacancy) -> Vacancy:
     """Convert database Vacancy model to API Vacancy model."""
     salary = Salary(
         currency=db_vacancy.salary_currency,
-        value=db_vacancy.salary_value
+        value=db_vacancy.salary_value,
+        period=db_vacancy.salary_period,
+        value_from=db_vacancy.salary_from,
+        value_to=db_vacancy.salary_to
     )
     if db_vacancy.salary_type:
         salary.type = db_vacancy.salary_type.name
@@ -879,6 +1104,25 @@ def vacancy_to_vacancy_short(vacancy: Vacancy) -> VacancyShort:
     )
 
 
+def db_listing_to_vacancy_short(
+    db_listing: dbmodels.VacancyListing
+) -> VacancyShort:
+    """Convert database VacancyListing model to API VacancyShort model."""
+    return VacancyShort(
+        id=db_listing.id,
+        title=db_listing.title,
+        description=db_listing.description,
+        salary=Salary(
+            type=db_listing.salary_type,
+            currency=db_listing.salary_currency,
+            value=db_listing.salary_value,
+            period=db_listing.salary_period,
+            value_from=db_listing.salary_from,
+            value_to=db_listing.salary_to
+        )
+    )
+
+
 def db_resume_to_resume(db_resume: dbmodels.Resume) -> Resume:
     """Convert database Resume model to API Resume model."""
     salary = Salary(
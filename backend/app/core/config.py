@@ -16,6 +16,11 @@ class Settings(BaseSettings):
     PROTOCOL: str = "http"
     APP_NAME: str = "VacancyAggregatorAPI"
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: str = ""
+    """Comma-separated URLs of read replicas of `DATABASE_URL`."""
+    DATABASE_REPLICA_ROUTING: str = "round_robin"
+    """`round_robin` or `least_connections`."""
+    DATABASE_ECHO: bool = False
     JWT_KEY: str
     PROFILE_PICTURE_DIRECTORY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
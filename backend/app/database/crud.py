@@ -1,17 +1,83 @@
 """CRUD operations."""
 
-from typing import List, Optional, Tuple, Type, TypeVar
-from sqlalchemy import select, and_, or_, func
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, \
+    Tuple, Type, TypeVar
+from sqlalchemy import select, and_, or_, func, tuple_, update, delete, \
+    literal, literal_column, bindparam, exists
+from sqlalchemy.dialects.postgresql import Range, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from pydantic import BaseModel
 from .models import (
     User, Vacancy, Resume, Company, Location,
     Specialization, EmploymentType, ExperienceCategory,
-    Source, SalaryType,
+    Source, SalaryType, BackfillTask, VacancySignature, VacancyLshBand,
+    VacancyListing, VacancyKey, CurrencyRate,
     user_favorite_vacancies, user_favorite_resumes,
-    vacancy_employment_type
+    vacancy_employment_type, published_sort_key
 )
+from app.services.cache import TTLCache
+
+
+# Text search configuration of `Vacancy.search_vector`.
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, " \
+    "StartSel=<b>, StopSel=</b>"
+
+# Orders of paginated lists, recorded in their cursors.
+SORT_PUBLISHED = "published"
+SORT_RANK = "rank"
+SORT_SIMILARITY = "similarity"
+SORT_ID = "id"
+
+# Ways to count the matches of a search, see `count_total`.
+COUNT_EXACT = "exact"
+COUNT_CAPPED = "capped"
+COUNT_ESTIMATE = "estimate"
+COUNT_CACHED = "cached"
+COUNT_NONE = "none"
+# Seconds a cached count is served for.
+COUNT_CACHE_TTL = 60
+
+_count_cache = TTLCache(COUNT_CACHE_TTL)
+
+# Seconds cached facet counts are served for.
+FACET_CACHE_TTL = 60
+# Edges of the salary facet buckets, roubles per month.
+SALARY_BUCKETS = (0, 30000, 50000, 80000, 120000, 200000, 300000)
+FACETS = ("locations", "experience_categories", "employment_types",
+          "sources", "salaries")
+
+_facet_cache = TTLCache(FACET_CACHE_TTL)
+
+
+class Total(NamedTuple):
+    """Number of matches of a search and how it was obtained."""
+
+    count: Optional[int]
+    mode: str
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement, keeping its parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        """Wrap *statement*."""
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    """Render `Explain` for PostgreSQL."""
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement,
+                                                       **kw)
 
 
 ModelType = TypeVar('ModelType', bound=BaseModel)
@@ -172,6 +238,232 @@ class CRUDVacancy(CRUDBase):
         )
         return result.scalars().first()
 
+    async def get_existing_external_ids(
+        self,
+        db: AsyncSession,
+        source_name: str,
+        external_ids: List[str]
+    ) -> Set[str]:
+        """
+        Find which external IDs of a source are already stored.
+
+        Args:
+            db (AsyncSession): Async database session.
+            source_name (str): Name of the vacancy source.
+            external_ids (List[str]): External IDs to check.
+
+        Returns:
+            Set[str]: The subset of `external_ids` present in the database.
+        """
+        if not external_ids:
+            return set()
+        result = await db.execute(
+            select(VacancyKey.external_id)
+            .join(Source, VacancyKey.source_id == Source.id)
+            .where(
+                Source.name == source_name,
+                VacancyKey.external_id.in_(external_ids)
+            )
+        )
+        return set(result.scalars().all())
+
+    async def claim_key(
+        self,
+        db: AsyncSession,
+        source_id: Optional[int],
+        external_id: str
+    ) -> Optional[Tuple[int, datetime]]:
+        """
+        Claim the natural key of a vacancy about to be stored.
+
+        The claim is not committed, so it is stored or rolled back
+        together with the vacancy.
+
+        Args:
+            db (AsyncSession): Async database session.
+            source_id (int, optional): ID of the vacancy source.
+            external_id (str): ID of the vacancy at its source.
+
+        Returns:
+            Optional[Tuple[int, datetime]]: ID of the new vacancy and the
+                time its key was claimed, `None` if a vacancy with this
+                key is stored already.
+        """
+        result = await db.execute(
+            insert(VacancyKey)
+            .values(source_id=source_id, external_id=external_id)
+            .on_conflict_do_nothing(
+                index_elements=[VacancyKey.source_id, VacancyKey.external_id]
+            )
+            .returning(VacancyKey.vacancy_id, VacancyKey.first_seen_at)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def find_duplicate_candidates(
+        self,
+        db: AsyncSession,
+        bands: List[int],
+        exclude_id: int,
+        source_id: Optional[int]
+    ) -> List[Tuple[int, Optional[int], bytes]]:
+        """
+        Find vacancies of other sources sharing an LSH bucket.
+
+        Near-identical postings of one source, e.g. templated texts of
+        one employer, are distinct vacancies and never candidates.
+
+        Args:
+            db (AsyncSession): Async database session.
+            bands (List[int]): Bucket key of every band, in band order.
+            exclude_id (int): Vacancy the signature belongs to.
+            source_id (int, optional): Source of that vacancy.
+
+        Returns:
+            List[Tuple[int, Optional[int], bytes]]: ID, canonical ID and
+                stored signature of every candidate.
+        """
+        buckets = select(VacancyLshBand.vacancy_id).where(
+            tuple_(VacancyLshBand.band, VacancyLshBand.bucket).in_(
+                list(enumerate(bands))
+            )
+        )
+        result = await db.execute(
+            select(Vacancy.id, Vacancy.canonical_id,
+                   VacancySignature.signature)
+            .join(VacancySignature, VacancySignature.vacancy_id == Vacancy.id)
+            .where(Vacancy.id.in_(buckets), Vacancy.id != exclude_id,
+                   Vacancy.source_id.is_distinct_from(source_id))
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_unindexed(
+        self,
+        db: AsyncSession,
+        after_id: int,
+        limit: int
+    ) -> List[Tuple]:
+        """
+        Load vacancies stored without a signature, in ID order.
+
+        Args:
+            db (AsyncSession): Async database session.
+            after_id (int): Only vacancies with a greater ID are loaded.
+            limit (int): Maximum number of vacancies.
+
+        Returns:
+            List[Tuple]: ID, source ID, title, company name and
+                description of every vacancy.
+        """
+        result = await db.execute(
+            select(Vacancy.id, Vacancy.source_id, Vacancy.title,
+                   Company.name, Vacancy.description)
+            .outerjoin(Company, Vacancy.company_id == Company.id)
+            .where(
+                Vacancy.id > after_id,
+                ~exists().where(VacancySignature.vacancy_id == Vacancy.id)
+            )
+            .order_by(Vacancy.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def index_signature(
+        self,
+        db: AsyncSession,
+        vacancy_id: int,
+        signature: bytes,
+        bands: List[int],
+        canonical_id: Optional[int] = None
+    ) -> None:
+        """
+        Store a vacancy signature, its LSH buckets and canonical link.
+
+        Runs in the caller's transaction, which stores the vacancy.
+
+        Args:
+            db (AsyncSession): Async database session.
+            vacancy_id (int): ID of the vacancy.
+            signature (bytes): Serialized MinHash signature.
+            bands (List[int]): Bucket key of every band, in band order.
+            canonical_id (int, optional): Vacancy this one duplicates.
+        """
+        db.add(VacancySignature(vacancy_id=vacancy_id, signature=signature))
+        db.add_all(
+            VacancyLshBand(band=band, bucket=bucket, vacancy_id=vacancy_id)
+            for band, bucket in enumerate(bands)
+        )
+        if canonical_id is not None:
+            await db.execute(
+                update(Vacancy)
+                .where(Vacancy.id == vacancy_id)
+                .values(canonical_id=canonical_id)
+            )
+
+    async def get_salary_rows(
+        self,
+        db: AsyncSession,
+        vacancy_ids: List[int]
+    ) -> List[Tuple]:
+        """
+        Load what salary normalization needs for a batch of vacancies.
+
+        Args:
+            db (AsyncSession): Async database session.
+            vacancy_ids (List[int]): IDs of the vacancies.
+
+        Returns:
+            List[Tuple]: ID, source name, salary value, currency, period,
+                range start and range end of every vacancy with a salary.
+        """
+        if not vacancy_ids:
+            return []
+        result = await db.execute(
+            select(Vacancy.id, Source.name, Vacancy.salary_value,
+                   Vacancy.salary_currency, Vacancy.salary_period,
+                   Vacancy.salary_from, Vacancy.salary_to)
+            .outerjoin(Source, Vacancy.source_id == Source.id)
+            .where(
+                Vacancy.id.in_(vacancy_ids),
+                or_(Vacancy.salary_value.is_not(None),
+                    Vacancy.salary_from.is_not(None),
+                    Vacancy.salary_to.is_not(None))
+            )
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def set_normalized_salaries(
+        self,
+        db: AsyncSession,
+        salaries: Dict[int, Tuple[Optional[Decimal], Optional[Range]]]
+    ) -> None:
+        """
+        Store normalized monthly salaries in one bulk update.
+
+        Not committed, the listing rows are refreshed in the same
+        transaction.
+
+        Args:
+            db (AsyncSession): Async database session.
+            salaries (Dict[int, Tuple]): Roubles per month and the range
+                of roubles per month by vacancy ID.
+        """
+        if not salaries:
+            return
+        # a Core executemany keyed by the ID alone; the ORM bulk update
+        # wants the whole primary key, partition key included
+        table = Vacancy.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(salary_monthly_rub=bindparam("b_amount"),
+                    salary_range=bindparam("b_range")),
+            [{"b_id": vacancy_id,
+              "b_amount": amount,
+              "b_range": salary_range}
+             for vacancy_id, (amount, salary_range) in salaries.items()]
+        )
+
     async def search(
         self,
         session: AsyncSession,
@@ -181,51 +473,438 @@ class CRUDVacancy(CRUDBase):
         experience_category_ids: Optional[List[int]] = None,
         location_id: Optional[int] = None,
         offset: int = 0,
-        limit: int = 20
-    ):
+        limit: int = 20,
+        collapse_duplicates: bool = False,
+        similar: bool = False,
+        similarity_threshold: float = 0.4,
+        query: Optional[str] = None,
+        published_from: Optional[datetime] = None,
+        published_to: Optional[datetime] = None,
+        after: Optional[List] = None,
+        count_mode: str = COUNT_EXACT,
+        count_cap: int = 1000
+    ) -> Tuple[Total, List[Vacancy], Optional[List]]:
         """
         Search for vacancies with various filters.
 
         Args:
             session (AsyncSession): Async database session.
             title (str, optional): Vacancy title to search.
-            min_salary (int, optional): Minimum salary.
-            max_salary (int, optional): Maximum salary.
+            min_salary (int, optional): Minimum salary, roubles per month.
+            max_salary (int, optional): Maximum salary, roubles per month.
+                Vacancies whose salary range overlaps the requested one
+                match.
             experience_category_id (int, optional): Experience filter.
             location_id (int, optional): Location filter.
             offset (int): Pagination offset.
             limit (int): Pagination limit.
+            collapse_duplicates (bool): Only return canonical vacancies,
+                hiding the copies of a job posted on several sources.
+            similar (bool): Match titles by trigram word similarity,
+                tolerating typos, most similar first.
+            similarity_threshold (float): Minimal word similarity in
+                `similar` mode.
+            query (str, optional): Full-text query in web search syntax
+                over title, company and description, most relevant
+                first.
+            published_from (datetime, optional): Publication window
+                start, inclusive. Only the partitions of the window are
+                scanned.
+            published_to (datetime, optional): Publication window end,
+                exclusive.
+            after (List, optional): Sort key of the last vacancy of the
+                previous page, replaces `offset`.
+            count_mode (str): How the total is counted, see `count_total`.
+            count_cap (int): Matches counted at most in `capped` mode.
 
         Returns:
-            (int, List[Vacancy]): List of matching vacancies with total count.
+            (Total, List[Vacancy], List): Total count, the page of
+                matching vacancies, newest first unless ranked, and the
+                sort key of its last vacancy if more follow.
         """
-        query = select(Vacancy).options(
+        if query:
+            mode = SORT_RANK
+            sort_key = func.ts_rank_cd(Vacancy.search_vector,
+                                       ts_query(query))
+        elif title and similar:
+            mode = SORT_SIMILARITY
+            sort_key = func.word_similarity(title, Vacancy.title)
+        else:
+            mode = SORT_PUBLISHED
+            sort_key = published_sort_key(Vacancy.published_at)
+
+        statement = select(Vacancy, sort_key).options(
             joinedload(Vacancy.company),
             joinedload(Vacancy.location)
         )
 
-        if experience_category_ids:
-            query = query.where(
-                Vacancy.experience_category_id.in_(experience_category_ids)
+        statement = statement.where(*await vacancy_conditions(
+            session, Vacancy, title, min_salary, max_salary,
+            experience_category_ids, location_id, collapse_duplicates,
+            similar, similarity_threshold, published_from, published_to,
+            query
+        ))
+
+        total_count = await count_total(
+            session,
+            statement.with_only_columns(Vacancy.id),
+            count_mode,
+            count_cap,
+            (
+                Vacancy.__tablename__, title, min_salary, max_salary,
+                tuple(sorted(experience_category_ids or ())), location_id,
+                collapse_duplicates, similar and similarity_threshold, query,
+                published_from, published_to
             )
-        if location_id:
-            query = query.where(Vacancy.location_id == location_id)
-        if title:
-            query = query.where(Vacancy.title.ilike(f"%{title}%"))
-        if min_salary is not None:
-            query = query.where(Vacancy.salary_value >= min_salary)
-        if max_salary is not None:
-            query = query.where(Vacancy.salary_value <= max_salary)
+        )
+
+        statement = keyset_page(statement, mode, sort_key, Vacancy.id,
+                                after, offset, limit)
+        rows = (await session.execute(statement)).all()
+        return (total_count, [row[0] for row in rows[:limit]],
+                next_page_key(mode, rows, limit))
+
+    async def headlines(
+        self,
+        session: AsyncSession,
+        ids: List[int],
+        query: str
+    ) -> Dict[int, str]:
+        """
+        Highlight the terms of a full-text query in vacancy descriptions.
+
+        Args:
+            session (AsyncSession): Async database session.
+            ids (List[int]): IDs of the vacancies, usually a result page.
+            query (str): Full-text query in web search syntax.
+
+        Returns:
+            Dict[int, str]: Description fragments by vacancy ID, matching
+                terms wrapped in `<b>`.
+        """
+        if not ids:
+            return {}
+        result = await session.execute(
+            select(Vacancy.id, func.ts_headline(
+                SEARCH_CONFIG,
+                # markup would leak into the fragments
+                func.regexp_replace(func.coalesce(Vacancy.description, ""),
+                                    "<[^>]+>", " ", "g"),
+                ts_query(query),
+                HEADLINE_OPTIONS
+            ))
+            .where(Vacancy.id.in_(ids))
+        )
+        return {id: headline for id, headline in result.all()}
+
+    async def facets(
+        self,
+        session: AsyncSession,
+        title: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        max_salary: Optional[int] = None,
+        experience_category_ids: Optional[List[int]] = None,
+        location_id: Optional[int] = None,
+        collapse_duplicates: bool = False,
+        similar: bool = False,
+        similarity_threshold: float = 0.4,
+        published_from: Optional[datetime] = None,
+        published_to: Optional[datetime] = None,
+        query: Optional[str] = None
+    ) -> Dict[str, List[Tuple]]:
+        """
+        Count the vacancies matching a filter by facet value.
+
+        All facets are counted in one `GROUPING SETS` query, cached for
+        `FACET_CACHE_TTL` seconds by the normalized filter. See `search`
+        for the arguments.
+
+        Returns:
+            Dict[str, List[Tuple]]: `(value, count)` pairs by facet name
+                of `FACETS`, most frequent first. Values of `salaries`
+                are `(from, to)` bounds in roubles per month, `None` if
+                unbounded. Vacancies without a value are not counted.
+        """
+        cache_key = (
+            title, min_salary, max_salary,
+            tuple(sorted(experience_category_ids or ())), location_id,
+            collapse_duplicates, similar and similarity_threshold,
+            published_from, published_to, query
+        )
+        cached = _facet_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # the edges are inlined, so the bucket expression of the select
+        # list and the grouping sets is literally the same
+        edges = ", ".join(str(edge) for edge in SALARY_BUCKETS)
+        bucket = func.width_bucket(
+            Vacancy.salary_monthly_rub,
+            literal_column(f"ARRAY[{edges}]::numeric[]")
+        )
+        columns = [Location.region, ExperienceCategory.name,
+                   EmploymentType.name, Source.name, bucket]
+        statement = (
+            select(*columns, func.grouping(*columns),
+                   func.count(Vacancy.id.distinct()))
+            .select_from(Vacancy)
+            .outerjoin(Location, Vacancy.location_id == Location.id)
+            .outerjoin(ExperienceCategory,
+                       Vacancy.experience_category_id ==
+                       ExperienceCategory.id)
+            .outerjoin(vacancy_employment_type,
+                       vacancy_employment_type.c.vacancy_id == Vacancy.id)
+            .outerjoin(EmploymentType,
+                       vacancy_employment_type.c.employment_type_id ==
+                       EmploymentType.id)
+            .outerjoin(Source, Vacancy.source_id == Source.id)
+            .where(*await vacancy_conditions(
+                session, Vacancy, title, min_salary, max_salary,
+                experience_category_ids, location_id, collapse_duplicates,
+                similar, similarity_threshold, published_from,
+                published_to, query
+            ))
+            .group_by(func.grouping_sets(*columns))
+        )
+        result = await session.execute(statement)
+
+        facets = {name: [] for name in FACETS}
+        for row in result.all():
+            # GROUPING() sets the bits of the columns not grouped by, the
+            # first column being the most significant one
+            grouping = row[len(columns)]
+            index = next(i for i in range(len(columns))
+                         if not grouping >> (len(columns) - 1 - i) & 1)
+            value = row[index]
+            if value is None:
+                continue
+            if FACETS[index] == "salaries":
+                value = (SALARY_BUCKETS[value - 1] if value > 0 else None,
+                         SALARY_BUCKETS[value]
+                         if value < len(SALARY_BUCKETS) else None)
+            facets[FACETS[index]].append((value, row[-1]))
+        for counts in facets.values():
+            counts.sort(key=lambda count: count[1], reverse=True)
+        _facet_cache.set(cache_key, facets)
+        return facets
+
+
+class CRUDVacancyListing(CRUDBase):
+    """CRUD operations for the VacancyListing read model."""
+
+    def __init__(self):
+        """Initialize CRUDVacancyListing."""
+        super().__init__(VacancyListing)
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        vacancy_ids: List[int]
+    ) -> None:
+        """
+        Upsert the listing rows of changed vacancies.
+
+        Not committed, so the listing rows change in the same
+        transaction as the vacancies they copy.
+
+        Args:
+            db (AsyncSession): Async database session.
+            vacancy_ids (List[int]): IDs of the vacancies to copy.
+        """
+        if not vacancy_ids:
+            return
+        rows = (
+            select(
+                Vacancy.id, Vacancy.published_at, Vacancy.title,
+                Vacancy.description, Company.name, Location.region,
+                SalaryType.name, Vacancy.salary_currency,
+                Vacancy.salary_value, Vacancy.salary_period,
+                Vacancy.salary_from, Vacancy.salary_to,
+                Vacancy.salary_range, Vacancy.experience_category_id,
+                Vacancy.location_id, Vacancy.canonical_id
+            )
+            .outerjoin(Company, Vacancy.company_id == Company.id)
+            .outerjoin(Location, Vacancy.location_id == Location.id)
+            .outerjoin(SalaryType, Vacancy.salary_type_id == SalaryType.id)
+            .where(Vacancy.id.in_(vacancy_ids))
+        )
+        columns = [column.name for column in VacancyListing.__table__.c]
+        statement = insert(VacancyListing).from_select(columns, rows)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[VacancyListing.id],
+            set_={name: statement.excluded[name]
+                  for name in columns if name != "id"}
+        ))
+
+    async def search(
+        self,
+        session: AsyncSession,
+        title: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        max_salary: Optional[int] = None,
+        experience_category_ids: Optional[List[int]] = None,
+        location_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+        collapse_duplicates: bool = False,
+        similar: bool = False,
+        similarity_threshold: float = 0.4,
+        published_from: Optional[datetime] = None,
+        published_to: Optional[datetime] = None,
+        after: Optional[List] = None,
+        count_mode: str = COUNT_EXACT,
+        count_cap: int = 1000
+    ) -> Tuple[Total, List[VacancyListing], Optional[List]]:
+        """
+        Search the vacancy listing, see `CRUDVacancy.search`.
+
+        Full-text queries are not supported, they need `Vacancy`.
+
+        Returns:
+            (Total, List[VacancyListing], List): Total count, the page of
+                matching listing rows, newest first unless ordered by
+                similarity, and the sort key of its last row if more
+                follow.
+        """
+        if title and similar:
+            mode = SORT_SIMILARITY
+            sort_key = func.word_similarity(title, VacancyListing.title)
+        else:
+            mode = SORT_PUBLISHED
+            sort_key = VacancyListing.published_at
+
+        statement = select(VacancyListing, sort_key)
+
+        statement = statement.where(*await vacancy_conditions(
+            session, VacancyListing, title, min_salary, max_salary,
+            experience_category_ids, location_id, collapse_duplicates,
+            similar, similarity_threshold, published_from, published_to
+        ))
+
+        total_count = await count_total(
+            session,
+            statement.with_only_columns(VacancyListing.id),
+            count_mode,
+            count_cap,
+            (
+                VacancyListing.__tablename__, title, min_salary, max_salary,
+                tuple(sorted(experience_category_ids or ())), location_id,
+                collapse_duplicates, similar and similarity_threshold,
+                published_from, published_to
+            )
+        )
+
+        statement = keyset_page(statement, mode, sort_key, VacancyListing.id,
+                                after, offset, limit)
+        rows = (await session.execute(statement)).all()
+        return (total_count, [row[0] for row in rows[:limit]],
+                next_page_key(mode, rows, limit))
+
+
+class CRUDBackfillTask(CRUDBase):
+    """Persistent queue of vacancy detail fetches."""
+
+    def __init__(self):
+        """Initialize CRUDBackfillTask."""
+        super().__init__(BackfillTask)
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        vacancy_id: int,
+        priority: Optional[datetime] = None
+    ) -> None:
+        """
+        Queue a detail fetch for a vacancy unless one is already queued.
+
+        Runs in the caller's transaction, which stores the vacancy.
+
+        Args:
+            db (AsyncSession): Async database session.
+            vacancy_id (int): ID of the vacancy to backfill.
+            priority (datetime, optional): Usually the publication time,
+                later values are fetched first.
+        """
+        await db.execute(
+            insert(BackfillTask)
+            .values(vacancy_id=vacancy_id, priority=priority)
+            .on_conflict_do_nothing(index_elements=["vacancy_id"])
+        )
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        limit: int
+    ) -> List[BackfillTask]:
+        """
+        Lock the most urgent due tasks for the current transaction.
+
+        Tasks locked by other workers are skipped, so several workers can
+        drain the queue concurrently. The locks are held until commit.
+
+        Args:
+            db (AsyncSession): Async database session.
+            limit (int): Maximum number of tasks to claim.
 
-        total_count = await session.scalar(
-            select(func.count()).select_from(query.subquery())
+        Returns:
+            List[BackfillTask]: Claimed tasks with their vacancies loaded.
+        """
+        result = await db.execute(
+            select(BackfillTask)
+            .options(joinedload(BackfillTask.vacancy, innerjoin=True))
+            .where(BackfillTask.not_before <= func.now())
+            .order_by(BackfillTask.priority.desc().nullslast())
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=BackfillTask)
         )
+        return list(result.scalars().all())
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        task: BackfillTask,
+        description: Optional[str],
+        contacts: Optional[str]
+    ) -> None:
+        """
+        Store fetched details on the vacancy and drop the task.
 
-        query = query.offset(offset).limit(limit)
+        Args:
+            db (AsyncSession): Async database session.
+            task (BackfillTask): Claimed task.
+            description (str, optional): Full vacancy description.
+            contacts (str, optional): Serialized contacts.
+        """
+        task.vacancy.description = description
+        task.vacancy.contacts = contacts
+        await db.delete(task)
+
+    async def fail(
+        self,
+        db: AsyncSession,
+        task: BackfillTask,
+        error: str,
+        max_attempts: int
+    ) -> None:
+        """
+        Reschedule a failed task with exponential backoff.
+
+        The task is dropped after `max_attempts` attempts, leaving the
+        vacancy with its snippet description.
 
-        result = await session.execute(query)
-        vacancies = result.scalars().all()
-        return total_count, vacancies
+        Args:
+            db (AsyncSession): Async database session.
+            task (BackfillTask): Claimed task.
+            error (str): Failure reason.
+            max_attempts (int): Attempts before giving up.
+        """
+        task.attempts += 1
+        if task.attempts >= max_attempts:
+            await db.delete(task)
+            return
+        task.last_error = error
+        task.not_before = datetime.now(timezone.utc) + timedelta(
+            minutes=2 ** task.attempts)
 
 
 class CRUDResume(CRUDBase):
@@ -275,8 +954,13 @@ class CRUDResume(CRUDBase):
         location_id: Optional[int] = None,
         skills: Optional[List[str]] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[int, List[Resume]]:
+        limit: int = 100,
+        similar: bool = False,
+        similarity_threshold: float = 0.4,
+        after: Optional[List] = None,
+        count_mode: str = COUNT_EXACT,
+        count_cap: int = 1000
+    ) -> Tuple[Total, List[Resume], Optional[List]]:
         """
         Search resumes using various filters.
 
@@ -291,24 +975,36 @@ class CRUDResume(CRUDBase):
             skills (List[str], optional): Required skills (partial match).
             skip (int): Pagination offset.
             limit (int): Pagination limit.
+            similar (bool): Match the title and skills by trigram word
+                similarity, tolerating typos, most similar first.
+            similarity_threshold (float): Minimal word similarity in
+                `similar` mode.
+            after (List, optional): Sort key of the last resume of the
+                previous page, replaces `skip`.
+            count_mode (str): How the total is counted, see `count_total`.
+            count_cap (int): Matches counted at most in `capped` mode.
 
         Returns:
-            (int, List[Resume]): Filtered list of resumes with total count.
+            (Total, List[Resume], List): Total count, the page of matching
+                resumes, newest first unless ranked, and the sort key of
+                its last resume if more follow.
         """
-        query = select(Resume).options(
-            joinedload(Resume.location),
-            joinedload(Resume.specialization)
-        )
+        if similar and (title or skills):
+            await set_similarity_threshold(db, similarity_threshold)
 
         filters = []
-        if title:
+        scores = []
+        if title and similar:
+            filters.append(word_similar(Resume.title, title))
+            scores.append(func.word_similarity(title, Resume.title))
+        elif title:
             filters.append(Resume.title.ilike(f"%{title}%"))
         if specialization_id:
             filters.append(Resume.specialization_id == specialization_id)
-        if min_salary:
-            filters.append(Resume.salary_value >= min_salary)
-        if max_salary:
-            filters.append(Resume.salary_value <= max_salary)
+        if min_salary or max_salary:
+            filters.append(Resume.salary_range.overlaps(
+                Range(min_salary or None, max_salary or None, bounds="[]")
+            ))
         if experience_category_ids:
             experience_category_filters = [
                 Resume.experience_category_id == id
@@ -317,27 +1013,52 @@ class CRUDResume(CRUDBase):
             filters.append(or_(*experience_category_filters))
         if location_id:
             filters.append(Resume.location_id == location_id)
-        if skills:
+        if skills and similar:
+            filters.append(or_(*(
+                word_similar(Resume.skills_text, skill) for skill in skills
+            )))
+            scores.extend(
+                func.word_similarity(skill, Resume.skills_text)
+                for skill in skills
+            )
+        elif skills:
             skill_filters = [
                 Resume.skills_text.ilike(f"%{skill}%") for skill in skills
             ]
             filters.append(or_(*skill_filters))
 
-        if filters:
-            query = query.where(and_(*filters))
+        if scores:
+            mode = SORT_SIMILARITY
+            sort_key = func.greatest(*scores)
+        else:
+            mode = SORT_PUBLISHED
+            sort_key = published_sort_key(Resume.published_at)
 
-        count_query = select(func.count()).select_from(Resume)
+        query = select(Resume, sort_key).options(
+            joinedload(Resume.location),
+            joinedload(Resume.specialization)
+        )
         if filters:
-            count_query = count_query.where(and_(*filters))
+            query = query.where(and_(*filters))
 
-        total = await db.execute(count_query)
-        result = await db.execute(
-            query
-            .offset(skip)
-            .limit(limit)
+        total = await count_total(
+            db,
+            query.with_only_columns(Resume.id),
+            count_mode,
+            count_cap,
+            (
+                Resume.__tablename__, title, specialization_id, min_salary,
+                max_salary, tuple(sorted(experience_category_ids or ())),
+                location_id, tuple(sorted(skills or ())),
+                similar and similarity_threshold
+            )
         )
+        query = keyset_page(query, mode, sort_key, Resume.id, after, skip,
+                            limit)
+        rows = (await db.execute(query)).all()
 
-        return (total.scalar_one(), result.scalars().all())
+        return (total, [row[0] for row in rows[:limit]],
+                next_page_key(mode, rows, limit))
 
 
 class CRUDUser(CRUDBase):
@@ -381,69 +1102,37 @@ class CRUDUser(CRUDBase):
         )
         return result.scalars().first()
 
-    async def add_favorite_vacancy(
-        self,
-        db: AsyncSession,
-        user_id: int,
-        vacancy_id: int
-    ) -> Optional[User]:
-        """
-        Add a vacancy to user's favorites.
-
-        Args:
-            db (AsyncSession): Async database session.
-            user_id (int): ID of the user.
-            vacancy_id (int): ID of the vacancy.
-
-        Returns:
-            Optional[User]: Updated user object.
-        """
-        user = await self.get(db, id=user_id)
-        if user:
-            stmt = select(Vacancy).where(Vacancy.id == vacancy_id)
-            result = await db.execute(stmt)
-            vacancy = result.scalars().first()
-            if vacancy:
-                user.favorite_vacancies.append(vacancy)
-                await db.commit()
-                await db.refresh(user)
-        return user
-
-    async def remove_favorite_vacancy(
+    async def update_favorite_vacancies(
         self,
         db: AsyncSession,
         user_id: int,
-        vacancy_id: int
-    ) -> Optional[User]:
+        like: Sequence[int] = (),
+        unlike: Sequence[int] = ()
+    ) -> Set[int]:
         """
-        Remove a vacancy from user's favorites.
+        Add and remove vacancies of user's favorites in one transaction.
 
         Args:
             db (AsyncSession): Async database session.
             user_id (int): ID of the user.
-            vacancy_id (int): ID of the vacancy.
+            like (Sequence[int]): IDs of the vacancies to add.
+            unlike (Sequence[int]): IDs of the vacancies to remove.
 
         Returns:
-            Optional[User]: Updated user object.
+            Set[int]: IDs of `like` vacancies that exist, whether or not
+                they were favorites already.
         """
-        user = await self.get(db, id=user_id)
-        if user:
-            stmt = select(Vacancy).where(Vacancy.id == vacancy_id)
-            result = await db.execute(stmt)
-            vacancy = result.scalars().first()
-            if vacancy and vacancy in user.favorite_vacancies:
-                user.favorite_vacancies.remove(vacancy)
-                await db.commit()
-                await db.refresh(user)
-        return user
+        return await _update_favorites(db, user_favorite_vacancies, Vacancy,
+                                       user_id, like, unlike)
 
     async def get_favorite_vacancies(
         self,
         db: AsyncSession,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[int, List[Vacancy]]:
+        limit: int = 100,
+        after: Optional[List] = None
+    ) -> Tuple[int, List[Vacancy], Optional[List]]:
         """
         Retrieve user's favorite vacancies.
 
@@ -452,93 +1141,70 @@ class CRUDUser(CRUDBase):
             user_id (int): ID of the user.
             skip (int): Offset for pagination.
             limit (int): Max number of results.
+            after (List, optional): Sort key of the last vacancy of the
+                previous page, replaces `skip`.
 
         Returns:
-            (int, List[Vacancy]): Total count and paginated list
-            of favorite vacancies.
+            (int, List[Vacancy], List): Total count, paginated list
+            of favorite vacancies, newest ID first, and the sort key of
+            its last vacancy if more follow.
         """
         user = await self.get(db, id=user_id)
         if not user:
-            return (0, [])
-
-        result = await db.execute(
-            select(Vacancy)
-            .join(user_favorite_vacancies)
+            return (0, [], None)
+
+        sort_key = user_favorite_vacancies.c.vacancy_id
+        # favorites of archived vacancies are kept but not listed, the
+        # count goes through the same join as the page
+        favorites = (
+            select(Vacancy, sort_key)
+            .join(user_favorite_vacancies,
+                  user_favorite_vacancies.c.vacancy_id == Vacancy.id)
             .where(user_favorite_vacancies.c.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
         )
+        result = await db.execute(keyset_page(
+            favorites, SORT_ID, sort_key, sort_key, after, skip, limit
+        ))
+        rows = result.all()
         count_result = await db.execute(
             select(func.count())
-            .select_from(user_favorite_vacancies)
-            .where(user_favorite_vacancies.c.user_id == user_id)
+            .select_from(favorites.with_only_columns(sort_key).subquery())
         )
 
-        return (count_result.scalar_one(), result.scalars().all())
-
-    async def add_favorite_resume(
-        self,
-        db: AsyncSession,
-        user_id: int,
-        resume_id: int
-    ) -> Optional[User]:
-        """
-        Add a resume to user's favorites.
-
-        Args:
-            db (AsyncSession): Async database session.
-            user_id (int): ID of the user.
-            resume_id (int): ID of the resume.
+        return (count_result.scalar_one(), [row[0] for row in rows[:limit]],
+                next_page_key(SORT_ID, rows, limit))
 
-        Returns:
-            Optional[User]: Updated user object.
-        """
-        user = await self.get(db, id=user_id)
-        if user:
-            stmt = select(Resume).where(Resume.id == resume_id)
-            result = await db.execute(stmt)
-            resume = result.scalars().first()
-            if resume:
-                user.favorite_resumes.append(resume)
-                await db.commit()
-                await db.refresh(user)
-        return user
-
-    async def remove_favorite_resume(
+    async def update_favorite_resumes(
         self,
         db: AsyncSession,
         user_id: int,
-        resume_id: int
-    ) -> Optional[User]:
+        like: Sequence[int] = (),
+        unlike: Sequence[int] = ()
+    ) -> Set[int]:
         """
-        Remove a resume from user's favorites.
+        Add and remove resumes of user's favorites in one transaction.
 
         Args:
             db (AsyncSession): Async database session.
             user_id (int): ID of the user.
-            resume_id (int): ID of the resume.
+            like (Sequence[int]): IDs of the resumes to add.
+            unlike (Sequence[int]): IDs of the resumes to remove.
 
         Returns:
-            Optional[User]: Updated user object.
+            Set[int]: IDs of `like` resumes that exist, whether or not
+                they were favorites already.
         """
-        user = await self.get(db, id=user_id)
-        if user:
-            stmt = select(Resume).where(Resume.id == resume_id)
-            result = await db.execute(stmt)
-            resume = result.scalars().first()
-            if resume and resume in user.favorite_resumes:
-                user.favorite_resumes.remove(resume)
-                await db.commit()
-                await db.refresh(user)
-        return user
+        return await _update_favorites(db, user_favorite_resumes, Resume,
+                                       user_id, like, unlike)
 
     async def get_favorite_resumes(
         self,
         db: AsyncSession,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[int, List[Resume]]:
+        limit: int = 100,
+        after: Optional[List] = None
+    ) -> Tuple[int, List[Resume], Optional[List]]:
         """
         Retrieve user's favorite resumes with related data.
 
@@ -547,33 +1213,74 @@ class CRUDUser(CRUDBase):
             user_id (int): ID of the user.
             skip (int): Pagination offset.
             limit (int): Pagination limit.
+            after (List, optional): Sort key of the last resume of the
+                previous page, replaces `skip`.
 
         Returns:
-            List[Resume]: Total count and paginated list
-            of favorite resumes.
+            (int, List[Resume], List): Total count, paginated list
+            of favorite resumes, newest ID first, and the sort key of
+            its last resume if more follow.
         """
         user = await self.get(db, id=user_id)
         if not user:
-            return (0, [])
+            return (0, [], None)
 
-        result = await db.execute(
-            select(Resume)
+        sort_key = user_favorite_resumes.c.resume_id
+        result = await db.execute(keyset_page(
+            select(Resume, sort_key)
             .options(
                 joinedload(Resume.location),
                 joinedload(Resume.specialization),
                 joinedload(Resume.experience_category)
             )
             .join(user_favorite_resumes)
-            .where(user_favorite_resumes.c.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-        )
+            .where(user_favorite_resumes.c.user_id == user_id),
+            SORT_ID, sort_key, sort_key, after, skip, limit
+        ))
+        rows = result.all()
         count_result = await db.execute(
             select(func.count())
             .select_from(user_favorite_resumes)
             .where(user_favorite_resumes.c.user_id == user_id)
         )
-        return (count_result.scalar_one(), result.scalars().unique().all())
+        return (count_result.scalar_one(), [row[0] for row in rows[:limit]],
+                next_page_key(SORT_ID, rows, limit))
+
+
+async def _update_favorites(
+    db: AsyncSession,
+    table,
+    model: Type[ModelType],
+    user_id: int,
+    like: Sequence[int],
+    unlike: Sequence[int]
+) -> Set[int]:
+    """
+    Insert and delete favorites of a user in one transaction.
+
+    The second column of `table` references `model`. Present favorites
+    are skipped. Returns the IDs of the `like` rows that exist.
+    """
+    user_column, item_column = table.c
+    found_ids = set()
+    if unlike:
+        await db.execute(
+            delete(table)
+            .where(user_column == user_id, item_column.in_(unlike))
+        )
+    if like:
+        found = select(model.id).where(model.id.in_(like)).cte("found")
+        added = (
+            insert(table)
+            .from_select([user_column.name, item_column.name],
+                         select(literal(user_id), found.c.id))
+            .on_conflict_do_nothing()
+            .cte("added")
+        )
+        result = await db.execute(select(found.c.id).add_cte(added))
+        found_ids = set(result.scalars().all())
+    await db.commit()
+    return found_ids
 
 
 async def get_experience_category_by_name(
@@ -588,6 +1295,200 @@ async def get_experience_category_by_name(
     return result.scalars().first()
 
 
+async def get_currency_rates(
+    db: AsyncSession
+) -> List[Tuple[str, Decimal]]:
+    """Get the rouble exchange rate of every known currency."""
+    result = await db.execute(select(CurrencyRate.code, CurrencyRate.rate))
+    return [tuple(row) for row in result.all()]
+
+
+async def count_total(
+    db: AsyncSession,
+    statement,
+    mode: str = COUNT_EXACT,
+    cap: int = 1000,
+    cache_key: Optional[Tuple] = None
+) -> Total:
+    """
+    Count the rows of a query.
+
+    Args:
+        db (AsyncSession): Async database session.
+        statement: Query whose rows are counted.
+        mode (str): `exact` counts every row; `capped` counts up to
+            `cap` rows, reporting `cap` in `capped` mode when there are
+            more; `estimate` reads the planner row estimate; `cached`
+            serves an exact count from a TTL cache keyed by `cache_key`;
+            `none` skips counting.
+        cap (int): Rows counted at most in `capped` mode.
+        cache_key (Tuple, optional): Normalized filter of the query.
+
+    Returns:
+        Total: The count and the mode it was obtained in.
+    """
+    if mode == COUNT_NONE:
+        return Total(None, COUNT_NONE)
+    if mode == COUNT_ESTIMATE:
+        plan = (await db.execute(Explain(statement))).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return Total(int(plan[0]["Plan"]["Plan Rows"]), COUNT_ESTIMATE)
+    if mode == COUNT_CAPPED:
+        count = await db.scalar(
+            select(func.count())
+            .select_from(statement.limit(cap + 1).subquery())
+        )
+        if count > cap:
+            return Total(cap, COUNT_CAPPED)
+        return Total(count, COUNT_EXACT)
+    if mode == COUNT_CACHED and cache_key is not None:
+        count = _count_cache.get(cache_key)
+        if count is not None:
+            return Total(count, COUNT_CACHED)
+    count = await db.scalar(
+        select(func.count()).select_from(statement.subquery())
+    )
+    if cache_key is not None:
+        _count_cache.set(cache_key, count)
+    return Total(count, COUNT_EXACT)
+
+
+def keyset_page(statement, mode: str, sort_key, id_column,
+                after: Optional[List], offset: int, limit: int):
+    """
+    Order a query by a sort key and ID, descending, and select one page.
+
+    Pages after the sort key `[mode, value, id]` of the previous page
+    with a row comparison the matching index serves as a range scan, or
+    by `offset` without one. One row more than `limit` is fetched to
+    tell whether another page follows.
+
+    Raises:
+        ValueError: `after` belongs to another sort mode or is malformed.
+    """
+    if after is not None:
+        if len(after) != 3 or after[0] != mode:
+            raise ValueError(f"Cursor does not match the {mode} order")
+        value = after[1]
+        if not isinstance(after[2], int) or isinstance(after[2], bool):
+            raise ValueError("Invalid cursor")
+        if mode == SORT_PUBLISHED:
+            try:
+                value = datetime.fromisoformat(value) if value \
+                    else literal_column("'-infinity'::timestamptz")
+            except TypeError as e:
+                # a tampered cursor carries a non-string date
+                raise ValueError("Invalid cursor") from e
+        elif sort_key is not id_column and (
+            not isinstance(value, (int, float)) or isinstance(value, bool)
+        ):
+            raise ValueError("Invalid cursor")
+        if sort_key is id_column:
+            statement = statement.where(id_column < after[2])
+        else:
+            statement = statement.where(
+                tuple_(sort_key, id_column) < tuple_(value, after[2]))
+    else:
+        statement = statement.offset(offset)
+    if sort_key is id_column:
+        return statement.order_by(id_column.desc()).limit(limit + 1)
+    return statement.order_by(sort_key.desc(), id_column.desc()) \
+        .limit(limit + 1)
+
+
+def next_page_key(mode: str, rows, limit: int) -> Optional[List]:
+    """
+    Return the sort key of the last row of a `keyset_page` page.
+
+    `None` if no page follows. Rows are `(entity, sort key value)`.
+    """
+    if len(rows) <= limit:
+        return None
+    entity, value = rows[limit - 1]
+    if mode == SORT_PUBLISHED:
+        value = entity.published_at.isoformat() \
+            if entity.published_at else None
+    return [mode, value, entity.id]
+
+
+def ts_query(query: str):
+    """Parse a full-text query in web search syntax."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+
+def word_similar(column, text: str):
+    """
+    Match rows where *text* is similar to a word sequence of *column*.
+
+    Uses the `%>` operator of `pg_trgm`, served by the trigram index of
+    the column, with the threshold of `set_similarity_threshold`.
+    """
+    return column.op("%>")(text)
+
+
+async def set_similarity_threshold(db: AsyncSession, threshold: float):
+    """
+    Set the word similarity threshold for the current transaction.
+
+    Args:
+        db (AsyncSession): Async database session.
+        threshold (float): Minimal word similarity, from 0 to 1.
+    """
+    await db.execute(select(func.set_config(
+        "pg_trgm.word_similarity_threshold", str(threshold), True
+    )))
+
+
+async def vacancy_conditions(
+    db: AsyncSession,
+    model: Type[ModelType],
+    title: Optional[str] = None,
+    min_salary: Optional[int] = None,
+    max_salary: Optional[int] = None,
+    experience_category_ids: Optional[List[int]] = None,
+    location_id: Optional[int] = None,
+    collapse_duplicates: bool = False,
+    similar: bool = False,
+    similarity_threshold: float = 0.4,
+    published_from: Optional[datetime] = None,
+    published_to: Optional[datetime] = None,
+    query: Optional[str] = None
+) -> List:
+    """
+    Build the WHERE conditions of a vacancy filter.
+
+    Works on `Vacancy` and `VacancyListing`, which share the filtered
+    columns; `query` needs the search vector of `Vacancy`. See
+    `CRUDVacancy.search` for the arguments.
+    """
+    conditions = []
+    if experience_category_ids:
+        conditions.append(
+            model.experience_category_id.in_(experience_category_ids))
+    if location_id:
+        conditions.append(model.location_id == location_id)
+    # bare comparisons on the partition key let the planner prune
+    if published_from is not None:
+        conditions.append(model.published_at >= published_from)
+    if published_to is not None:
+        conditions.append(model.published_at < published_to)
+    if title and similar:
+        await set_similarity_threshold(db, similarity_threshold)
+        conditions.append(word_similar(model.title, title))
+    elif title:
+        conditions.append(model.title.ilike(f"%{title}%"))
+    if min_salary is not None or max_salary is not None:
+        conditions.append(model.salary_range.overlaps(
+            Range(min_salary, max_salary, bounds="[]")
+        ))
+    if collapse_duplicates:
+        conditions.append(model.canonical_id.is_(None))
+    if query:
+        conditions.append(model.search_vector.op("@@")(ts_query(query)))
+    return conditions
+
+
 async def get_location_by_region(
     db: AsyncSession,
     region: str
@@ -603,6 +1504,8 @@ async def get_location_by_region(
 # CRUD instances
 user = CRUDUser()
 vacancy = CRUDVacancy()
+vacancy_listing = CRUDVacancyListing()
+backfill_task = CRUDBackfillTask()
 resume = CRUDResume()
 company = CRUDBase(Company)
 location = CRUDBase(Location)
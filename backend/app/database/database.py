@@ -1,17 +1,83 @@
 """Database configuration."""
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from itertools import cycle
+from fastapi import Header
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, \
+    AsyncSession
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+from typing import Annotated, AsyncGenerator, List
 from app.core.config import get_settings
 
 
-engine = create_async_engine(get_settings().DATABASE_URL, echo=True)
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+settings = get_settings()
+
+engine = create_async_engine(settings.DATABASE_URL,
+                             echo=settings.DATABASE_ECHO)
 async_session_maker = sessionmaker(engine, class_=AsyncSession,
                                    expire_on_commit=False)
 
 
+class ReplicaRouter:
+    """Picks the read replica engine a session is bound to."""
+
+    def __init__(self, engines: List[AsyncEngine], routing: str):
+        """Initialize the router.
+
+        Args:
+            engines (List[AsyncEngine]): Engines of the replicas.
+            routing (str): `round_robin`, or `least_connections` to pick
+                the replica with the fewest connections checked out of
+                its pool.
+        """
+        if not engines:
+            raise ValueError("At least one replica engine is required")
+        if routing not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica routing: {routing}")
+        self.engines = engines
+        self.routing = routing
+        self._next = cycle(engines)
+
+    def choose(self) -> AsyncEngine:
+        """Return the engine to bind the next read session to."""
+        if self.routing == LEAST_CONNECTIONS:
+            return min(self.engines,
+                       key=lambda replica: replica.pool.checkedout())
+        return next(self._next)
+
+
+replica_engines = [
+    create_async_engine(url.strip(), echo=settings.DATABASE_ECHO)
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+# a list of bare separators configures no replicas at all
+replica_router = (
+    ReplicaRouter(replica_engines, settings.DATABASE_REPLICA_ROUTING)
+    if replica_engines else None
+)
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Async context manager for database sessions."""
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_session(
+    x_read_primary: Annotated[bool, Header()] = False
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager for read-only database sessions.
+
+    Sessions are bound to a read replica if any is configured. Replicas
+    may lag behind the primary; clients that must see their own writes
+    send `X-Read-Primary: true` to pin the session to the primary.
+    """
+    if replica_router is None or x_read_primary:
+        async with async_session_maker() as session:
+            yield session
+        return
+    async with async_session_maker(bind=replica_router.choose()) as session:
+        yield session
@@ -5,30 +5,43 @@ and their relationships for the vacancy aggregator system.
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Text,
-    Numeric, TIMESTAMP, ForeignKey, Table
+    Column, Integer, String, Text, BigInteger, SmallInteger, LargeBinary,
+    Numeric, TIMESTAMP, ForeignKey, Table, Index, Computed, UniqueConstraint
 )
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship, DeclarativeBase
+from sqlalchemy.dialects.postgresql import NUMRANGE, TSVECTOR
+from sqlalchemy.sql import func, literal_column, text
+from sqlalchemy.orm import relationship, deferred, foreign, DeclarativeBase
 from sqlalchemy.types import Date, Enum
 from app.api.v1.models import UserGender
 
 
+def published_sort_key(column):
+    """Sort key of a publication time, unknown ones sorting as oldest.
+
+    Unlike `NULLS LAST`, the key works in row comparisons, so keyset
+    pagination stays a range scan of the matching index.
+    """
+    return func.coalesce(column,
+                         literal_column("'-infinity'::timestamptz"))
+
+
 class Base(DeclarativeBase):
     """Base model."""
 
     pass
 
 
-# Association tables for many-to-many relationships
+# Association tables for many-to-many relationships. `Vacancy` is
+# partitioned and its primary key includes `published_at`, so vacancy IDs
+# elsewhere carry no foreign key constraint and relationships to it join
+# explicitly.
 vacancy_employment_type = Table(
     'Vacancy_EmploymentType',
     Base.metadata,
-    Column('vacancy_id', Integer,
-           ForeignKey('Vacancy.id'), primary_key=True),
+    Column('vacancy_id', Integer, primary_key=True),
     Column('employment_type_id', Integer,
            ForeignKey('EmploymentType.id'),
-           primary_key=True)
+           primary_key=True, index=True)
 )
 
 user_favorite_vacancies = Table(
@@ -36,8 +49,7 @@ user_favorite_vacancies = Table(
     Base.metadata,
     Column('user_id', Integer,
            ForeignKey('User.id'), primary_key=True),
-    Column('vacancy_id', Integer,
-           ForeignKey('Vacancy.id'), primary_key=True)
+    Column('vacancy_id', Integer, primary_key=True, index=True)
 )
 
 user_favorite_resumes = Table(
@@ -46,7 +58,7 @@ user_favorite_resumes = Table(
     Column('user_id', Integer,
            ForeignKey('User.id'), primary_key=True),
     Column('resume_id', Integer,
-           ForeignKey('Resume.id'), primary_key=True)
+           ForeignKey('Resume.id'), primary_key=True, index=True)
 )
 
 
@@ -58,7 +70,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(100))
     last_name = Column(String(100))
-    email = Column(String(200))
+    email = Column(String(200), index=True)
     birth_date = Column(Date)
     gender = Column(Enum(UserGender, name="user_gender"))
     hashed_password = Column(String(100))
@@ -66,6 +78,10 @@ class User(Base):
     favorite_vacancies = relationship(
         "Vacancy",
         secondary=user_favorite_vacancies,
+        primaryjoin=lambda: (
+            User.id == foreign(user_favorite_vacancies.c.user_id)),
+        secondaryjoin=lambda: (
+            Vacancy.id == foreign(user_favorite_vacancies.c.vacancy_id)),
         backref="users_who_favorited"
     )
     favorite_resumes = relationship(
@@ -85,22 +101,40 @@ class Vacancy(Base):
     source_id = Column(Integer, ForeignKey('Source.id'))
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    company_id = Column(Integer, ForeignKey('Company.id'))
-    salary_type_id = Column(Integer, ForeignKey('SalaryType.id'))
+    company_id = Column(Integer, ForeignKey('Company.id'), index=True)
+    salary_type_id = Column(Integer, ForeignKey('SalaryType.id'), index=True)
     salary_currency = Column(String(50))
     salary_value = Column(Numeric(10, 2))
+    salary_period = Column(String(20))
+    salary_from = Column(Numeric(10, 2))
+    salary_to = Column(Numeric(10, 2))
+    # salary_value in roubles per month, filled at ingest
+    salary_monthly_rub = Column(Numeric(12, 2), index=True)
+    # salary_from..salary_to in roubles per month, filled at ingest
+    salary_range = Column(NUMRANGE)
     experience_category_id = Column(
-        Integer, ForeignKey('ExperienceCategory.id'))
+        Integer, ForeignKey('ExperienceCategory.id'), index=True)
     location_id = Column(Integer, ForeignKey('Location.id'))
     specialization_id = Column(
-        Integer, ForeignKey('Specialization.id'))
-    published_at = Column(TIMESTAMP(timezone=True))
+        Integer, ForeignKey('Specialization.id'), index=True)
+    # partition key, see app.tasks.partitions
+    published_at = Column(TIMESTAMP(timezone=True), primary_key=True,
+                          server_default=func.now())
     contacts = Column(Text)
     url = Column(String(255))
+    # set on near-duplicates, NULL on the canonical copy
+    canonical_id = Column(Integer, index=True)
+    # title (A), company name (B) and description (C), kept up to date by
+    # the vacancy_search_vector_update trigger
+    search_vector = deferred(Column(TSVECTOR))
 
     employment_types = relationship(
         "EmploymentType",
         secondary=vacancy_employment_type,
+        primaryjoin=lambda: (
+            Vacancy.id == foreign(vacancy_employment_type.c.vacancy_id)),
+        secondaryjoin=lambda: EmploymentType.id == foreign(
+            vacancy_employment_type.c.employment_type_id),
         backref="vacancies"
     )
     company = relationship("Company", backref="vacancies")
@@ -111,6 +145,135 @@ class Vacancy(Base):
     location = relationship("Location", backref="vacancies")
     specialization = relationship("Specialization", backref="vacancies")
 
+    __table_args__ = (
+        # (source_id, external_id) is unique through VacancyKey
+        Index('ix_Vacancy_location_id_experience_category_id',
+              location_id, experience_category_id),
+        Index('ix_Vacancy_salary_range', salary_range,
+              postgresql_using='gist'),
+        Index('ix_Vacancy_title_trgm', title, postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('ix_Vacancy_search_vector', search_vector,
+              postgresql_using='gin'),
+        Index('ix_Vacancy_published_key', published_sort_key(published_at),
+              id),
+        Index('ix_Vacancy_location_id_published_key', location_id,
+              published_sort_key(published_at), id),
+        {'postgresql_partition_by': 'RANGE (published_at)'},
+    )
+    # vacancies are identified by ID alone
+    __mapper_args__ = {'primary_key': [id]}
+
+
+class VacancyKey(Base):
+    """Natural key of a vacancy, unique across all partitions.
+
+    Unique keys of the partitioned `Vacancy` table must include its
+    partition key, so the source and external ID of a vacancy are claimed
+    here before it is stored. The `vacancy_key_register` trigger claims
+    them for vacancies inserted directly.
+    """
+
+    __tablename__ = 'VacancyKey'
+
+    # the ID of the vacancy, drawn from the vacancy ID sequence
+    vacancy_id = Column(Integer, primary_key=True, autoincrement=False,
+                        server_default=text("nextval('\"Vacancy_id_seq\"')"))
+    source_id = Column(Integer, ForeignKey('Source.id'))
+    external_id = Column(String(100), nullable=False)
+    # publication time of vacancies published without one
+    first_seen_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                           server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('source_id', 'external_id',
+                         name='uq_VacancyKey_source_id_external_id'),
+    )
+
+
+class VacancySignature(Base):
+    """MinHash signature of a vacancy, for near-duplicate detection."""
+
+    __tablename__ = 'VacancySignature'
+
+    vacancy_id = Column(Integer, primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+
+
+class VacancyLshBand(Base):
+    """LSH bucket of one band of a vacancy signature."""
+
+    __tablename__ = 'VacancyLshBand'
+
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    vacancy_id = Column(Integer, primary_key=True, index=True)
+
+
+class BackfillTask(Base):
+    """Pending detail fetch for a vacancy stored from list snippets."""
+
+    __tablename__ = 'BackfillTask'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    vacancy_id = Column(Integer, nullable=False, unique=True)
+    # newest vacancies are backfilled first
+    priority = Column(TIMESTAMP(timezone=True))
+    attempts = Column(Integer, nullable=False, server_default='0')
+    not_before = Column(TIMESTAMP(timezone=True), nullable=False,
+                        server_default=func.now())
+    last_error = Column(Text)
+
+    vacancy = relationship(
+        "Vacancy",
+        primaryjoin="foreign(BackfillTask.vacancy_id) == Vacancy.id"
+    )
+
+    __table_args__ = (
+        Index('ix_BackfillTask_queue', priority.desc().nullslast(),
+              'not_before'),
+    )
+
+
+class VacancyListing(Base):
+    """Read model of the vacancy list, one row per vacancy.
+
+    Display names are inlined so a result page is read from this table
+    alone. Rows are upserted by the ingestion stages whenever they change
+    a vacancy, see `CRUDVacancyListing.refresh`.
+    """
+
+    __tablename__ = 'VacancyListing'
+
+    # the ID of the vacancy
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    published_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text)
+    company = Column(String(255))
+    location = Column(String(100))
+    salary_type = Column(String(50))
+    salary_currency = Column(String(50))
+    salary_value = Column(Numeric(10, 2))
+    salary_period = Column(String(20))
+    salary_from = Column(Numeric(10, 2))
+    salary_to = Column(Numeric(10, 2))
+    salary_range = Column(NUMRANGE)
+    experience_category_id = Column(Integer, index=True)
+    location_id = Column(Integer)
+    canonical_id = Column(Integer)
+
+    __table_args__ = (
+        # serves both the newest-first order and publication windows
+        Index('ix_VacancyListing_published_at', published_at, id),
+        Index('ix_VacancyListing_location_id_published_at', location_id,
+              published_at, id),
+        Index('ix_VacancyListing_salary_range', salary_range,
+              postgresql_using='gist'),
+        Index('ix_VacancyListing_title_trgm', title, postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
+
 
 class Location(Base):
     """Geographical location model for vacancies and resumes."""
@@ -120,6 +283,10 @@ class Location(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     region = Column(String(100))
 
+    __table_args__ = (
+        UniqueConstraint('region', name='uq_Location_region'),
+    )
+
 
 class Specialization(Base):
     """Professional specialization or job category model."""
@@ -129,6 +296,11 @@ class Specialization(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     specialization = Column(String(255))
 
+    __table_args__ = (
+        UniqueConstraint('specialization',
+                         name='uq_Specialization_specialization'),
+    )
+
 
 class EmploymentType(Base):
     """Type of employment (full-time, part-time, etc.)."""
@@ -138,6 +310,10 @@ class EmploymentType(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(50))
 
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_EmploymentType_name'),
+    )
+
 
 class Company(Base):
     """Company model representing employers posting vacancies."""
@@ -147,6 +323,10 @@ class Company(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_Company_name'),
+    )
+
 
 class ExperienceCategory(Base):
     """Experience level classification for jobs and candidates."""
@@ -156,6 +336,10 @@ class ExperienceCategory(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(50), nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_ExperienceCategory_name'),
+    )
+
 
 class Source(Base):
     """Source of vacancies or resumes (job board, API, etc.)."""
@@ -165,6 +349,21 @@ class Source(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_Source_name'),
+    )
+
+
+class CurrencyRate(Base):
+    """Exchange rate of a currency to roubles."""
+
+    __tablename__ = 'CurrencyRate'
+
+    code = Column(String(10), primary_key=True)
+    rate = Column(Numeric(18, 6), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(),
+                        nullable=False)
+
 
 class SalaryType(Base):
     """Type of salary (gross, net, hourly, etc.)."""
@@ -174,6 +373,10 @@ class SalaryType(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(50), nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_SalaryType_name'),
+    )
+
 
 class Resume(Base):
     """Candidate resume model containing professional information."""
@@ -185,25 +388,48 @@ class Resume(Base):
     source_id = Column(Integer, ForeignKey('Source.id'))
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    salary_type_id = Column(Integer, ForeignKey('SalaryType.id'))
+    salary_type_id = Column(Integer, ForeignKey('SalaryType.id'), index=True)
     salary_currency = Column(String(50))
     salary_value = Column(Numeric(10, 2))
     skills_text = Column(Text)
     location_id = Column(Integer, ForeignKey('Location.id'))
     experience_category_id = Column(
-        Integer, ForeignKey('ExperienceCategory.id'))
+        Integer, ForeignKey('ExperienceCategory.id'), index=True)
     education = Column(Text)
     specialization_id = Column(
-        Integer, ForeignKey('Specialization.id'))
+        Integer, ForeignKey('Specialization.id'), index=True)
     first_name = Column(String(100))
     last_name = Column(String(100))
     middle_name = Column(String(100))
     email = Column(String(255))
     phone_number = Column(String(50))
     published_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    # a NULL bound would make the range unbounded and match any filter
+    salary_range = Column(
+        NUMRANGE,
+        Computed("CASE WHEN salary_value IS NOT NULL "
+                 "THEN numrange(salary_value, salary_value, '[]') END",
+                 persisted=True)
+    )
 
     source = relationship("Source", backref="resumes")
     salary_type = relationship("SalaryType", backref="resumes")
     location = relationship("Location", backref="resumes")
     experience_category = relationship("ExperienceCategory", backref="resumes")
     specialization = relationship("Specialization", backref="resumes")
+
+    __table_args__ = (
+        UniqueConstraint('source_id', 'external_id',
+                         name='uq_Resume_source_id_external_id'),
+        Index('ix_Resume_location_id_experience_category_id',
+              location_id, experience_category_id),
+        Index('ix_Resume_salary_range', salary_range,
+              postgresql_using='gist'),
+        Index('ix_Resume_title_trgm', title, postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('ix_Resume_skills_text_trgm', skills_text,
+              postgresql_using='gin',
+              postgresql_ops={'skills_text': 'gin_trgm_ops'}),
+        Index('ix_Resume_published_key', published_sort_key(published_at),
+              id),
+    )
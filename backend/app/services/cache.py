@@ -0,0 +1,48 @@
+"""In-process TTL cache."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Least recently used cache whose entries expire after a TTL.
+
+    Entries live in the memory of one worker process, so each worker
+    keeps its own copy.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """Initialize the cache.
+
+        Args:
+            ttl (float): Seconds an entry stays valid.
+            maxsize (int): Number of entries kept, least recently used
+                ones are evicted first.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value of *key*, `None` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store *value* under *key*."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
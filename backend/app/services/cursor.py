@@ -0,0 +1,32 @@
+"""Opaque pagination cursors.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and
+base64url-wrapped so clients treat it as an opaque token.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Wrap a sort key into a cursor."""
+    data = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Unwrap the sort key of a cursor.
+
+    Raises:
+        ValueError: The cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(key, list) or not key:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
@@ -9,7 +9,7 @@ import logging
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, AsyncGenerator, Any, Set
+from typing import Dict, List, Optional, AsyncGenerator, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import aiohttp
@@ -228,17 +228,22 @@ class HHVacancyParser(VacancyParser):
     def __init__(
             self,
             config: Optional[ParserConfig] = None,
-            rate_limiter: Optional[HHRateLimiter] = None
+            rate_limiter: Optional[HHRateLimiter] = None,
+            fetch_details: bool = True
     ):
-        """Initialize HH API Parser."""
+        """Initialize HH API Parser.
+
+        With `fetch_details` off, vacancies are built from search result
+        snippets only and their details are left to the backfill worker.
+        """
         super().__init__(config or ParserConfig())
+        self.fetch_details = fetch_details
         self.client_id = os.getenv('HH_CLIENT_ID')
         self.client_secret = os.getenv('HH_CLIENT_SECRET')
         self.access_token = os.getenv('HH_ACCESS_TOKEN')
         self.rate_limiter = rate_limiter or HHRateLimiter(
             max_requests_per_second=8.0)
         self.session: Optional[aiohttp.ClientSession] = None
-        self.seen_vacancy_ids: Set[str] = set()
         self.request_count = 0
         self.start_time = time.time()
         self.last_stats_log = time.time()
@@ -259,6 +264,7 @@ class HHVacancyParser(VacancyParser):
         """Async context manager exit."""
         if self.session:
             await self.session.close()
+        self._close_pipeline()
 
     @backoff.on_exception(
         backoff.expo,
@@ -276,13 +282,20 @@ class HHVacancyParser(VacancyParser):
             data: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Make authenticated request to HH API with enhanced retry logic."""
+        url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        if self.archive and self.archive.replaying:
+            recorded = self.archive.replay(url, params)
+            if recorded.status >= 400:
+                raise HHAPIError(f"API request failed: "
+                                 f"HTTP {recorded.status}")
+            return recorded.json()
+
         if not self.session:
             raise HHAPIError("Session not initialized. "
                              "Use async context manager.")
 
         await self.rate_limiter.acquire()
 
-        url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
         headers = {'User-Agent': 'HH-Parser/1.0'}  # User-Agent
         if self.access_token:
             headers['Authorization'] = f'Bearer {self.access_token}'
@@ -321,14 +334,20 @@ class HHVacancyParser(VacancyParser):
                 if response.status == 401:
                     raise HHAuthenticationError("Authentication failed")
 
+                body = await response.text()
+                if self.archive:
+                    await asyncio.to_thread(
+                        self.archive.record, url, params, response.status,
+                        response.headers, body)
+
                 if response.status >= 400:
-                    error_data = await response.json() if \
+                    error_data = json.loads(body) if \
                         response.content_type == 'application/json' else {}
                     error_msg = error_data.get(
                         'description', f'HTTP {response.status}')
                     raise HHAPIError(f"API request failed: {error_msg}")
 
-                return await response.json()
+                return json.loads(body)
 
         except asyncio.TimeoutError:
             self.logger.error("Request timeout")
@@ -447,8 +466,9 @@ class HHVacancyParser(VacancyParser):
             params['date_to'] = filters.date_to.strftime('%Y-%m-%dT%H:%M:%S')
         return await self._make_request('GET', '/vacancies', params=params)
 
+    @staticmethod
     def _extract_salary_info(
-            self, salary_data: Optional[Dict]) -> Optional[BackendSalary]:
+            salary_data: Optional[Dict]) -> Optional[BackendSalary]:
         """Extract salary information and return Salary object."""
         if not salary_data:
             return None
@@ -469,10 +489,17 @@ class HHVacancyParser(VacancyParser):
         else:
             return BackendSalary(type=None, currency=currency, value=None)
 
-        return BackendSalary(type=salary_type, currency=currency, value=value)
+        return BackendSalary(
+            type=salary_type,
+            currency=currency,
+            value=value,
+            value_from=round(salary_from) if salary_from else None,
+            value_to=round(salary_to) if salary_to else None
+        )
 
+    @staticmethod
     def _map_experience_to_category(
-            self, experience_data: Optional[Dict]) -> (
+            experience_data: Optional[Dict]) -> (
             Optional)[BackendExperienceCategory]:
         """Map HH experience to ExperienceCategory object."""
         if not experience_data:
@@ -482,8 +509,9 @@ class HHVacancyParser(VacancyParser):
 
         return BackendExperienceCategory(name=exp_name)
 
+    @staticmethod
     def _extract_employment_types(
-            self, vacancy_data: Dict) -> List[BackendEmploymentType]:
+            vacancy_data: Dict) -> List[BackendEmploymentType]:
         """Extract employment types from vacancy data."""
         employment_types = []
 
@@ -498,87 +526,55 @@ class HHVacancyParser(VacancyParser):
 
         return employment_types
 
+    async def _fetch_full_vacancy(
+            self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch full vacancy details for description and contacts."""
+        full_vacancy = await self.get_vacancy_details(raw_data['id'])
+        if not (self.archive and self.archive.replaying):
+            await asyncio.sleep(0.2)
+        return full_vacancy
+
     async def _convert_to_vacancy_model(
             self, raw_data: Dict[str, Any]) -> BackendVacancy:
         """Convert raw API data to Vacancy model with proper error handling."""
-        try:
-            # Get full vacancy details for description and contacts
+        full_vacancy = await self._fetch_full_vacancy(raw_data)
+        return convert_hh_vacancy((raw_data, full_vacancy, self.source_name))
+
+    async def _convert_page(
+            self,
+            vacancies: List[Dict[str, Any]],
+            limit: float
+    ) -> AsyncGenerator[BackendVacancy, None]:
+        """Convert up to `limit` unseen vacancies of a search page.
+
+        Without details, the whole page is converted in one go by the
+        conversion stage. Details are fetched one by one on the event
+        loop, and each vacancy is converted and yielded as soon as its
+        details arrive. A vacancy that fails to convert fails the search.
+        """
+        unseen = []
+        for vacancy in vacancies:
+            if len(unseen) >= limit:
+                break
+            if vacancy['id'] not in self.seen_vacancy_ids:
+                self.seen_vacancy_ids.add(vacancy['id'])
+                unseen.append(vacancy)
+
+        step = 1 if self.fetch_details else max(len(unseen), 1)
+        for start in range(0, len(unseen), step):
+            payloads = []
+            for vacancy in unseen[start:start + step]:
+                full_vacancy = await self._fetch_full_vacancy(vacancy) \
+                    if self.fetch_details else None
+                payloads.append((vacancy, full_vacancy, self.source_name))
             try:
-                full_vacancy = await self.get_vacancy_details(raw_data['id'])
-                description = full_vacancy.get('description', '') \
-                    if full_vacancy else raw_data.get('description', '')
-                contacts = json.dumps(full_vacancy.get('contacts')) \
-                    if full_vacancy and full_vacancy.get(
-                    'contacts') else None
-                await asyncio.sleep(0.2)
-            except Exception as e:
-                self.logger.warning(f"Could not fetch full details "
-                                    f"for vacancy {raw_data['id']}: {e}")
-                description = (raw_data.get('snippet', {}).
-                               get('requirement', '')
-                               or raw_data.get('description', ''))
-                contacts = None
-
-            # Create backend models with proper defaults
-            source = BackendSource(name=self.source_name)
-
-            # Create company object if available
-            employer = raw_data.get('employer', {})
-            company = BackendCompany(
-                name=employer.get('name', 'Unknown')) if employer else None
-
-            # Create location object if available
-            area = raw_data.get('area', {})
-            location = BackendLocation(
-                region=area.get('name', 'Remote')) if area else None
-
-            # Create specialization object if available
-            professional_roles = raw_data.get('professional_roles', [])
-            specialization = None
-            if professional_roles:
-                role = professional_roles[0]
-                specialization = BackendSpecialization(
-                    specialization=role.get('name', 'Other'))
-
-            # Create timestamp object if available
-            published_at = BackendTimeStamp(time_stamp=raw_data.get(
-                'published_at', datetime.now().isoformat()))
-
-            # Handle salary - ensure we always return a Salary object
-            salary_data = raw_data.get('salary')
-            salary = self._extract_salary_info(salary_data) or BackendSalary()
-
-            # Handle experience - ensure we always return an ExperienceCategory
-            experience = (self._map_experience_to_category(
-                raw_data.get('experience')) or BackendExperienceCategory(
-                name='Not specified'))
-
-            # Handle employment types - ensure we always have at least one
-            employment_types = self._extract_employment_types(raw_data)
-            if not employment_types:
-                employment_types = [BackendEmploymentType(name='full')]
-
-            # Create the vacancy with all required fields
-            return BackendVacancy(
-                id=int(raw_data.get('id', 0)),  # Provide default ID if missing
-                external_id=str(raw_data.get('id', '')),
-                source=source,
-                title=raw_data.get('name', 'No title provided'),
-                description=description,
-                company=company,
-                salary=salary,
-                experience_category=experience,
-                location=location,
-                specialization=specialization,
-                employment_types=employment_types,
-                published_at=published_at,
-                contacts=contacts,
-                url=raw_data.get('alternate_url', '')
-            )
-        except Exception as e:
-            self.logger.error(f"Error converting vacancy data: {e}")
-            raise ValueError(f"Failed to convert vacancy "
-                             f"data: {str(e)}") from e
+                records = await self.conversion.map(
+                    convert_hh_vacancy, payloads)
+            except ValueError as e:
+                self.logger.error(f"Error converting vacancy data: {e}")
+                raise
+            for record in records:
+                yield record
 
     async def search_vacancies(
             self,
@@ -601,8 +597,14 @@ class HHVacancyParser(VacancyParser):
         max_results = max_results = max_results or float('inf')
 
         if not hh_filters.date_from or not hh_filters.date_to:
-            hh_filters.date_to = datetime.now()
-            hh_filters.date_from = hh_filters.date_to - timedelta(days=30)
+            date_to = datetime.now()
+            window = [(date_to - timedelta(days=30)).isoformat(),
+                      date_to.isoformat()]
+            if self.archive:
+                # the dates go into the params replay matches requests on
+                window = self.archive.pin("hh.default_window", window)
+            hh_filters.date_from, hh_filters.date_to = \
+                map(datetime.fromisoformat, window)
 
         # Check if we need parameter-based splitting
         initial_response = await self._search_vacancies_page(hh_filters, 0)
@@ -619,14 +621,12 @@ class HHVacancyParser(VacancyParser):
                 if not vacancies:
                     break
 
-                for vacancy in vacancies:
-                    if results_count >= max_results:
-                        return
-                    if vacancy['id'] not in self.seen_vacancy_ids:
-                        self.seen_vacancy_ids.add(vacancy['id'])
-                        record = await self._convert_to_vacancy_model(vacancy)
-                        yield record
-                        results_count += 1
+                async for record in self._convert_page(
+                        vacancies, max_results - results_count):
+                    yield record
+                    results_count += 1
+                if results_count >= max_results:
+                    return
 
                 if ((page + 1) * self.MAX_RESULTS_PER_REQUEST
                         >= min(total_found, self.MAX_TOTAL_RESULTS)):
@@ -661,15 +661,12 @@ class HHVacancyParser(VacancyParser):
                         if not vacancies:
                             break
 
-                        for vacancy in vacancies:
-                            if results_count >= max_results:
-                                return
-                            if vacancy['id'] not in self.seen_vacancy_ids:
-                                self.seen_vacancy_ids.add(vacancy['id'])
-                                record = await self.\
-                                    _convert_to_vacancy_model(vacancy)
-                                yield record
-                                results_count += 1
+                        async for record in self._convert_page(
+                                vacancies, max_results - results_count):
+                            yield record
+                            results_count += 1
+                        if results_count >= max_results:
+                            return
 
                         if ((page + 1) * self.MAX_RESULTS_PER_REQUEST
                                 >= min(date_total, self.MAX_TOTAL_RESULTS)):
@@ -696,17 +693,13 @@ class HHVacancyParser(VacancyParser):
                                 if not vacancies:
                                     break
 
-                                for vacancy in vacancies:
-                                    if results_count >= max_results:
-                                        return
-                                    if (vacancy['id'] not in
-                                            self.seen_vacancy_ids):
-                                        self.seen_vacancy_ids.add(
-                                            vacancy['id'])
-                                        record = await self.\
-                                            _convert_to_vacancy_model(vacancy)
-                                        yield record
-                                        results_count += 1
+                                async for record in self._convert_page(
+                                        vacancies,
+                                        max_results - results_count):
+                                    yield record
+                                    results_count += 1
+                                if results_count >= max_results:
+                                    return
 
                                 combo_total = response.get('found', 0)
                                 if ((page + 1) * self.MAX_RESULTS_PER_REQUEST
@@ -737,6 +730,101 @@ class HHVacancyParser(VacancyParser):
         if self.session:
             await self.session.close()
             self.session = None
+        self._close_pipeline()
+
+
+def details_fields(
+        full_vacancy: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """Return `(description, contacts)` of full vacancy details."""
+    description = full_vacancy.get('description', '')
+    contacts = json.dumps(full_vacancy.get('contacts')) \
+        if full_vacancy.get('contacts') else None
+    return description, contacts
+
+
+def snippet_description(raw_data: Dict[str, Any]) -> str:
+    """Build a description from the snippet of a search result item."""
+    snippet = raw_data.get('snippet') or {}
+    parts = [snippet.get('responsibility'), snippet.get('requirement')]
+    return ("\n\n".join(part for part in parts if part)
+            or raw_data.get('description', ''))
+
+
+def convert_hh_vacancy(payload: tuple) -> BackendVacancy:
+    """Build a Vacancy from a search item and its full details.
+
+    `payload` is `(raw_data, full_vacancy, source_name)`. Pure and
+    module-level so it can run in a conversion worker process.
+    """
+    raw_data, full_vacancy, source_name = payload
+    try:
+        if full_vacancy:
+            description, contacts = details_fields(full_vacancy)
+        else:
+            description, contacts = snippet_description(raw_data), None
+
+        # Create backend models with proper defaults
+        source = BackendSource(name=source_name)
+
+        # Create company object if available
+        employer = raw_data.get('employer', {})
+        company = BackendCompany(
+            name=employer.get('name', 'Unknown')) if employer else None
+
+        # Create location object if available
+        area = raw_data.get('area', {})
+        location = BackendLocation(
+            region=area.get('name', 'Remote')) if area else None
+
+        # Create specialization object if available
+        professional_roles = raw_data.get('professional_roles', [])
+        specialization = None
+        if professional_roles:
+            role = professional_roles[0]
+            specialization = BackendSpecialization(
+                specialization=role.get('name', 'Other'))
+
+        # Create timestamp object if available
+        published_at = BackendTimeStamp(time_stamp=raw_data.get(
+            'published_at', datetime.now().isoformat()))
+
+        # Handle salary - ensure we always return a Salary object
+        salary = HHVacancyParser._extract_salary_info(
+            raw_data.get('salary')) or BackendSalary()
+        mode = (raw_data.get('salary_range') or {}).get('mode') or {}
+        if mode.get('id') in ('HOUR', 'SHIFT'):
+            salary.period = mode['id'].lower()
+
+        # Handle experience - ensure we always return an ExperienceCategory
+        experience = (HHVacancyParser._map_experience_to_category(
+            raw_data.get('experience')) or BackendExperienceCategory(
+            name='Not specified'))
+
+        # Handle employment types - ensure we always have at least one
+        employment_types = HHVacancyParser._extract_employment_types(raw_data)
+        if not employment_types:
+            employment_types = [BackendEmploymentType(name='full')]
+
+        # Create the vacancy with all required fields
+        return BackendVacancy(
+            id=int(raw_data.get('id', 0)),  # Provide default ID if missing
+            external_id=str(raw_data.get('id', '')),
+            source=source,
+            title=raw_data.get('name', 'No title provided'),
+            description=description,
+            company=company,
+            salary=salary,
+            experience_category=experience,
+            location=location,
+            specialization=specialization,
+            employment_types=employment_types,
+            published_at=published_at,
+            contacts=contacts,
+            url=raw_data.get('alternate_url', '')
+        )
+    except Exception as e:
+        raise ValueError(f"Failed to convert vacancy "
+                         f"data: {str(e)}") from e
 
 
 async def parse_and_save_vacancies_json(
@@ -0,0 +1,216 @@
+"""Incremental rabota.ru parser.
+
+Walks the rabota.ru search results newest first and stops paginating as
+soon as a page consists mostly of vacancies that are already stored, so
+a steady-state run only touches the few newest pages.
+"""
+
+import asyncio
+from contextlib import aclosing
+from typing import (
+    Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Set,
+    Tuple
+)
+
+import aiohttp
+
+from .base import VacancyParser, ParserConfig
+from .rabotaru._api import _fetch
+from .rabotaru.parser import SOURCE, build_vacancy, extract_details
+from .rabotaru.traverser import VacancyShortWithUrl, iter_pages
+from app.api.v1.models import Salary, Vacancy, VacancyFilter
+
+KnownIdsLookup = Callable[[List[str]], Awaitable[Set[str]]]
+
+
+class RabotaRuParser(VacancyParser):
+    """rabota.ru parser with early stop on already stored vacancies."""
+
+    BASE_URL = "https://www.rabota.ru"
+
+    @property
+    def parser_name(self) -> str:
+        """Return the name of the parser."""
+        return "rabota_ru_parser"
+
+    @property
+    def source_name(self) -> str:
+        """Return the name of the job source."""
+        return SOURCE
+
+    def __init__(
+            self,
+            config: Optional[ParserConfig] = None,
+            known_ids: Optional[KnownIdsLookup] = None,
+            known_ratio: float = 0.8,
+            industry_ids: Optional[List[int]] = None,
+            page_limit: int = 50,
+            window: int = 1,
+            concurrency: int = 5,
+            backend: str = "lxml"
+    ):
+        """Initialize rabota.ru parser.
+
+        Args:
+            config (ParserConfig): Parser configuration settings.
+            known_ids: Coroutine returning which of the given external IDs
+                are already stored. Without it every page is new.
+            known_ratio (float): Stop paginating after a page on which
+                at least this share of vacancies is already known.
+            industry_ids (List[int]): rabota.ru industries to search.
+            page_limit (int): Maximum number of search pages per run.
+            window (int): Number of search pages fetched concurrently.
+            concurrency (int): Number of vacancy pages fetched
+                concurrently.
+            backend (str): HTML extraction backend, `"bs4"` or `"lxml"`.
+        """
+        super().__init__(config or ParserConfig())
+        self.known_ids = known_ids
+        self.known_ratio = known_ratio
+        self.industry_ids = industry_ids if industry_ids is not None else [1]
+        self.page_limit = page_limit
+        self.window = window
+        self.concurrency = concurrency
+        self.backend = backend
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=False)  # rabota uses TLS-ALPN
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.cleanup()
+
+    async def _known_on_page(self, ids: List[str]) -> Set[str]:
+        """Return the IDs of a search page that are already stored."""
+        if not self.known_ids:
+            return set()
+        return await self.known_ids(ids)
+
+    async def _fetch_page(self, url: str) -> Optional[str]:
+        """Download a vacancy page, `None` if it fails."""
+        try:
+            return await _fetch(self.session, url, archive=self.archive)
+        except Exception as e:
+            self.logger.warning(f"Could not fetch {url}: {e}")
+            self.errors.append(str(e))
+            return None
+
+    async def search_vacancies(
+            self,
+            filters: VacancyFilter,
+            max_results: Optional[int] = None
+    ) -> AsyncGenerator[Vacancy, None]:
+        """Search the newest vacancies, stopping at already stored ones.
+
+        rabota.ru search pages cannot be filtered by publication date,
+        so `filters` is not applied; ordering by date and stopping on
+        known vacancies bounds each run instead.
+        """
+        if not self.session:
+            raise RuntimeError("Session not initialized. "
+                               "Use async context manager.")
+
+        results_count = 0
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_detail(short: VacancyShortWithUrl) -> Optional[str]:
+            async with slots:
+                return await self._fetch_page(short.url)
+
+        pages = iter_pages(
+            self.session,
+            industry_ids=self.industry_ids,
+            page_limit=self.page_limit,
+            window=self.window,
+            backend=self.backend,
+            sort="date",
+            archive=self.archive,
+        )
+        async with aclosing(pages):
+            async for chunk in pages:
+                ids = [str(short.id) for short in chunk]
+                known = await self._known_on_page(ids)
+                fresh = [
+                    short for short in chunk
+                    if str(short.id) not in known
+                    and str(short.id) not in self.seen_vacancy_ids
+                ]
+                self.seen_vacancy_ids.update(str(s.id) for s in fresh)
+
+                pages_html = await asyncio.gather(
+                    *(fetch_detail(short) for short in fresh)
+                )
+                payloads = [
+                    (short, html, self.backend)
+                    for short, html in zip(fresh, pages_html)
+                    if html is not None
+                ]
+                records = await self.conversion.map(
+                    convert_page, payloads, return_exceptions=True
+                )
+                for (short, _, _), record in zip(payloads, records):
+                    if max_results is not None \
+                            and results_count >= max_results:
+                        return
+                    if isinstance(record, Exception):
+                        self.logger.error(f"Could not parse vacancy "
+                                          f"{short.id}: {record}")
+                        self.errors.append(str(record))
+                        continue
+                    yield record
+                    results_count += 1
+
+                if len(known) >= self.known_ratio * len(chunk):
+                    self.logger.info(
+                        f"{len(known)} of {len(chunk)} vacancies on the "
+                        f"page are already stored, stopping")
+                    return
+
+    async def get_vacancy_details(self, external_id: str) -> Optional[Vacancy]:
+        """Get detailed information about a specific vacancy."""
+        url = f"{self.BASE_URL}/vacancy/{external_id}/"
+        html = await self._fetch_page(url)
+        if html is None:
+            return None
+        try:
+            details = extract_details(html, self.backend)
+            preview = VacancyShortWithUrl(
+                id=int(external_id),
+                title=details.title or "",
+                salary=Salary(),
+                url=url,
+            )
+            return self._convert_to_vacancy_model(
+                {"preview": preview, "html": html}
+            )
+        except Exception as e:
+            self.logger.error(f"Error getting vacancy details "
+                              f"for {external_id}: {e}")
+            return None
+
+    def _convert_to_vacancy_model(self, raw_data: Dict[str, Any]) -> Vacancy:
+        """Convert a search preview and its vacancy page to a Vacancy."""
+        return convert_page(
+            (raw_data["preview"], raw_data["html"], self.backend)
+        )
+
+    async def cleanup(self):
+        """Cleanup resources."""
+        if self.session:
+            await self.session.close()
+            self.session = None
+        self._close_pipeline()
+
+
+def convert_page(payload: Tuple[VacancyShortWithUrl, str, str]) -> Vacancy:
+    """Build a Vacancy from `(preview, html, backend)`.
+
+    Module-level so the conversion stage can run it in a worker process.
+    """
+    short, html, backend = payload
+    return build_vacancy(short, short.url, html, backend)
@@ -122,17 +122,13 @@ class SuperJobParser(VacancyParser):
             "date_published_from": filters.date_published_from,
             "date_published_to": filters.date_published_to
         }
-        response = await self.client.get(url, headers=self.headers,
-                                         params=params)
-        json_data = response.json()
+        json_data = await self._get_json(url, params)
         results = [json_data]
         total = json_data["total"]
         amount = total // 40
         for i in range(1, amount + 1):
             params["page"] = i
-            response = await self.client.get(url, headers=self.headers,
-                                             params=params)
-            json_data = response.json()
+            json_data = await self._get_json(url, params)
             results.append(json_data)
         async with aiofiles.open(output_file, "a",
                                  encoding="utf-8") as file:
@@ -159,9 +155,22 @@ class SuperJobParser(VacancyParser):
         )
         return result
 
+    async def _get_json(self, url: str, params: Dict[str, Any]) -> Any:
+        """GET a SuperJob API endpoint, recording or replaying it."""
+        if self.archive and self.archive.replaying:
+            return self.archive.replay(url, params).json()
+        response = await self.client.get(url, headers=self.headers,
+                                         params=params)
+        if self.archive:
+            await asyncio.to_thread(
+                self.archive.record, url, params, response.status_code,
+                response.headers, response.text)
+        return response.json()
+
     async def cleanup(self):
         """Close the httpx AsyncClient."""
         await self.client.aclose()
+        self._close_pipeline()
 
     async def vacancy_catalog(self):
         """Fetch and save the full catalog from SuperJob API."""
@@ -224,7 +233,7 @@ class SuperJobParser(VacancyParser):
 
     def _convert_to_vacancy_model(self, raw_data: Dict[str, Any]) -> Vacancy:
         """Convert raw API data to Vacancy model."""
-        pass
+        return convert_superjob_vacancy(raw_data)
 
     async def get_vacancy_details(self, external_id: str) -> Optional[Vacancy]:
         """Get detailed information about a specific vacancy."""
@@ -250,9 +259,7 @@ class SuperJobParser(VacancyParser):
             "date_published_to": filters.date_published_to
         }
 
-        response = await self.client.get(
-            url, headers=self.headers, params=params)
-        json_data = response.json()
+        json_data = await self._get_json(url, params)
         total = json_data["total"]
         amount = total // 40 + (1 if total % 40 else 0)
 
@@ -263,45 +270,13 @@ class SuperJobParser(VacancyParser):
                 break
 
             params["page"] = page_num
-            response = await self.client.get(
-                url, headers=self.headers, params=params)
-            json_data = response.json()
-
-            for vacancy_data in json_data["objects"]:
-                if max_results is not None and yielded_count >= max_results:
-                    break
+            json_data = await self._get_json(url, params)
 
-                try:
-                    company_name = vacancy_data["client"]["title"]
-                except (KeyError, TypeError):
-                    company_name = None
-
-                vacancy = Vacancy(
-                    id=vacancy_data["id"],
-                    external_id=vacancy_data["id_client"],
-                    source=Source(name=vacancy_data["link"]),
-                    title=vacancy_data["profession"],
-                    description=vacancy_data["vacancyRichText"],
-                    company=Company(name=company_name),
-                    salary=Salary(
-                        currency=vacancy_data["currency"],
-                        type=vacancy_data["currency"],
-                        value=vacancy_data["payment_to"]
-                    ),
-                    experience_category=ExperienceCategory(
-                        name=vacancy_data["experience"]["title"],
-                        years=vacancy_data["experience"]["title"]
-                    ),
-                    location=Location(region=vacancy_data["town"]["title"]),
-                    specialization=Specialization(
-                        specialization=vacancy_data["profession"]),
-                    employment_types=[EmploymentType(
-                        name=vacancy_data["type_of_work"]["title"])],
-                    published_at=TimeStamp(
-                        time_stamp=vacancy_data["date_published"]),
-                    contacts=vacancy_data["phone"],
-                    url=vacancy_data["link"]
-                )
+            objects = json_data["objects"]
+            if max_results is not None:
+                objects = objects[:max_results - yielded_count]
+            for vacancy in await self.conversion.map(
+                    convert_superjob_vacancy, objects):
                 yield vacancy
                 yielded_count += 1
 
@@ -333,6 +308,50 @@ class SuperJobParser(VacancyParser):
                                              ensure_ascii=False, indent=4))
 
 
+def convert_superjob_vacancy(vacancy_data: Dict[str, Any]) -> Vacancy:
+    """Convert a SuperJob API vacancy object to Vacancy model."""
+    try:
+        company_name = vacancy_data["client"]["title"]
+    except (KeyError, TypeError):
+        company_name = None
+    # SuperJob sends 0 for a missing bound
+    payment_from = vacancy_data.get("payment_from") or None
+    payment_to = vacancy_data.get("payment_to") or None
+    if payment_from and payment_to:
+        value = round((payment_from + payment_to) / 2)
+    else:
+        value = payment_from or payment_to
+
+    return Vacancy(
+        id=vacancy_data["id"],
+        external_id=vacancy_data["id_client"],
+        source=Source(name=vacancy_data["link"]),
+        title=vacancy_data["profession"],
+        description=vacancy_data["vacancyRichText"],
+        company=Company(name=company_name),
+        salary=Salary(
+            currency=vacancy_data["currency"],
+            type=vacancy_data["currency"],
+            value=value,
+            value_from=payment_from,
+            value_to=payment_to
+        ),
+        experience_category=ExperienceCategory(
+            name=vacancy_data["experience"]["title"],
+            years=vacancy_data["experience"]["title"]
+        ),
+        location=Location(region=vacancy_data["town"]["title"]),
+        specialization=Specialization(
+            specialization=vacancy_data["profession"]),
+        employment_types=[EmploymentType(
+            name=vacancy_data["type_of_work"]["title"])],
+        published_at=TimeStamp(
+            time_stamp=vacancy_data["date_published"]),
+        contacts=vacancy_data["phone"],
+        url=vacancy_data["link"]
+    )
+
+
 class ResumeScraping:
     """A class to handle the scraping of resumes."""
 
@@ -7,6 +7,9 @@ import json
 import logging
 import os
 from dataclasses import dataclass, field
+from .conversion import ConversionStage
+from .dedup import FingerprintSet
+from .recording import open_archive
 from app.api.v1.models import (
     Vacancy, VacancyFilter, Source, Salary,
     ExperienceCategory, Location, Specialization,
@@ -24,6 +27,11 @@ class ParserConfig:
     log_level: str = "INFO"
     timeout: int = 30
     retry_attempts: int = 3
+    conversion_workers: int = 0  # 0 converts on the event loop
+    conversion_batch_size: int = 32
+    dedup_directory: Optional[str] = None  # None keeps seen IDs in memory
+    http_mode: str = "live"  # live, record or replay
+    http_archive: Optional[str] = None  # defaults to output_directory
 
     def __post_init__(self):
         """Create output directory if it doesn't exist."""
@@ -50,9 +58,17 @@ class BaseParser(ABC):
         """Initialize parser with configuration."""
         self.config = config
         self.logger = self._setup_logger()
-        self.seen_ids: set = set()
+        self.seen_ids = self._dedup_index("seen_ids")
         self.errors: List[str] = []
 
+    def _dedup_index(self, name: str) -> FingerprintSet:
+        """Create the dedup index *name*, persisted if configured."""
+        path = None
+        if self.config.dedup_directory:
+            path = os.path.join(self.config.dedup_directory,
+                                f"{self.parser_name}.{name}.fps")
+        return FingerprintSet(path)
+
     def _setup_logger(self) -> logging.Logger:
         """Set up logger for the parser."""
         logger = logging.getLogger(f"{self.__class__.__name__}")
@@ -151,7 +167,22 @@ class VacancyParser(BaseParser):
             config (ParserConfig): Parser configuration settings.
         """
         super().__init__(config)
-        self.seen_vacancy_ids: set = set()
+        self.seen_vacancy_ids = self._dedup_index("seen_vacancy_ids")
+        self.conversion = ConversionStage(
+            config.conversion_workers, config.conversion_batch_size
+        )
+        self.archive = open_archive(
+            config.http_mode,
+            config.http_archive or os.path.join(
+                config.output_directory,
+                f"{self.parser_name}.responses.ndjson.gz")
+        )
+
+    def _close_pipeline(self) -> None:
+        """Shut the conversion pool down and close the response archive."""
+        self.conversion.close()
+        if self.archive:
+            self.archive.close()
 
     @abstractmethod
     async def search_vacancies(
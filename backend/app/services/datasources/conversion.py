@@ -0,0 +1,112 @@
+"""Optional process-pool stage for CPU-bound payload conversion.
+
+Parsing HTML and building pydantic models block the event loop and
+stall every concurrent fetch. `ConversionStage` sends raw payloads to a
+`ProcessPoolExecutor` in batches and returns the converted records, or
+converts in-process when the pool is disabled or unavailable.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def _convert_batch(
+    func: Callable[[Any], Any],
+    batch: Sequence[Any],
+    return_exceptions: bool
+) -> List[Any]:
+    """Convert one batch, runs inside a worker process."""
+    results = []
+    for payload in batch:
+        try:
+            results.append(func(payload))
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+
+class ConversionStage:
+    """Run a conversion function over payloads on a process pool."""
+
+    def __init__(self, workers: int = 0, batch_size: int = 32):
+        """Initialize the stage.
+
+        Args:
+            workers (int): Number of worker processes. `0` converts
+                in-process on the event loop.
+            batch_size (int): Number of payloads sent to a worker at once.
+        """
+        self.workers = workers
+        self.batch_size = max(batch_size, 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._disabled = workers <= 0
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Start the pool on first use, `None` when running in-process."""
+        if self._disabled:
+            return None
+        if self._pool is None:
+            try:
+                # spawn: the parent runs an event loop and helper threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, "
+                               f"converting in-process: {e}")
+                self._disabled = True
+        return self._pool
+
+    async def map(
+        self,
+        func: Callable[[Any], Any],
+        payloads: Sequence[Any],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """Convert `payloads` with `func`, preserving their order.
+
+        `func` and the payloads must be picklable when a pool is used,
+        so `func` has to be a module-level function. With
+        `return_exceptions`, a failing payload yields its exception in
+        place of a result instead of failing the whole call.
+        """
+        if not payloads:
+            return []
+        pool = self._get_pool()
+        if pool is None:
+            return _convert_batch(func, payloads, return_exceptions)
+
+        loop = asyncio.get_running_loop()
+        batches = [
+            payloads[i:i + self.batch_size]
+            for i in range(0, len(payloads), self.batch_size)
+        ]
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _convert_batch, func, batch, return_exceptions
+                )
+                for batch in batches
+            ))
+        except BrokenProcessPool as e:
+            logger.warning(f"Process pool broke, "
+                           f"converting in-process: {e}")
+            self.close()
+            self._disabled = True
+            return _convert_batch(func, payloads, return_exceptions)
+        return [record for batch in results for record in batch]
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
@@ -1,9 +1,40 @@
+import asyncio
+from typing import Optional
+
 import aiohttp
 
+from app.services.datasources.rabotaru.cache import HtmlCache
+from app.services.datasources.recording import ResponseArchive
+
 UA = "Mozilla/5.0"
 
 
-async def _fetch(session: aiohttp.ClientSession, url: str) -> str:
-    async with session.get(url, headers={"User-Agent": UA}, timeout=30) as rsp:
-        rsp.raise_for_status()
-        return await rsp.text()
+async def _fetch(
+    session: aiohttp.ClientSession,
+    url: str,
+    cache: Optional[HtmlCache] = None,
+    archive: Optional[ResponseArchive] = None,
+) -> str:
+    if archive is not None and archive.replaying:
+        return archive.replay(url).body
+
+    status, headers = 200, {}
+    body = None
+    if cache is not None:
+        body = await asyncio.to_thread(cache.get, url)
+
+    if body is None:
+        async with session.get(
+            url, headers={"User-Agent": UA}, timeout=30
+        ) as rsp:
+            rsp.raise_for_status()
+            body = await rsp.text()
+            status, headers = rsp.status, dict(rsp.headers)
+        if cache is not None:
+            await asyncio.to_thread(cache.put, url, body)
+
+    if archive is not None:  # cache hits are recorded too, for replay
+        await asyncio.to_thread(
+            archive.record, url, None, status, headers, body
+        )
+    return body
@@ -0,0 +1,42 @@
+"""Helpers shared by the lxml extraction backend of rabota.ru pages."""
+
+from typing import Iterator
+
+from lxml import etree
+
+# BeautifulSoup leaves the contents of these tags out of `get_text`.
+_SKIPPED_TAGS = frozenset({"script", "style", "template"})
+
+_HTML_PARSER = etree.HTMLParser()
+
+
+def parse_html(html: str) -> etree._Element | None:
+    """Parse a page into an lxml tree, `None` for an empty document."""
+    return etree.HTML(html, _HTML_PARSER)
+
+
+def has_class(name: str) -> str:
+    """Build an XPath predicate matching one entry of the class attribute."""
+    return (
+        "contains(concat(' ', normalize-space(@class), ' '), "
+        f"' {name} ')"
+    )
+
+
+def _strings(element: etree._Element) -> Iterator[str]:
+    """Yield the text nodes of a subtree in document order."""
+    if not isinstance(element.tag, str) or element.tag in _SKIPPED_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def text_of(element: etree._Element, separator: str = "") -> str:
+    """Return the text of a subtree like `Tag.get_text(sep, strip=True)`."""
+    return separator.join(
+        text for text in (s.strip() for s in _strings(element)) if text
+    )
@@ -0,0 +1,144 @@
+"""
+Microbenchmark for the rabota.ru page parsers.
+
+Runs the extraction backends over saved rabota.ru pages and reports
+per-page CPU time and pages/sec for each of them. Vacancy pages are
+also timed with the old approach, where every field extractor built
+its own tree from the raw HTML. Pages on which the backends disagree
+are reported as mismatches.
+
+Usage example:
+    python -m app.services.datasources.rabotaru.benchmark \
+        data/pages/vacancy_*.html --listing data/pages/search_*.html \
+        --repeat 5
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+from app.services.datasources.rabotaru.parser import (
+    extract_address,
+    extract_city_name,
+    extract_company_name,
+    extract_date,
+    extract_details,
+    extract_experience_education_employment,
+    extract_markdown_description,
+    extract_required_skills,
+)
+from app.services.datasources.rabotaru.traverser import parse_vacancies
+
+BACKENDS = ("bs4", "lxml")
+
+
+def _parse_listing(html: str, backend: str) -> object:
+    """Parse a search page with the given backend."""
+    return parse_vacancies(html, backend=backend)
+
+
+def _reparse_per_field(html: str) -> None:
+    """Extract all fields, parsing the page again for every extractor."""
+    extract_markdown_description(BeautifulSoup(html, "lxml"))
+    extract_required_skills(BeautifulSoup(html, "lxml"))
+    extract_address(BeautifulSoup(html, "lxml"))
+    extract_city_name(BeautifulSoup(html, "lxml"))
+    extract_company_name(BeautifulSoup(html, "lxml"))
+    extract_date(BeautifulSoup(html, "lxml"))
+    extract_experience_education_employment(BeautifulSoup(html, "lxml"))
+
+
+def _measure(
+    func: Callable[[str], object], pages: List[str], repeat: int
+) -> float:
+    """Return CPU seconds per page for `func` over `pages`."""
+    start = time.process_time()
+    for _ in range(repeat):
+        for html in pages:
+            func(html)
+    return (time.process_time() - start) / (repeat * len(pages))
+
+
+def _report(name: str, seconds: float) -> None:
+    """Print one benchmark line."""
+    print(f"  {name:<16} {seconds * 1000:8.2f} ms/page "
+          f"{1 / seconds:10.1f} pages/sec")
+
+
+def _mismatches(func: Callable[[str, str], object], pages: List[str]) -> int:
+    """Count pages on which the backends produce different output."""
+    return sum(
+        1 for html in pages
+        if len({repr(func(html, backend)) for backend in BACKENDS}) > 1
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse arguments in CLI run."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the rabota.ru page parsers"
+    )
+    parser.add_argument(
+        "pages",
+        type=Path,
+        nargs="*",
+        help="Saved rabota.ru vacancy pages (HTML files)",
+    )
+    parser.add_argument(
+        "--listing",
+        type=Path,
+        nargs="*",
+        default=[],
+        help="Saved rabota.ru search result pages (HTML files)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="How many times to run over the pages (default: 3)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark and print per-page timings."""
+    args = parse_args()
+    pages = [path.read_text(encoding="utf-8") for path in args.pages]
+    listing = [path.read_text(encoding="utf-8") for path in args.listing]
+
+    if pages:
+        print(f"Vacancy pages: {len(pages)} x {args.repeat}")
+        for backend in BACKENDS:
+            _report(
+                backend,
+                _measure(
+                    lambda html: extract_details(html, backend),
+                    pages,
+                    args.repeat,
+                ),
+            )
+        _report(
+            "parse per field",
+            _measure(_reparse_per_field, pages, args.repeat),
+        )
+        print(f"  mismatches: {_mismatches(extract_details, pages)}")
+
+    if listing:
+        print(f"Search pages: {len(listing)} x {args.repeat}")
+        for backend in BACKENDS:
+            _report(
+                backend,
+                _measure(
+                    lambda html: _parse_listing(html, backend),
+                    listing,
+                    args.repeat,
+                ),
+            )
+        print(f"  mismatches: {_mismatches(_parse_listing, listing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+On-disk cache of rabota.ru pages.
+
+Bodies are stored zstd-compressed in files named after the SHA-256 of
+the URL. Each file starts with a one-line JSON header holding the URL,
+the fetch timestamp and the codec. Entries expire per URL class: search pages
+change quickly, vacancy pages rarely. When the cache grows past
+`max_bytes`, the least recently used files are evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import zstandard
+
+LISTING = "listing"
+DETAIL = "detail"
+
+DEFAULT_TTL = {
+    LISTING: 60 * 60,  # search results shift every hour or so
+    DETAIL: 7 * 24 * 60 * 60,  # vacancy pages rarely change
+}
+
+
+def url_class(url: str) -> str:
+    """Classify a rabota.ru URL as a search page or a vacancy page."""
+    path = urlparse(url).path.strip("/").split("/")
+    if len(path) >= 2 and path[0] == "vacancy" and path[1].isdigit():
+        return DETAIL
+    return LISTING
+
+
+class HtmlCache:
+    """Content-addressed, compressed cache of fetched pages."""
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        ttl: Optional[dict[str, float]] = None,
+        max_bytes: int = 2 * 1024 ** 3,
+    ):
+        """Open (or create) a cache in *directory*."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_bytes = max_bytes
+        self.codec = "zstd"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(path.stat().st_size for path in self._files())
+
+    def _files(self):
+        return self.directory.glob("*/*.cache")
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.cache"
+
+    def _compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    @staticmethod
+    def _decompress(data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the cached body of *url*, `None` if missing or expired."""
+        path = self._path(url)
+        try:
+            with open(path, "rb") as file:
+                header = json.loads(file.readline())
+                if (
+                    header["url"] != url
+                    or header["codec"] != self.codec
+                    or time.time() - header["fetched_at"]
+                    > self.ttl[url_class(url)]
+                ):
+                    self.misses += 1
+                    return None
+                body = self._decompress(file.read())
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError, KeyError, zstandard.ZstdError):
+            # unreadable or corrupt entries are refetched
+            self.misses += 1
+            return None
+        self.hits += 1
+        return body.decode("utf-8")
+
+    def put(self, url: str, body: str) -> None:
+        """Store *body* as the current content of *url*."""
+        path = self._path(url)
+        header = json.dumps(
+            {"url": url, "fetched_at": time.time(), "codec": self.codec}
+        )
+        data = (
+            header.encode("utf-8")
+            + b"\n"
+            + self._compress(body.encode("utf-8"))
+        )
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries down to 90% of the budget."""
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._size -= size
@@ -16,12 +16,15 @@ It extracts:
 - Contact information (not implemented)
 
 Notes:
+- Each page is parsed once; all field extractors read the same tree.
 - HTML is fetched using aiohttp with disabled SSL verification.
 - Rabota.ru hides some contact details behind JavaScript; those are not scraped
 here.
 """
 
+from dataclasses import dataclass
 from bs4 import BeautifulSoup, NavigableString
+from lxml import etree
 import re
 import aiohttp
 
@@ -37,35 +40,70 @@ from app.api.v1.models import (
 )
 
 from app.services.datasources.rabotaru._api import _fetch
+from app.services.datasources.rabotaru.cache import HtmlCache
+from app.services.datasources.rabotaru._lxml import (
+    has_class,
+    parse_html,
+    text_of,
+)
 from app.services.datasources.rabotaru.traverser import VacancyShortWithUrl
 
 SOURCE = "rabota.ru"
 
 
 async def parse_vacancy(
-    short: VacancyShort, url: str | None = None
+    short: VacancyShort,
+    url: str | None = None,
+    backend: str = "bs4",
+    session: aiohttp.ClientSession | None = None,
+    cache: HtmlCache | None = None,
 ) -> Vacancy:
-    """Parse full vacancy details from a given short vacancy object and URL."""
+    """
+    Parse full vacancy details from a given short vacancy object and URL.
+
+    Pass *session* to reuse an existing session instead of opening a new
+    one for this page, and *cache* to serve the page from disk when it
+    was fetched recently.
+    """
     if isinstance(short, VacancyShortWithUrl):
         url = short.url
     elif url is None:
         raise TypeError("No url")
 
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(ssl=False)
-    ) as session:  # rabota uses TLS-ALPN
-        html = await _fetch(session, url)
+    if session is not None:
+        html = await _fetch(session, url, cache)
+    else:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=False)
+        ) as session:  # rabota uses TLS-ALPN
+            html = await _fetch(session, url, cache)
+
+    return build_vacancy(short, url, html, backend)
+
+
+@dataclass
+class VacancyDetails:
+    """Fields extracted from a single vacancy page."""
+
+    title: str | None
+    description: str
+    region: str | None
+    company: str | None
+    time_stamp: str | None
+    experience: str | None
+    education: str | None
+    employment: str | None
 
-    description = extract_markdown_description(html)
-    region = extract_city_name(html)
-    company = extract_company_name(html)
-    time_stamp = extract_date(html)
-    experience, education, employment = (
-        extract_experience_education_employment(html)
-    )
 
-    if education:
-        description = education + "\n\n" + description
+def build_vacancy(
+    short: VacancyShort, url: str, html: str, backend: str = "bs4"
+) -> Vacancy:
+    """Combine a search-page preview with its detail page into a Vacancy."""
+    details = extract_details(html, backend)
+
+    description = details.description
+    if details.education:
+        description = details.education + "\n\n" + description
 
     return Vacancy(
         id=-1,
@@ -73,28 +111,76 @@ async def parse_vacancy(
         source=Source(name=SOURCE),
         title=short.title,
         description=description,
-        company=Company(name=company) if company else None,
+        company=Company(name=details.company) if details.company else None,
         salary=short.salary,
         experience_category=(
-            ExperienceCategory(name=experience) if experience else None
+            ExperienceCategory(name=details.experience)
+            if details.experience
+            else None
         ),
-        location=Location(region=region) if region else None,
+        location=Location(region=details.region) if details.region else None,
         specialization=None,
         employment_types=(
-            [EmploymentType(name=employment)] if employment else []
+            [EmploymentType(name=details.employment)]
+            if details.employment
+            else []
+        ),
+        published_at=(
+            TimeStamp(time_stamp=details.time_stamp)
+            if details.time_stamp
+            else None
         ),
-        published_at=TimeStamp(time_stamp=time_stamp) if time_stamp else None,
         contacts=None,
         url=url,
     )
 
 
+def extract_details(html: str, backend: str = "bs4") -> VacancyDetails:
+    """
+    Extract every field of a vacancy page.
+
+    The page is parsed once and the resulting tree is shared by all
+    field extractors. `backend` selects BeautifulSoup (`"bs4"`) or
+    lxml with precompiled selectors (`"lxml"`); both produce the same
+    output.
+    """
+    try:
+        extract = _DETAIL_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown extraction backend: {backend}")
+    return extract(html)
+
+
+def _extract_details_soup(html: str) -> VacancyDetails:
+    """Extract vacancy page fields with BeautifulSoup."""
+    soup = BeautifulSoup(html, "lxml")
+    experience, education, employment = (
+        extract_experience_education_employment(soup)
+    )
+    return VacancyDetails(
+        title=extract_title(soup),
+        description=extract_markdown_description(soup),
+        region=extract_city_name(soup),
+        company=extract_company_name(soup),
+        time_stamp=extract_date(soup),
+        experience=experience,
+        education=education,
+        employment=employment,
+    )
+
+
 # --- Helper parser functions ---
+# Every extractor reads an already parsed page, see `extract_details`.
+
 
+def extract_title(soup: BeautifulSoup) -> str | None:
+    """Extract the vacancy title from the page heading."""
+    h1 = soup.find("h1")
+    return h1.get_text(strip=True) if h1 else None
 
-def extract_markdown_description(html: str) -> str:
+
+def extract_markdown_description(soup: BeautifulSoup) -> str:
     """Extract and convert the vacancy description into markdown format."""
-    soup = BeautifulSoup(html, "lxml")
     description_div = soup.find("div", itemprop="description")
 
     markdown = []
@@ -106,14 +192,22 @@ def extract_markdown_description(html: str) -> str:
         elif tag.name == "ul":
             for li in tag.find_all("li"):
                 markdown.append(f"- {li.get_text(strip=True)}")
-    result = "\n".join(markdown)
 
-    skills = skills_to_markdown(extract_required_skills(html))
+    return _join_description(
+        markdown, extract_required_skills(soup), extract_address(soup)
+    )
+
 
-    if skills:
-        result += "\n\n" + skills
+def _join_description(
+    markdown: list[str], skills: list[str], address: str | None
+) -> str:
+    """Join description lines, the skills list and the address."""
+    result = "\n".join(markdown)
+
+    skills_md = skills_to_markdown(skills)
 
-    address = extract_address(html)
+    if skills_md:
+        result += "\n\n" + skills_md
 
     if address:
         result += "\n\n" + address
@@ -121,10 +215,8 @@ def extract_markdown_description(html: str) -> str:
     return result
 
 
-def extract_required_skills(html: str) -> list[str]:
-    """Extract a list of required skills from the HTML."""
-    soup = BeautifulSoup(html, "lxml")
-
+def extract_required_skills(soup: BeautifulSoup) -> list[str]:
+    """Extract a list of required skills from the page."""
     skills_container = soup.find("div", class_="vacancy-card__skills-list")
     if not skills_container:
         return []
@@ -149,14 +241,13 @@ def skills_to_markdown(skills: list[str] | None) -> str:
     return md
 
 
-def extract_company_name(html: str) -> str | None:
+def extract_company_name(soup: BeautifulSoup) -> str | None:
     """
     Extract company name.
 
     Extract company name from <a> tag inside
     div class="vacancy-company-stats__name">.
     """
-    soup = BeautifulSoup(html, "lxml")
     div = soup.find("div", class_="vacancy-company-stats__name")
     if not div:
         return None
@@ -165,20 +256,18 @@ def extract_company_name(html: str) -> str | None:
     return a_tag.get_text(strip=True) if a_tag else None
 
 
-def extract_city_name(html: str) -> str | None:
+def extract_city_name(soup: BeautifulSoup) -> str | None:
     """Extract city name from <span class="vacancy-requirements__city">."""
-    soup = BeautifulSoup(html, "lxml")
     span = soup.find("span", class_="vacancy-requirements__city")
     return span.get_text(strip=True).strip(",.\n ") if span else None
 
 
-def _extract_additional_requirements(html: str) -> str | None:
+def _extract_additional_requirements(soup: BeautifulSoup) -> str | None:
     """
     Extract additional requirements text that follows.
 
     <span class="vacancy-requirements__city"> in the same parent.
     """
-    soup = BeautifulSoup(html, "lxml")
     city_span = soup.find("span", class_="vacancy-requirements__city")
     if not city_span:
         return None
@@ -188,13 +277,21 @@ def _extract_additional_requirements(html: str) -> str | None:
 
 
 def extract_experience_education_employment(
-    html: str,
+    soup: BeautifulSoup,
 ) -> tuple[str | None, str | None, str | None]:
-    """Extract experience, education, and employment type from HTML."""
-    req = _extract_additional_requirements(html)
+    """Extract experience, education, and employment type from the page."""
+    return _split_requirements(_extract_additional_requirements(soup))
+
 
+def _split_requirements(
+    req: str | None,
+) -> tuple[str | None, str | None, str | None]:
+    """Split the comma separated requirements line into its parts."""
     experience = education = employment = None
 
+    if not req:
+        return experience, education, employment
+
     match req.split(","):
         # 'опыт работы не имеет значения, образование любое'
         case experience, education:
@@ -220,7 +317,7 @@ def extract_experience_education_employment(
     return experience, education, employment
 
 
-def extract_address(html: str) -> str | None:
+def extract_address(soup: BeautifulSoup) -> str | None:
     """
     Extract address.
 
@@ -228,7 +325,6 @@ def extract_address(html: str) -> str | None:
     <div itemprop="address" class="vacancy-locations__address">,
     excluding child elements like .vacancy-locations__stations.
     """
-    soup = BeautifulSoup(html, "lxml")
     address_div = soup.find(
         "div", itemprop="address", class_="vacancy-locations__address"
     )
@@ -243,7 +339,7 @@ def extract_address(html: str) -> str | None:
     return None
 
 
-def extract_date(html: str) -> str | None:
+def extract_date(soup: BeautifulSoup) -> str | None:
     """
     Extract date timestamp.
 
@@ -251,7 +347,6 @@ def extract_date(html: str) -> str | None:
     Prefer <meta itemprop="datePosted"> if available,
     else take the second <span>.
     """
-    soup = BeautifulSoup(html, "lxml")
     wrapper = soup.find("span", class_="vacancy-system-info__updated-date")
     if not wrapper:
         return None
@@ -290,3 +385,131 @@ def parse_vacancy_phones(html: str) -> str:
     # 3. Extract and combine all remaining text
     text = container.get_text(separator=" ", strip=True)
     return text
+
+
+# --- lxml backend ---
+# Same extraction as the helpers above, on an lxml tree with selectors
+# compiled once at import time.
+
+_TITLE = etree.XPath("//h1")
+_DESCRIPTION = etree.XPath("//div[@itemprop='description']")
+_SKILLS_LIST = etree.XPath(
+    f"//div[{has_class('vacancy-card__skills-list')}]"
+)
+_SKILLS_ITEMS = etree.XPath(
+    f".//div[{has_class('vacancy-card__skills-item')}]"
+)
+_COMPANY = etree.XPath(f"//div[{has_class('vacancy-company-stats__name')}]")
+_CITY = etree.XPath(f"//span[{has_class('vacancy-requirements__city')}]")
+_NEXT_SPAN = etree.XPath("following-sibling::span[1]")
+_ADDRESS = etree.XPath(
+    "//div[@itemprop='address' and "
+    f"{has_class('vacancy-locations__address')}]"
+)
+_DATE = etree.XPath(
+    f"//span[{has_class('vacancy-system-info__updated-date')}]"
+)
+_DATE_POSTED = etree.XPath(".//meta[@itemprop='datePosted']")
+
+
+def _first(selector: etree.XPath, node) -> etree._Element | None:
+    """Return the first match of a compiled selector or `None`."""
+    found = selector(node)
+    return found[0] if found else None
+
+
+def _address_lxml(root: etree._Element) -> str | None:
+    """Return the first non-empty text node directly inside the address."""
+    address_div = _first(_ADDRESS, root)
+    if address_div is None:
+        return None
+
+    # BeautifulSoup counts comments among the direct strings, so do we.
+    strings = [address_div.text]
+    for child in address_div:
+        if isinstance(child, etree._Comment):
+            strings.append(child.text)
+        strings.append(child.tail)
+
+    for content in strings:
+        text = content.strip() if content else ""
+        if text:
+            return text
+    return None
+
+
+def _date_lxml(root: etree._Element) -> str | None:
+    """Return the publication date, see `extract_date`."""
+    wrapper = _first(_DATE, root)
+    if wrapper is None:
+        return None
+
+    meta = _first(_DATE_POSTED, wrapper)
+    if meta is not None and meta.get("content") is not None:
+        return meta.get("content")
+
+    spans = list(wrapper.iter("span"))[1:]  # iter() starts at the wrapper
+    if len(spans) >= 2:
+        return text_of(spans[1])
+
+    return None
+
+
+def _extract_details_lxml(html: str) -> VacancyDetails:
+    """Extract vacancy page fields with lxml."""
+    root = parse_html(html)
+
+    markdown = []
+    for tag in _DESCRIPTION(root)[0]:
+        if tag.tag == "p":
+            text = text_of(tag)
+            if text:
+                markdown.append(f"\n## {text}\n")
+        elif tag.tag == "ul":
+            for li in tag.iter("li"):
+                markdown.append(f"- {text_of(li)}")
+
+    skills_container = _first(_SKILLS_LIST, root)
+    skills = (
+        [text_of(item) for item in _SKILLS_ITEMS(skills_container)]
+        if skills_container is not None
+        else []
+    )
+
+    company_div = _first(_COMPANY, root)
+    company_link = (
+        next(company_div.iter("a"), None)
+        if company_div is not None
+        else None
+    )
+
+    city_span = _first(_CITY, root)
+    requirements = None
+    if city_span is not None:
+        sibling = _first(_NEXT_SPAN, city_span)
+        requirements = text_of(sibling) if sibling is not None else None
+    experience, education, employment = _split_requirements(requirements)
+
+    title = _first(_TITLE, root)
+    return VacancyDetails(
+        title=text_of(title) if title is not None else None,
+        description=_join_description(
+            markdown, skills, _address_lxml(root)
+        ),
+        region=(
+            text_of(city_span).strip(",.\n ")
+            if city_span is not None
+            else None
+        ),
+        company=text_of(company_link) if company_link is not None else None,
+        time_stamp=_date_lxml(root),
+        experience=experience,
+        education=education,
+        employment=employment,
+    )
+
+
+_DETAIL_BACKENDS = {
+    "bs4": _extract_details_soup,
+    "lxml": _extract_details_lxml,
+}
@@ -1,44 +1,203 @@
 """
-Traverse Rabota.ru, download vacancies, and save them as JSON.
+Traverse Rabota.ru, download vacancies, and save them as NDJSON.
+
+Search pages stream into a pool of detail workers, and every parsed
+vacancy is appended to the output file as one JSON line as soon as it
+is ready, so memory stays flat and results show up while the crawl is
+still running.
 
 Usage examples:
     python -m app.services.datasources.rabotaru.scraper # default 100 vacancies
-      -> vacancies.json
+      -> vacancies.ndjson
 
     python -m app.services.datasources.rabotaru.scraper --limit 500 \
-                               --output data/rabota_2025-06-25.json \
-                               --concurrency 20
+                               --output data/rabota_2025-06-25.ndjson \
+                               --concurrency 20 --window 4
+
+    # full crawl, one shard per specialization from catalog.json
+    python -m app.services.datasources.rabotaru.scraper \
+                               --shard-by specialization --connections 32
 """
 
 import argparse
 import asyncio
 import json
+from contextlib import aclosing
 from pathlib import Path
-from typing import List
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional
+
+import aiofiles
+import aiohttp
 
 from app.services.datasources.rabotaru.traverser import (
-    traverse,
+    iter_pages,
     VacancyShortWithUrl,
 )
+from app.services.datasources.rabotaru.cache import HtmlCache
 from app.services.datasources.rabotaru.parser import parse_vacancy
+from app.services.datasources.rabotaru.shards import (
+    SHARD_KINDS,
+    ShardStats,
+    build_shards,
+    crawl_shards,
+)
 from app.api.v1.models import Vacancy
 
+_DONE = object()  # end-of-stream marker passed between pipeline stages
+
 
 # --------------------------------------------------------------------------- #
 # Helpers
 # --------------------------------------------------------------------------- #
 async def _fetch_full(
     short: VacancyShortWithUrl,
-    sem: asyncio.Semaphore,
+    session: aiohttp.ClientSession,
+    backend: str,
+    cache: Optional[HtmlCache],
 ) -> Vacancy | None:
-    """Wrap `parse_vacancy` with a semaphore so we don’t hammer the site."""
-    async with sem:
+    """Wrap `parse_vacancy` so one broken page doesn't stop the crawl."""
+    try:
+        return await parse_vacancy(
+            short, backend=backend, session=session, cache=cache
+        )
+    except Exception as exc:  # noqa: BLE001
+        # You may want structured logging here
+        print(f"[WARN] Failed to parse vacancy {short.id}: {exc}")
+        return None
+
+
+async def iter_previews(
+    session: aiohttp.ClientSession,
+    *,
+    limit: int,
+    window: int = 1,
+    backend: str = "bs4",
+    cache: Optional[HtmlCache] = None,
+) -> AsyncIterator[VacancyShortWithUrl]:
+    """Yield up to *limit* previews from the search pages."""
+    if limit <= 0:
+        return
+    found = 0
+    pages = iter_pages(
+        session,
+        page_limit=limit,  # rabota.ru lists well over one vacancy a page
+        window=window,
+        backend=backend,
+        cache=cache,
+    )
+    async with aclosing(pages):
+        async for chunk in pages:
+            for short in chunk:
+                yield short
+                found += 1
+                if found >= limit:
+                    return
+
+
+async def take(
+    previews: AsyncGenerator[VacancyShortWithUrl, None],
+    limit: Optional[int],
+) -> AsyncIterator[VacancyShortWithUrl]:
+    """Yield at most *limit* previews, all of them if *limit* is None."""
+    if limit is not None and limit <= 0:
+        return
+    found = 0
+    async with aclosing(previews):
+        async for short in previews:
+            yield short
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+
+def print_shard_report(stats: Dict[str, ShardStats]) -> None:
+    """Print the per-shard yield of a sharded crawl."""
+    print(f"{'shard':<50} {'pages':>6} {'found':>7} {'new':>7}")
+    for name, shard in sorted(
+        stats.items(), key=lambda item: item[1].unique, reverse=True
+    ):
+        line = (f"{name[:50]:<50} {shard.pages:>6} "
+                f"{shard.previews:>7} {shard.unique:>7}")
+        if shard.error:
+            line += f"  [ERROR] {shard.error}"
+        print(line)
+    print(f"{'total':<50} {sum(s.pages for s in stats.values()):>6} "
+          f"{sum(s.previews for s in stats.values()):>7} "
+          f"{sum(s.unique for s in stats.values()):>7}")
+
+
+async def stream_vacancies(
+    previews: AsyncGenerator[VacancyShortWithUrl, None],
+    *,
+    session: aiohttp.ClientSession,
+    concurrency: int,
+    backend: str = "bs4",
+    cache: Optional[HtmlCache] = None,
+) -> AsyncIterator[Vacancy]:
+    """
+    Download full vacancy pages for *previews* as they arrive.
+
+    *concurrency* workers fetch detail pages and the vacancies are yielded
+    in completion order. Both queues are bounded, so at most a few
+    previews and vacancies are held in memory at any time. *previews*
+    is closed when the stream ends or is closed early.
+    """
+    todo: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    done: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    errors: List[Exception] = []
+
+    async def produce() -> None:
         try:
-            return await parse_vacancy(short)
+            async with aclosing(previews):
+                async for short in previews:
+                    await todo.put(short)
         except Exception as exc:  # noqa: BLE001
-            # You may want structured logging here
-            print(f"[WARN] Failed to parse vacancy {short.id}: {exc}")
-            return None
+            errors.append(exc)  # re-raised once the workers drain
+        for _ in range(concurrency):
+            await todo.put(_DONE)
+
+    async def work() -> None:
+        while (short := await todo.get()) is not _DONE:
+            vacancy = await _fetch_full(short, session, backend, cache)
+            if vacancy is not None:
+                await done.put(vacancy)
+        await done.put(_DONE)
+
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        running = concurrency
+        while running:
+            item = await done.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def write_ndjson(
+    vacancies: AsyncIterator[Vacancy], outfile: Path
+) -> int:
+    """Append each vacancy to *outfile* as one JSON line, return count."""
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    async with aiofiles.open(outfile, "w", encoding="utf-8") as file:
+        async for vacancy in vacancies:
+            await file.write(
+                json.dumps(vacancy.model_dump(), ensure_ascii=False) + "\n"
+            )
+            await file.flush()
+            written += 1
+            if written % 100 == 0:
+                print(f"Wrote {written} vacancies …")
+    print(f"Wrote {written} vacancies → {outfile.resolve()}")
+    return written
 
 
 async def collect_vacancies(
@@ -47,20 +206,20 @@ async def collect_vacancies(
     concurrency: int,
 ) -> List[Vacancy]:
     """
-    Run the whole pipeline.
+    Run the whole pipeline and keep the results in memory.
 
     traverse → fetch full vacancy pages → collect.
     """
-    print(f"Traversing Rabota.ru for up to {limit} vacancies …")
-    previews: List[VacancyShortWithUrl] = await traverse(limit=limit)
-    print(f"Found {len(previews)} previews, downloading full pages …")
-
-    sem = asyncio.Semaphore(concurrency)
-    tasks = [_fetch_full(short, sem) for short in previews]
-    results = await asyncio.gather(*tasks)
-
-    # Filter out any failed / None results
-    vacancies = [v for v in results if v is not None]
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=False)
+    ) as session:  # rabota uses TLS-ALPN
+        previews = iter_previews(session, limit=limit)
+        vacancies = [
+            vacancy
+            async for vacancy in stream_vacancies(
+                previews, session=session, concurrency=concurrency
+            )
+        ]
     print(f"Successfully parsed {len(vacancies)} vacancies.")
     return vacancies
 
@@ -86,14 +245,15 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--limit",
         type=int,
-        default=100,
-        help="Maximum number of vacancies to fetch (default: 100)",
+        default=None,
+        help="Maximum number of vacancies to fetch "
+        "(default: 100, no limit with --shard-by)",
     )
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("vacancies.json"),
-        help="Path to the output JSON file (default: vacancies.json)",
+        default=Path("vacancies.ndjson"),
+        help="Path to the output NDJSON file (default: vacancies.ndjson)",
     )
     parser.add_argument(
         "--concurrency",
@@ -102,17 +262,111 @@ def parse_args() -> argparse.Namespace:
         help="Number of concurrent requests when fetching full vacancy pages "
         "(default: 10)",
     )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=2,
+        help="Number of search pages fetched concurrently (default: 2)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["bs4", "lxml"],
+        default="bs4",
+        help="HTML extraction backend (default: bs4)",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=SHARD_KINDS,
+        default=None,
+        help="Crawl one shard per catalog specialization or industry id "
+        "instead of a single search",
+    )
+    parser.add_argument(
+        "--shard-concurrency",
+        type=int,
+        default=8,
+        help="Number of shards crawled in parallel (default: 8)",
+    )
+    parser.add_argument(
+        "--page-limit",
+        type=int,
+        default=100,
+        help="Maximum number of search pages per shard (default: 100)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Keep fetched pages in a compressed on-disk cache",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=2048,
+        help="Size limit of the page cache in MiB (default: 2048)",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=32,
+        help="Global limit of concurrent connections to rabota.ru "
+        "(default: 32)",
+    )
     return parser.parse_args()
 
 
 async def main() -> None:
     """Run traverser and parser."""
     args = parse_args()
-    vacancies = await collect_vacancies(
-        limit=args.limit,
-        concurrency=args.concurrency,
+    stats: Dict[str, ShardStats] = {}
+    cache = (
+        HtmlCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 ** 2)
+        if args.cache_dir
+        else None
     )
-    save_as_json(vacancies, args.output)
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=False, limit=args.connections)
+    ) as session:  # rabota uses TLS-ALPN
+        if args.shard_by:
+            shards = build_shards(args.shard_by)
+            print(f"Crawling {len(shards)} shards of Rabota.ru …")
+            previews = take(
+                crawl_shards(
+                    session,
+                    shards,
+                    stats=stats,
+                    shard_concurrency=args.shard_concurrency,
+                    page_limit=args.page_limit,
+                    window=args.window,
+                    backend=args.backend,
+                    cache=cache,
+                ),
+                args.limit,
+            )
+        else:
+            limit = args.limit if args.limit is not None else 100
+            print(f"Streaming up to {limit} vacancies from Rabota.ru …")
+            previews = iter_previews(
+                session,
+                limit=limit,
+                window=args.window,
+                backend=args.backend,
+                cache=cache,
+            )
+        vacancies = stream_vacancies(
+            previews,
+            session=session,
+            concurrency=args.concurrency,
+            backend=args.backend,
+            cache=cache,
+        )
+        async with aclosing(vacancies):
+            await write_ndjson(vacancies, args.output)
+
+    if stats:
+        print_shard_report(stats)
+    if cache:
+        print(f"Page cache: {cache.hits} hits, {cache.misses} misses")
 
 
 if __name__ == "__main__":
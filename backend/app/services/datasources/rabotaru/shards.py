@@ -0,0 +1,152 @@
+"""
+Sharded crawl of rabota.ru search results.
+
+A single search is capped at a few pages, so full coverage comes from
+splitting the crawl into shards, one per specialization or industry id
+from `catalog.json`. Shards run in parallel on a shared session, whose
+connection limit is the global concurrency budget, and their previews
+are merged into one stream deduplicated by vacancy id.
+"""
+
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from app.services.datasources.dedup import FingerprintSet
+from app.services.datasources.rabotaru.cache import HtmlCache
+from app.services.datasources.rabotaru.specializations import (
+    Catalog,
+    get_catalog,
+    get_it_spec_ids,
+)
+from app.services.datasources.rabotaru.traverser import (
+    iter_pages,
+    VacancyShortWithUrl,
+)
+
+SHARD_KINDS = ("specialization", "industry", "it")
+
+_DONE = object()  # marks the end of one shard in the merged stream
+
+
+@dataclass
+class Shard:
+    """One slice of the search space crawled independently."""
+
+    name: str
+    specialization_ids: List[int] = field(default_factory=list)
+    industry_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ShardStats:
+    """Yield of a single shard."""
+
+    pages: int = 0
+    previews: int = 0
+    unique: int = 0
+    error: Optional[str] = None
+
+
+def build_shards(
+    by: str = "specialization",
+    catalog: Optional[Catalog] = None,
+    ids: Optional[Iterable[int]] = None,
+) -> List[Shard]:
+    """
+    Build one shard per catalog id.
+
+    *by* is `"specialization"`, `"industry"` or `"it"` (the IT subset of
+    specializations, see `get_it_spec_ids`). *ids* narrows the shards
+    down to the given catalog ids.
+    """
+    if by not in SHARD_KINDS:
+        raise ValueError(f"Unknown shard kind: {by}")
+    catalog = catalog or get_catalog()
+    wanted = set(ids) if ids is not None else None
+    if by == "it":
+        it_ids = set(get_it_spec_ids())
+        wanted = it_ids if wanted is None else wanted & it_ids
+
+    if by == "industry":
+        return [
+            Shard(name=f"industry:{i.id} {i.name}", industry_ids=[i.id])
+            for i in catalog.industries
+            if wanted is None or i.id in wanted
+        ]
+    return [
+        Shard(
+            name=f"specialization:{s.id} {s.label}",
+            specialization_ids=[s.id],
+        )
+        for s in catalog.specializations
+        if wanted is None or s.id in wanted
+    ]
+
+
+async def crawl_shards(
+    session: aiohttp.ClientSession,
+    shards: List[Shard],
+    *,
+    stats: Dict[str, ShardStats],
+    shard_concurrency: int = 8,
+    page_limit: int = 100,
+    window: int = 2,
+    backend: str = "bs4",
+    cache: Optional[HtmlCache] = None,
+) -> AsyncGenerator[VacancyShortWithUrl, None]:
+    """
+    Crawl *shards* in parallel and yield previews not seen before.
+
+    Up to *shard_concurrency* shards walk their search pages at once,
+    each with up to *window* pages in flight; the connection limit of
+    *session* caps the total number of requests. A failing shard is
+    recorded in *stats* and does not stop the others.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=shard_concurrency * 4)
+    slots = asyncio.Semaphore(shard_concurrency)
+    seen = FingerprintSet()
+
+    async def crawl(shard: Shard) -> None:
+        shard_stats = stats.setdefault(shard.name, ShardStats())
+        try:
+            async with slots:
+                pages = iter_pages(
+                    session,
+                    specialization_ids=shard.specialization_ids,
+                    industry_ids=shard.industry_ids,
+                    page_limit=page_limit,
+                    window=window,
+                    backend=backend,
+                    cache=cache,
+                )
+                async with aclosing(pages):
+                    async for chunk in pages:
+                        shard_stats.pages += 1
+                        shard_stats.previews += len(chunk)
+                        for short in chunk:
+                            if short.id in seen:
+                                continue
+                            seen.add(short.id)
+                            shard_stats.unique += 1
+                            await queue.put(short)
+        except Exception as exc:  # noqa: BLE001
+            shard_stats.error = str(exc)
+        await queue.put(_DONE)
+
+    tasks = [asyncio.create_task(crawl(shard)) for shard in shards]
+    try:
+        running = len(tasks)
+        while running:
+            item = await queue.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,9 +1,10 @@
 """List of specializations from rabota.ru."""
 
 import json
+from pathlib import Path
 from pydantic import BaseModel
 
-CATALOG_PATH = "app/services/datasources/rabotaru/catalog.json"
+CATALOG_PATH = Path(__file__).with_name("catalog.json")
 
 IT_SPECIALIZATIONS = [
     "программист",
@@ -1,14 +1,25 @@
 """Traversal and parsing logic for rabota.ru vacancy listings."""
 
+import asyncio
 import re
-from typing import Iterable, List, Optional
+from collections import deque
+from contextlib import AsyncExitStack, aclosing
+from typing import AsyncIterator, Deque, Iterable, List, Optional
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
 from bs4 import BeautifulSoup
+from lxml import etree
 
 from app.api.v1.models import Salary, VacancyShort
 from app.services.datasources.rabotaru._api import _fetch
+from app.services.datasources.rabotaru.cache import HtmlCache
+from app.services.datasources.recording import ResponseArchive
+from app.services.datasources.rabotaru._lxml import (
+    has_class,
+    parse_html,
+    text_of,
+)
 
 
 class VacancyShortWithUrl(VacancyShort):
@@ -23,11 +34,12 @@ def _build_url(
     specialization_ids: Iterable[int] | None,
     industry_ids: Iterable[int],
     all_regions: bool,
+    sort: str = "relevance",
 ) -> str:
     if not all_regions:
         raise NotImplementedError("all_regions=False is not supported yet")
 
-    q = {"sort": "relevance", "page": str(page), "all_regions": "1"}
+    q = {"sort": sort, "page": str(page), "all_regions": "1"}
     if specialization_ids:
         q["specialization_ids"] = ",".join(map(str, specialization_ids))
 
@@ -38,31 +50,172 @@ def _build_url(
     return f"https://www.rabota.ru/vacancy/?{qs}"
 
 
+_SALARY_PERIODS = (
+    ("в час", "hour"),
+    ("за смену", "shift"),
+    ("в день", "day"),
+    ("в неделю", "week"),
+    ("в год", "year"),
+)
+
+
 def _parse_salary(raw: str) -> Salary:
     """Parse string with salary from a div from a search page."""
     raw = raw.strip()
-
-    # “От 80 тыс рублей” → value = 80 000 * 100 = 8 000 000
-    m = re.search(r"(\d[\d\s]*)", raw)
-    amount = (
-        int(m.group(1).replace(" ", "").replace("\xa0", "")) * 100
-        if m
-        else None
+    lowered = raw.lower()
+
+    # “От 80 000 рублей” → value = 80 000 * 100 = 8 000 000
+    amounts = [
+        int(m.replace(" ", "").replace("\xa0", "")) * 100
+        for m in re.findall(r"\d[\d\s\xa0]*\d|\d", raw)
+    ]
+    amount = amounts[0] if amounts else None
+
+    kind = (
+        "from"
+        if lowered.startswith("от")
+        else "to" if lowered.startswith("до") else None
     )
+    if len(amounts) >= 2:  # “от 80 000 до 120 000”, “80 000 – 120 000”
+        value_from, value_to = amounts[0], amounts[1]
+    elif kind == "from":
+        value_from, value_to = amount, None
+    elif kind == "to":
+        value_from, value_to = None, amount
+    else:
+        value_from, value_to = amount, amount
 
     return Salary(
-        type=(
-            "from"
-            if raw.lower().startswith("от")
-            else "to" if raw.lower().startswith("до") else None
-        ),
-        currency="RUB" if "руб" in raw.lower() else None,
+        type=kind,
+        currency="RUB" if "руб" in lowered else None,
         value=amount,
+        period=next(
+            (period for marker, period in _SALARY_PERIODS
+             if marker in lowered),
+            None,
+        ),
+        value_from=value_from,
+        value_to=value_to,
     )
 
 
+def _make_preview(
+    *,
+    href: str,
+    title: str,
+    description: str | None,
+    salary_text: str | None,
+    base_url: str,
+) -> VacancyShortWithUrl | None:
+    """Build a preview from the raw fields of a search card."""
+    href_abs = urljoin(base_url, href)
+    cleaned_url = href_abs.partition("/?")[0]
+
+    # id is the second path segment: /vacancy/53515632/…
+    parts = urlparse(href_abs).path.strip("/").split("/")
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None
+
+    return VacancyShortWithUrl(
+        id=int(parts[1]),
+        title=title,
+        description=description,
+        salary=(
+            _parse_salary(salary_text)
+            if salary_text is not None
+            else Salary()
+        ),
+        url=cleaned_url,
+    )
+
+
+def _parse_vacancies_soup(
+    html: str, base_url: str
+) -> list[VacancyShortWithUrl]:
+    """Extract search cards with BeautifulSoup."""
+    soup = BeautifulSoup(html, "lxml")
+    out: list[VacancyShortWithUrl] = []
+
+    for card in soup.select("div.vacancy-preview-card__top"):
+        # title + link
+        a = card.select_one("a.vacancy-preview-card__title_border")
+        if not a or not a.get("href"):
+            continue  # skip corrupt card
+
+        # description
+        desc_tag = card.select_one("div.vacancy-preview-card__description")
+
+        # salary (class name sometimes varies, so prefix match)
+        sal_tag = card.select_one('[class*="vacancy-preview-card__salary"]')
+
+        preview = _make_preview(
+            href=a["href"],
+            title=a.get_text(strip=True),
+            description=(
+                desc_tag.get_text(" ", strip=True) if desc_tag else None
+            ),
+            salary_text=(
+                sal_tag.get_text(" ", strip=True) if sal_tag else None
+            ),
+            base_url=base_url,
+        )
+        if preview:
+            out.append(preview)
+    return out
+
+
+_CARDS = etree.XPath(f"//div[{has_class('vacancy-preview-card__top')}]")
+_CARD_TITLE = etree.XPath(
+    f".//a[{has_class('vacancy-preview-card__title_border')}]"
+)
+_CARD_DESCRIPTION = etree.XPath(
+    f".//div[{has_class('vacancy-preview-card__description')}]"
+)
+_CARD_SALARY = etree.XPath(
+    ".//*[contains(@class, 'vacancy-preview-card__salary')]"
+)
+
+
+def _parse_vacancies_lxml(
+    html: str, base_url: str
+) -> list[VacancyShortWithUrl]:
+    """Extract search cards with lxml and the precompiled selectors."""
+    root = parse_html(html)
+    out: list[VacancyShortWithUrl] = []
+    if root is None:
+        return out
+
+    for card in _CARDS(root):
+        links = _CARD_TITLE(card)
+        if not links or not links[0].get("href"):
+            continue  # skip corrupt card
+        a = links[0]
+
+        desc_tags = _CARD_DESCRIPTION(card)
+        sal_tags = _CARD_SALARY(card)
+
+        preview = _make_preview(
+            href=a.get("href"),
+            title=text_of(a),
+            description=text_of(desc_tags[0], " ") if desc_tags else None,
+            salary_text=text_of(sal_tags[0], " ") if sal_tags else None,
+            base_url=base_url,
+        )
+        if preview:
+            out.append(preview)
+    return out
+
+
+_PARSE_BACKENDS = {
+    "bs4": _parse_vacancies_soup,
+    "lxml": _parse_vacancies_lxml,
+}
+
+
 def parse_vacancies(
-    html: str, base_url: str = "https://www.rabota.ru"
+    html: str,
+    base_url: str = "https://www.rabota.ru",
+    backend: str = "bs4",
 ) -> list[VacancyShort]:
     """Parse a rabota.ru vacancy.
 
@@ -79,51 +232,77 @@ def parse_vacancies(
     Args:
         html: Raw HTML content of a vacancy list page.
         base_url: Base URL to resolve relative links
+        backend: Extraction backend, `"bs4"` or `"lxml"`.
+            Both produce the same output.
 
     Returns:
         A list of `VacancyShortWithUrl` models parsed from the page.
         Returns an empty list if no valid vacancies are found.
     """
-    soup = BeautifulSoup(html, "lxml")
-    out: list[VacancyShortWithUrl] = []
-
-    for card in soup.select("div.vacancy-preview-card__top"):
-        # title + link
-        a = card.select_one("a.vacancy-preview-card__title_border")
-        if not a or not a.get("href"):
-            continue  # skip corrupt card
-        href_abs = urljoin(base_url, a["href"])
-        cleaned_url = href_abs.partition("/?")[0]
-
-        title = a.get_text(strip=True)
-        # id is the second path segment: /vacancy/53515632/…
-        parts = urlparse(href_abs).path.strip("/").split("/")
-        if len(parts) < 2 or not parts[1].isdigit():
-            continue
-        vac_id = int(parts[1])
-
-        # description
-        desc_tag = card.select_one("div.vacancy-preview-card__description")
-        description = desc_tag.get_text(" ", strip=True) if desc_tag else None
+    try:
+        parse = _PARSE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown extraction backend: {backend}")
+    return parse(html, base_url)
 
-        # salary (class name sometimes varies, so prefix match)
-        sal_tag = card.select_one('[class*="vacancy-preview-card__salary"]')
-        salary = (
-            _parse_salary(sal_tag.get_text(" ", strip=True))
-            if sal_tag
-            else Salary()
-        )
 
-        out.append(
-            VacancyShortWithUrl(
-                id=vac_id,
-                title=title,
-                description=description,
-                salary=salary,
-                url=cleaned_url,
-            )
+async def iter_pages(
+    session: aiohttp.ClientSession,
+    *,
+    specialization_ids: Optional[List[int]] = None,
+    industry_ids: List[int] = [1],
+    all_regions: bool = True,
+    start_page: int = 1,
+    page_limit: int = 10,
+    window: int = 1,
+    backend: str = "bs4",
+    cache: Optional[HtmlCache] = None,
+    sort: str = "relevance",
+    archive: Optional[ResponseArchive] = None,
+) -> AsyncIterator[List[VacancyShortWithUrl]]:
+    """
+    Yield the vacancies of consecutive search pages, in page order.
+
+    Up to *window* page fetches are kept in flight. The walk stops at
+    the first empty page; fetches already started for later pages are
+    cancelled, as are the outstanding ones when the consumer stops
+    iterating early. Pages found in *cache* are not downloaded again.
+    *sort* is passed to the site as is, `"date"` lists the newest first.
+    Pages are recorded to or replayed from *archive* when given.
+    """
+    pages = iter(range(start_page, start_page + page_limit))
+    pending: Deque[asyncio.Task] = deque()
+
+    def schedule_next() -> None:
+        page = next(pages, None)
+        if page is None:
+            return
+        url = _build_url(
+            page=page,
+            specialization_ids=specialization_ids or [],
+            industry_ids=industry_ids,
+            all_regions=all_regions,
+            sort=sort,
         )
-    return out
+        pending.append(asyncio.create_task(
+            _fetch(session, url, cache, archive)
+        ))
+
+    for _ in range(max(window, 1)):
+        schedule_next()
+
+    try:
+        while pending:
+            html = await pending.popleft()
+            schedule_next()
+            chunk = parse_vacancies(html, backend=backend)
+            if not chunk:  # reached last page
+                return
+            yield chunk
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
 
 async def traverse(
@@ -134,38 +313,50 @@ async def traverse(
     limit: Optional[int] = None,  # total vacancies desired
     start_page: int = 1,
     page_limit: int = 10,  # max pages to walk
+    window: int = 1,  # search pages fetched concurrently
+    backend: str = "bs4",
+    session: Optional[aiohttp.ClientSession] = None,
+    cache: Optional[HtmlCache] = None,
 ) -> List[VacancyShortWithUrl]:
     """
     Crawl rabota.ru.
 
-    Search pages sequentially (async I/O) and return up to *limit*
-    VacancyShort objects.
+    Search pages with up to *window* concurrent fetches (see
+    `iter_pages`) and return up to *limit* VacancyShort objects.
 
     Stops earlier if an empty result page is met.
 
     Stops earlier if exceeded the limit. May return list bigger than limit.
+
+    Pass *session* to reuse an existing session; otherwise one session
+    is opened for the whole run.
     """
     vacancies: list[VacancyShortWithUrl] = []
     if limit is not None and limit <= 0:
         return vacancies
 
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(ssl=False)
-    ) as session:  # rabota uses TLS-ALPN
-        for page in range(start_page, start_page + page_limit):
-            url = _build_url(
-                page=page,
-                specialization_ids=specialization_ids or [],
-                industry_ids=industry_ids,
-                all_regions=all_regions,
+    async with AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(
+                aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(ssl=False)
+                )  # rabota uses TLS-ALPN
             )
-            html = await _fetch(session, url)
-            chunk = parse_vacancies(html)
-            if not chunk:  # reached last page
-                break
-
-            vacancies.extend(chunk)
-            if limit and len(vacancies) >= limit:
-                return vacancies
+        pages = iter_pages(
+            session,
+            specialization_ids=specialization_ids,
+            industry_ids=industry_ids,
+            all_regions=all_regions,
+            start_page=start_page,
+            page_limit=page_limit,
+            window=window,
+            backend=backend,
+            cache=cache,
+        )
+        async with aclosing(pages):
+            async for chunk in pages:
+                vacancies.extend(chunk)
+                if limit and len(vacancies) >= limit:
+                    break
 
     return vacancies
@@ -0,0 +1,193 @@
+"""Record and replay raw datasource HTTP responses.
+
+In `record` mode every response a parser consumes is appended to a
+gzip-compressed NDJSON archive (URL, params, status, headers, body). In
+`replay` mode the parsers read responses from that archive instead of
+the network, so conversion and loading can be re-run offline.
+
+Values a run derives from the clock, such as a default date window,
+end up in the request params. They are pinned in the archive as header
+lines and read back on replay, so the replayed requests match.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Mapping, Optional
+
+HTTP_MODES = ("live", "record", "replay")
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed request is not in the archive."""
+
+    pass
+
+
+@dataclass
+class RecordedResponse:
+    """A raw HTTP response as stored in the archive."""
+
+    url: str
+    params: Dict[str, str]
+    status: int
+    body: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.body)
+
+
+def _normalize_params(params: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    """Drop empty params and stringify the rest, as they go on the wire."""
+    return {
+        str(k): str(v) for k, v in (params or {}).items() if v is not None
+    }
+
+
+def _request_key(url: str, params: Dict[str, str]) -> str:
+    """Return the lookup key of a request."""
+    return f"{url}?{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+
+class ResponseArchive:
+    """Append-only archive of HTTP responses."""
+
+    def __init__(self, path: str, mode: str):
+        """Open the archive.
+
+        Args:
+            path (str): Archive file, conventionally `*.ndjson.gz`.
+            mode (str): `"record"` appends to the archive, `"replay"`
+                loads it for lookups.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Deque[RecordedResponse]] = \
+            defaultdict(deque)
+        self._pinned: Dict[str, Deque[Any]] = defaultdict(deque)
+        self._file = None
+
+        if mode == "record":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # every run appends a new gzip member to the same file
+            self._file = gzip.open(path, "at", encoding="utf-8")
+        else:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        """Return whether responses come from the archive."""
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        """Index every response of the archive by request."""
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    data = json.loads(line)
+                    if "pinned" in data:
+                        self._pinned[data["pinned"]].append(data["value"])
+                        continue
+                    response = RecordedResponse(**data)
+                    key = _request_key(response.url, response.params)
+                    self._responses[key].append(response)
+                    count += 1
+            except (EOFError, gzip.BadGzipFile, zlib.error,
+                    json.JSONDecodeError) as e:
+                # a recording run that died leaves a truncated tail
+                logger.warning(f"Archive {self.path} is truncated "
+                               f"after {count} responses: {e}")
+        logger.info(f"Loaded {count} responses from {self.path}")
+
+    def record(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        status: int,
+        headers: Mapping[str, str],
+        body: str
+    ) -> None:
+        """Append a response to the archive."""
+        response = RecordedResponse(
+            url=url,
+            params=_normalize_params(params),
+            status=status,
+            body=body,
+            headers={str(k): str(v) for k, v in headers.items()},
+        )
+        line = json.dumps(asdict(response), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def replay(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None
+    ) -> RecordedResponse:
+        """Return the recorded response of a request.
+
+        Repeated requests get their responses in recording order; once
+        they run out, the last one is returned again.
+        """
+        responses = self._responses.get(
+            _request_key(url, _normalize_params(params)))
+        if not responses:
+            raise ReplayMissError(f"No recorded response for {url} "
+                                  f"{_normalize_params(params)}")
+        if len(responses) > 1:
+            return responses.popleft()
+        return responses[0]
+
+    def pin(self, name: str, value: Any) -> Any:
+        """Return a run value that must be the same on replay.
+
+        Recording stores the JSON-serializable *value* under *name* and
+        returns it; replay ignores *value* and returns the stored one.
+        Several recorded runs are replayed in order, like responses.
+        """
+        if self.replaying:
+            values = self._pinned.get(name)
+            if not values:
+                raise ReplayMissError(f"No pinned value {name}")
+            if len(values) > 1:
+                return values.popleft()
+            return values[0]
+        line = json.dumps({"pinned": name, "value": value},
+                          ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+        return value
+
+    def close(self) -> None:
+        """Close the archive file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def open_archive(
+    mode: str,
+    path: Optional[str]
+) -> Optional[ResponseArchive]:
+    """Open the archive for an HTTP mode, `None` when running live."""
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown HTTP mode: {mode}")
+    if mode == "live":
+        return None
+    return ResponseArchive(path, mode)
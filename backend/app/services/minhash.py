@@ -0,0 +1,108 @@
+"""MinHash signatures and LSH banding for near-duplicate vacancies."""
+
+import html
+import random
+import re
+import zlib
+from array import array
+from hashlib import blake2b
+from typing import Iterable, List, Optional, Set
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Shorter texts (a bare title) match too many unrelated vacancies.
+MIN_SHINGLES = 8
+# Estimated Jaccard similarity from which vacancies are duplicates.
+# With 32 bands of 4 rows, pairs above ~0.6 almost always share a band.
+DUPLICATE_THRESHOLD = 0.7
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# A fixed seed keeps signatures comparable across runs; the permutations
+# are not used for anything security related.
+_rng = random.Random(20240917)  # nosec B311
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TAG = re.compile(r"<[^>]+>")
+_NON_WORD = re.compile(r"[\W_]+")
+_LEGAL_FORM = re.compile(r"\b(ооо|оао|зао|пао|ао|ип|нко|llc|ltd|inc)\b")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip markup and punctuation, collapse whitespace."""
+    if not text:
+        return ""
+    text = html.unescape(_TAG.sub(" ", text)).lower().replace("ё", "е")
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def vacancy_text(
+    title: str,
+    company: Optional[str],
+    description: Optional[str]
+) -> str:
+    """Return the normalized text a vacancy signature is built from."""
+    company = _LEGAL_FORM.sub(" ", normalize(company))
+    return " ".join(
+        part for part in (normalize(title), company, normalize(description))
+        if part
+    )
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Return the hashed word *size*-grams of a normalized text."""
+    words = text.split()
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode())
+        for i in range(len(words) - size + 1)
+    }
+
+
+def signature(text: str) -> Optional[List[int]]:
+    """Return the MinHash signature of a normalized text.
+
+    `None` if the text is too short to be told apart from others.
+    """
+    hashed = shingles(text)
+    if len(hashed) < MIN_SHINGLES:
+        return None
+    return [
+        min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def similarity(left: Iterable[int], right: Iterable[int]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    left, right = list(left), list(right)
+    same = sum(1 for x, y in zip(left, right) if x == y)
+    return same / len(left)
+
+
+def band_keys(sig: List[int]) -> List[int]:
+    """Return one signed 64-bit bucket key per LSH band of *sig*."""
+    keys = []
+    for band in range(BANDS):
+        rows = array("I", sig[band * ROWS:(band + 1) * ROWS]).tobytes()
+        digest = blake2b(rows, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def to_bytes(sig: List[int]) -> bytes:
+    """Serialize a signature for storage."""
+    return array("I", sig).tobytes()
+
+
+def from_bytes(data: bytes) -> List[int]:
+    """Deserialize a stored signature."""
+    sig = array("I")
+    sig.frombytes(data)
+    return sig.tolist()
@@ -0,0 +1,85 @@
+"""Salary normalization to roubles per month."""
+
+from decimal import Decimal
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+BASE_CURRENCY = "RUB"
+
+# Codes the sources use for the same currency.
+CURRENCY_ALIASES = {
+    "RUR": "RUB",
+    "РУБ": "RUB",
+    "РУБ.": "RUB",
+}
+
+# How many of a period's pay make a month.
+PERIOD_PER_MONTH = {
+    "month": Decimal(1),
+    "year": Decimal(1) / Decimal(12),
+    "week": Decimal("4.345"),
+    "day": Decimal("21.75"),  # working days
+    "shift": Decimal(15),  # 2/2 schedule
+    "hour": Decimal(165),  # 40-hour week
+}
+
+# Sources storing `Salary.value` as fixed point (1 means 0.01).
+FIXED_POINT_SOURCES = {"rabota.ru"}
+
+SalaryRow = Tuple[Optional[str], Optional[Decimal], Optional[str],
+                  Optional[str], Optional[Decimal], Optional[Decimal]]
+MonthlySalary = Tuple[Optional[Decimal], Optional[Decimal], Optional[Decimal]]
+
+
+def normalize_currency(code: Optional[str]) -> Optional[str]:
+    """Return the ISO code of a currency as written by a source."""
+    if not code:
+        return None
+    code = code.strip().upper()
+    return CURRENCY_ALIASES.get(code, code)
+
+
+def normalize_period(period: Optional[str]) -> Decimal:
+    """Return the monthly multiplier of a pay period, month by default."""
+    if not period:
+        return PERIOD_PER_MONTH["month"]
+    return PERIOD_PER_MONTH.get(period.lower(), PERIOD_PER_MONTH["month"])
+
+
+def monthly_rub_batch(
+    rows: Sequence[SalaryRow],
+    rates: Mapping[str, Decimal]
+) -> List[MonthlySalary]:
+    """Convert a batch of salaries to roubles per month.
+
+    Args:
+        rows: `(source, value, currency, period, from, to)` per salary.
+        rates: Roubles per unit of each currency.
+
+    Returns:
+        The monthly rouble value, range start and range end per row.
+        Each is `None` when missing, not positive, or when the currency
+        has no rate.
+    """
+    result: List[MonthlySalary] = []
+    for source, value, currency, period, value_from, value_to in rows:
+        rate = rates.get(normalize_currency(currency) or BASE_CURRENCY)
+        if rate is None:
+            result.append((None, None, None))
+            continue
+        scale = rate * normalize_period(period)
+        if source in FIXED_POINT_SOURCES:
+            scale /= 100
+        result.append(tuple(
+            # some sources send 0 for a missing amount
+            None if amount is None or amount <= 0
+            else (Decimal(amount) * scale).quantize(Decimal("0.01"))
+            for amount in (value, value_from, value_to)
+        ))
+    return result
+
+
+def rates_by_code(rows: Sequence[Tuple[str, Decimal]]) -> Dict[str, Decimal]:
+    """Index currency rate rows by their normalized code."""
+    rates = {normalize_currency(code): Decimal(rate) for code, rate in rows}
+    rates.setdefault(BASE_CURRENCY, Decimal(1))
+    return rates
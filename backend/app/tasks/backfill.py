@@ -0,0 +1,84 @@
+"""Backfill worker for vacancies stored from HH search snippets.
+
+Run as `python -m app.tasks.backfill`. Several workers can run at once,
+each claims its own batch of queued tasks.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import async_session_maker
+from app.database.crud import backfill_task as crud_backfill_task, \
+    vacancy_listing as crud_vacancy_listing
+from app.services.datasources.HHru import HHVacancyParser, details_fields
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_details(
+    session: AsyncSession,
+    parser: HHVacancyParser,
+    batch_size: int = 20,
+    max_attempts: int = 5
+) -> int:
+    """Fetch details for one batch of queued vacancies.
+
+    Requests go through the parser and share its rate limiter.
+    Returns the number of tasks processed.
+    """
+    tasks = await crud_backfill_task.claim(session, batch_size)
+    vacancy_ids = [task.vacancy_id for task in tasks]
+    for task in tasks:
+        external_id = task.vacancy.external_id
+        full_vacancy = await parser.get_vacancy_details(external_id)
+        if full_vacancy is None:
+            await crud_backfill_task.fail(
+                session, task, f"No details for vacancy {external_id}",
+                max_attempts)
+            continue
+        description, contacts = details_fields(full_vacancy)
+        await crud_backfill_task.complete(
+            session, task, description, contacts)
+    # the details and the listing rows are committed together
+    await crud_vacancy_listing.refresh(session, vacancy_ids)
+    await session.commit()
+    return len(tasks)
+
+
+async def run_backfill_worker(
+    batch_size: int = 20,
+    max_attempts: int = 5,
+    idle_sleep: float = 30.0,
+    stop_when_empty: bool = False
+) -> None:
+    """Drain the backfill queue, polling it while it is empty."""
+    async with async_session_maker() as session, HHVacancyParser() as parser:
+        total = 0
+        while True:
+            processed = await backfill_details(
+                session, parser, batch_size, max_attempts)
+            total += processed
+            if processed:
+                logger.info(f"Backfilled {total} vacancies")
+                continue
+            if stop_when_empty:
+                return
+            await asyncio.sleep(idle_sleep)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Fetch details of vacancies stored from HH snippets")
+    argparser.add_argument("--batch-size", type=int, default=20)
+    argparser.add_argument("--max-attempts", type=int, default=5)
+    argparser.add_argument("--idle-sleep", type=float, default=30.0,
+                           help="Seconds to wait while the queue is empty")
+    argparser.add_argument("--once", action="store_true",
+                           help="Exit once the queue is empty")
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_backfill_worker(
+        args.batch_size, args.max_attempts, args.idle_sleep, args.once))
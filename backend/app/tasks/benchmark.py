@@ -0,0 +1,461 @@
+"""Offline ingestion benchmark.
+
+Drives the ingestion pipeline of `parse_services` without live APIs:
+vacancies come from a recorded response archive replayed through a
+parser, or from a generator of synthetic HH search items converted by
+the conversion stage. Vacancies go to a pluggable sink:
+
+- `null` drops them, measuring fetch and conversion only;
+- `memory` keeps their dumps, adding the cost of holding them;
+- `postgres` stores them with `store_vacancy` into a local database.
+
+Every stage configuration (conversion workers x batch size) is run in
+turn and reported with its throughput, CPU time, peak RSS and database
+statements per vacancy. Results are written as JSON to compare runs:
+
+    python -m app.tasks.benchmark --synthetic 5000 --workers 0 2 4
+    python -m app.tasks.benchmark --archive hh.ndjson.gz --sink postgres
+
+Peak RSS is the high-water mark of the benchmark process (and of the
+reaped worker processes), so a configuration never reports less than
+the ones run before it; run configurations separately to compare it.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.api.v1.models import Vacancy, VacancyFilter
+from app.core.config import get_settings
+from app.services.datasources.base import ParserConfig, VacancyParser
+from app.services.datasources.conversion import ConversionStage
+from app.services.datasources.HHru import HHVacancyParser, \
+    convert_hh_vacancy
+from app.services.datasources.RabotaRu import RabotaRuParser
+from app.services.datasources.SuperJob import SuperJobParser
+from app.tasks.parsing import SALARY_BATCH_SIZE, store_vacancy
+from app.tasks.salary import normalize_salaries
+
+logger = logging.getLogger(__name__)
+
+SINKS = ("null", "memory", "postgres")
+PARSERS = ("hh", "superjob", "rabotaru")
+
+# Source name of synthetic vacancies, keeps them apart in a shared DB.
+SYNTHETIC_SOURCE = "benchmark"
+
+_TITLES = ["Python developer", "Backend engineer", "Data analyst",
+           "QA engineer", "DevOps engineer", "Frontend developer",
+           "Project manager", "System administrator", "Designer"]
+_LEVELS = ["Junior", "Middle", "Senior", "Lead"]
+_COMPANIES = ["Alpha", "Beta Systems", "Gamma Soft", "Delta Group",
+              "Epsilon Tech", "Zeta Labs", "Eta Digital", "Theta"]
+_REGIONS = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск"]
+_WORDS = ("develop maintain design review test deploy monitor support "
+          "services api database queue cache cluster pipeline reports "
+          "customers team product release quality metrics incidents "
+          "python sql linux docker kubernetes postgresql kafka redis").split()
+_EXPERIENCE = [("noExperience", "Нет опыта"),
+               ("between1And3", "От 1 года до 3 лет"),
+               ("between3And6", "От 3 до 6 лет"),
+               ("moreThan6", "Более 6 лет")]
+_EMPLOYMENT = ["full", "part", "project"]
+_CURRENCIES = ["RUR", "RUR", "RUR", "USD", "EUR"]
+
+
+@dataclass
+class RunResult:
+    """Measurements of one stage configuration."""
+
+    workers: int
+    batch_size: int
+    vacancies: int
+    errors: int
+    seconds: float
+    vacancies_per_second: float
+    cpu_seconds: float
+    cpu_children_seconds: float
+    peak_rss_mib: float
+    peak_rss_children_mib: float
+    statements: int
+    statements_per_vacancy: float
+
+
+class BenchmarkSink:
+    """Destination of benchmarked vacancies, drops them."""
+
+    name = "null"
+
+    def __init__(self):
+        """Initialize the sink."""
+        self.statements = 0
+
+    async def open(self) -> None:
+        """Prepare the sink for a run."""
+        self.statements = 0
+
+    async def write(self, vacancy: Vacancy) -> None:
+        """Consume a vacancy."""
+        pass
+
+    async def close(self) -> None:
+        """Finish the run."""
+        pass
+
+
+class MemorySink(BenchmarkSink):
+    """Sink keeping the dumps of the vacancies in a list."""
+
+    name = "memory"
+
+    def __init__(self):
+        """Initialize the sink."""
+        super().__init__()
+        self.vacancies: List[Dict[str, Any]] = []
+
+    async def open(self) -> None:
+        """Prepare the sink for a run."""
+        await super().open()
+        self.vacancies = []
+
+    async def write(self, vacancy: Vacancy) -> None:
+        """Keep the dump of a vacancy."""
+        self.vacancies.append(vacancy.model_dump())
+
+
+class PostgresSink(BenchmarkSink):
+    """Sink storing vacancies the way `parse_services` does."""
+
+    name = "postgres"
+
+    def __init__(self, database_url: str, backfill: bool = False):
+        """Initialize the sink.
+
+        Args:
+            database_url (str): Async SQLAlchemy URL of the database.
+            backfill (bool): Queue a detail backfill per vacancy.
+        """
+        super().__init__()
+        self.database_url = database_url
+        self.backfill = backfill
+        self._engine = None
+        self._session: Optional[AsyncSession] = None
+        self._stored: List[int] = []
+
+    def _count_statement(self, *args) -> None:
+        """Count a statement sent to the database."""
+        self.statements += 1
+
+    async def open(self) -> None:
+        """Connect to the database."""
+        await super().open()
+        self._engine = create_async_engine(self.database_url)
+        event.listen(self._engine.sync_engine, "before_cursor_execute",
+                     self._count_statement)
+        session_maker = sessionmaker(self._engine, class_=AsyncSession,
+                                     expire_on_commit=False)
+        self._session = session_maker()
+        self._stored = []
+
+    async def write(self, vacancy: Vacancy) -> None:
+        """Store a vacancy, normalizing salaries in batches."""
+        try:
+            created = await store_vacancy(
+                self._session, vacancy, self.backfill)
+        except Exception:
+            await self._session.rollback()
+            raise
+        if created is None:
+            return  # stored by an earlier run
+        self._stored.append(created.id)
+        if len(self._stored) >= SALARY_BATCH_SIZE:
+            await normalize_salaries(self._session, self._stored)
+            self._stored = []
+
+    async def close(self) -> None:
+        """Normalize the last batch and disconnect."""
+        try:
+            await normalize_salaries(self._session, self._stored)
+        finally:
+            await self._session.close()
+            await self._engine.dispose()
+            self._stored = []
+
+
+def make_sink(name: str, database_url: Optional[str] = None,
+              backfill: bool = False) -> BenchmarkSink:
+    """Create a sink by name."""
+    if name == "null":
+        return BenchmarkSink()
+    if name == "memory":
+        return MemorySink()
+    if name == "postgres":
+        return PostgresSink(database_url or get_settings().DATABASE_URL,
+                            backfill)
+    raise ValueError(f"Unknown sink: {name}")
+
+
+def synthetic_hh_items(count: int, seed: int = 0,
+                       first_id: int = 1) -> List[Dict[str, Any]]:
+    """Generate HH search result items with plausible field variety."""
+    # reproducible synthetic data, not security related
+    rng = random.Random(seed)  # nosec B311
+    now = datetime.now()
+    items = []
+    for i in range(count):
+        low = rng.randrange(30, 300) * 1000
+        salary = rng.choice([
+            None,
+            {"from": low, "to": None},
+            {"from": None, "to": low},
+            {"from": low, "to": low + rng.randrange(10, 100) * 1000},
+        ])
+        if salary:
+            salary["currency"] = rng.choice(_CURRENCIES)
+            salary["gross"] = rng.random() < 0.5
+        exp_id, exp_name = rng.choice(_EXPERIENCE)
+        vacancy_id = first_id + i
+        published_at = now - timedelta(minutes=rng.randrange(24 * 60))
+        items.append({
+            "id": str(vacancy_id),
+            "name": f"{rng.choice(_LEVELS)} {rng.choice(_TITLES)}",
+            "employer": {"name": f"ООО {rng.choice(_COMPANIES)}"},
+            "area": {"name": rng.choice(_REGIONS)},
+            "salary": salary,
+            "experience": {"id": exp_id, "name": exp_name},
+            "employment": {"id": rng.choice(_EMPLOYMENT)},
+            "professional_roles": [{"name": rng.choice(_TITLES)}],
+            "snippet": {
+                "responsibility": " ".join(rng.choices(_WORDS, k=30)),
+                "requirement": " ".join(rng.choices(_WORDS, k=20)),
+            },
+            "published_at": published_at.strftime("%Y-%m-%dT%H:%M:%S+0300"),
+            "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+        })
+    return items
+
+
+async def synthetic_vacancies(
+    items: List[Dict[str, Any]],
+    conversion: ConversionStage,
+    counters: Dict[str, int]
+) -> AsyncIterator[Vacancy]:
+    """Convert synthetic items page by page, like the HH parser does."""
+    page_size = 100
+    for start in range(0, len(items), page_size):
+        page = items[start:start + page_size]
+        results = await conversion.map(
+            convert_hh_vacancy,
+            [(item, None, SYNTHETIC_SOURCE) for item in page],
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                counters["errors"] += 1
+                continue
+            yield result
+
+
+def make_parser(name: str, config: ParserConfig) -> VacancyParser:
+    """Create the parser replaying an archive."""
+    if name == "hh":
+        return HHVacancyParser(config, fetch_details=False)
+    if name == "superjob":
+        return SuperJobParser(config)
+    if name == "rabotaru":
+        return RabotaRuParser(config=config)
+    raise ValueError(f"Unknown parser: {name}")
+
+
+async def replayed_vacancies(
+    parser: VacancyParser,
+    filter: VacancyFilter,
+    limit: int
+) -> AsyncIterator[Vacancy]:
+    """Yield the vacancies a parser builds from its archive."""
+    async with parser:
+        async for vacancy in parser.search_vacancies(filter, limit):
+            yield vacancy
+
+
+def _usage() -> Dict[str, float]:
+    """Return CPU seconds and peak RSS (MiB) of the process and children."""
+    usage = {}
+    for prefix, who in (("", resource.RUSAGE_SELF),
+                        ("children_", resource.RUSAGE_CHILDREN)):
+        ru = resource.getrusage(who)
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+        usage[f"{prefix}cpu"] = ru.ru_utime + ru.ru_stime
+        usage[f"{prefix}rss"] = ru.ru_maxrss / scale
+    return usage
+
+
+async def run_configuration(
+    args: argparse.Namespace,
+    sink: BenchmarkSink,
+    workers: int,
+    batch_size: int,
+    run: int
+) -> RunResult:
+    """Benchmark one stage configuration."""
+    counters = {"vacancies": 0, "errors": 0}
+    conversion = None
+    if args.archive:
+        config = ParserConfig(
+            output_directory=tempfile.mkdtemp(prefix="benchmark-"),
+            conversion_workers=workers,
+            conversion_batch_size=batch_size,
+            http_mode="replay",
+            http_archive=args.archive,
+        )
+        date_to = datetime.fromtimestamp(args.date_to) if args.date_to \
+            else datetime.now()
+        date_from = datetime.fromtimestamp(args.date_from) \
+            if args.date_from else date_to - timedelta(days=1)
+        filter = VacancyFilter(
+            title=None,
+            salary_min=None,
+            salary_max=None,
+            experience_categories=[],
+            location=None,
+            date_published_from=int(date_from.timestamp()),
+            date_published_to=int(date_to.timestamp())
+        )
+        source = replayed_vacancies(
+            make_parser(args.parser, config), filter, args.limit)
+    else:
+        # ids unique per run so the postgres sink never hits a stored one
+        first_id = int(time.time()) * 1_000_000 + run * args.synthetic
+        items = synthetic_hh_items(args.synthetic, args.seed, first_id)
+        conversion = ConversionStage(workers, batch_size)
+        source = synthetic_vacancies(items, conversion, counters)
+
+    await sink.open()
+    before = _usage()
+    start = time.perf_counter()
+    try:
+        async for vacancy in source:
+            try:
+                await sink.write(vacancy)
+                counters["vacancies"] += 1
+            except Exception as e:
+                counters["errors"] += 1
+                logger.error(f"Failed to store vacancy: {e}")
+    finally:
+        if conversion is not None:
+            conversion.close()  # reaps the workers for their rusage
+        await sink.close()
+    seconds = time.perf_counter() - start
+    after = _usage()
+
+    count = counters["vacancies"]
+    return RunResult(
+        workers=workers,
+        batch_size=batch_size,
+        vacancies=count,
+        errors=counters["errors"],
+        seconds=round(seconds, 3),
+        vacancies_per_second=round(count / seconds, 1) if seconds else 0.0,
+        cpu_seconds=round(after["cpu"] - before["cpu"], 3),
+        cpu_children_seconds=round(
+            after["children_cpu"] - before["children_cpu"], 3),
+        peak_rss_mib=round(after["rss"], 1),
+        peak_rss_children_mib=round(after["children_rss"], 1),
+        statements=sink.statements,
+        statements_per_vacancy=round(sink.statements / count, 2)
+        if count else 0.0,
+    )
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every stage configuration and collect the report."""
+    sink = make_sink(args.sink, args.database_url, args.backfill)
+    runs = []
+    run = 0
+    for workers in args.workers:
+        for batch_size in args.batch_sizes:
+            result = await run_configuration(
+                args, sink, workers, batch_size, run)
+            run += 1
+            logger.info(
+                f"workers={workers} batch_size={batch_size}: "
+                f"{result.vacancies} vacancies, "
+                f"{result.vacancies_per_second} vacancies/s, "
+                f"cpu {result.cpu_seconds}s "
+                f"(+{result.cpu_children_seconds}s in workers), "
+                f"peak RSS {result.peak_rss_mib} MiB, "
+                f"{result.statements_per_vacancy} statements/vacancy"
+            )
+            runs.append(asdict(result))
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": {
+            "archive": args.archive,
+            "parser": args.parser if args.archive else None,
+            "synthetic": None if args.archive else args.synthetic,
+            "seed": None if args.archive else args.seed,
+            "limit": args.limit if args.archive else None,
+        },
+        "sink": args.sink,
+        "runs": runs,
+    }
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Benchmark ingestion from recorded or synthetic data")
+    source_group = argparser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--archive",
+                              help="Response archive to replay")
+    source_group.add_argument("--synthetic", type=int,
+                              help="Number of synthetic HH vacancies")
+    argparser.add_argument("--parser", choices=PARSERS, default="hh",
+                           help="Parser replaying the archive")
+    argparser.add_argument("--limit", type=int, default=200,
+                           help="Vacancies requested from the parser")
+    argparser.add_argument("--date-from", type=int, default=None,
+                           help="Filter start (unix time) of the recording")
+    argparser.add_argument("--date-to", type=int, default=None,
+                           help="Filter end (unix time) of the recording")
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument("--sink", choices=SINKS, default="null")
+    argparser.add_argument("--database-url", default=None,
+                           help="Database of the postgres sink, "
+                                "DATABASE_URL by default")
+    argparser.add_argument("--backfill", action="store_true",
+                           help="Queue detail backfills in the postgres "
+                                "sink")
+    argparser.add_argument("--workers", type=int, nargs="+", default=[0],
+                           help="Conversion worker counts to compare")
+    argparser.add_argument("--batch-sizes", type=int, nargs="+",
+                           default=[32],
+                           help="Conversion batch sizes to compare")
+    argparser.add_argument("--output", default=None,
+                           help="JSON file for the results, stdout if "
+                                "omitted")
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(run_benchmark(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
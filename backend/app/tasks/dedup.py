@@ -0,0 +1,103 @@
+"""Near-duplicate linking of vacancies across sources.
+
+New vacancies are indexed and linked as they are stored. Run as
+`python -m app.tasks.dedup` to index the vacancies stored without a
+signature, e.g. those stored before duplicates were linked.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import async_session_maker
+from app.database.crud import vacancy as crud_vacancy, \
+    vacancy_listing as crud_vacancy_listing
+from app.services import minhash
+
+logger = logging.getLogger(__name__)
+
+
+async def link_duplicate(
+    session: AsyncSession,
+    vacancy_id: int,
+    source_id: Optional[int],
+    text: str
+) -> Optional[int]:
+    """Index a stored vacancy and link it to its canonical copy.
+
+    Candidates come from the LSH buckets of the signature of the
+    normalized vacancy `text`, other sources only, and are confirmed by
+    the estimated similarity. Returns the canonical vacancy ID if the
+    vacancy is a near-duplicate. Not committed.
+    """
+    signature = minhash.signature(text)
+    if signature is None:
+        return None
+    bands = minhash.band_keys(signature)
+
+    canonical_id = None
+    best = minhash.DUPLICATE_THRESHOLD
+    candidates = await crud_vacancy.find_duplicate_candidates(
+        session, bands, vacancy_id, source_id
+    )
+    for candidate_id, candidate_canonical_id, stored in candidates:
+        score = minhash.similarity(signature, minhash.from_bytes(stored))
+        if score >= best:
+            best = score
+            canonical_id = candidate_canonical_id or candidate_id
+
+    await crud_vacancy.index_signature(
+        session, vacancy_id, minhash.to_bytes(signature), bands,
+        canonical_id
+    )
+    return canonical_id
+
+
+async def index_unindexed(
+    session: AsyncSession,
+    batch_size: int = 1000
+) -> int:
+    """Index and link every vacancy stored without a signature.
+
+    Vacancies are processed oldest first, one transaction per batch, and
+    link to copies indexed before them. Returns the number of vacancies
+    linked as duplicates.
+    """
+    last_id = 0
+    linked = 0
+    while True:
+        rows = await crud_vacancy.get_unindexed(session, last_id, batch_size)
+        if not rows:
+            return linked
+        duplicates = []
+        for vacancy_id, source_id, title, company, description in rows:
+            canonical_id = await link_duplicate(
+                session, vacancy_id, source_id,
+                minhash.vacancy_text(title, company, description)
+            )
+            if canonical_id is not None:
+                duplicates.append(vacancy_id)
+        await crud_vacancy_listing.refresh(session, duplicates)
+        await session.commit()
+        linked += len(duplicates)
+        last_id = rows[-1][0]
+        logger.info(f"Indexed vacancies up to {last_id}, "
+                    f"{linked} duplicates linked")
+
+
+async def index_all(batch_size: int = 1000) -> None:
+    """Index the vacancies stored without a signature."""
+    async with async_session_maker() as session:
+        await index_unindexed(session, batch_size)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Index and link vacancies stored without a signature")
+    argparser.add_argument("--batch-size", type=int, default=1000)
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(index_all(args.batch_size))
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional, Set
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database.database import get_async_session
@@ -11,20 +11,32 @@ from app.database.crud import vacancy as crud_vacancy, \
     salary_type as crud_salary_type, \
     experience_category as crud_experience_category, \
     location as crud_location, specialization as crud_specialization, \
-    employment_type as crud_employment_type
+    employment_type as crud_employment_type, \
+    backfill_task as crud_backfill_task, \
+    vacancy_listing as crud_vacancy_listing
 from app.database.models import Source as DBSource, \
     Company as DBCompany, SalaryType as DBSalaryType, \
     ExperienceCategory as DBExperienceCategory, \
     Location as DBLocation, Specialization as DBSpecialization, \
     EmploymentType as DBEmploymentType, Vacancy as DBVacancy
+from app.services import minhash
+from app.tasks.dedup import link_duplicate
+from app.tasks.salary import normalize_salaries
+from app.tasks.partitions import ensure_partitions
 from app.services.datasources.base import VacancyParser
 from app.services.datasources.SuperJob import SuperJobParser
 from app.services.datasources.HHru import HHVacancyParser
+from app.services.datasources.RabotaRu import RabotaRuParser
+from app.services.datasources.rabotaru.parser import \
+    SOURCE as RABOTARU_SOURCE
 from app.api.v1.models import ExperienceCategory, Location, Vacancy, \
     Source, Company, Specialization, EmploymentType, VacancyFilter
 
 logger = logging.getLogger(__name__)
 
+# Stored vacancies per salary normalization batch.
+SALARY_BATCH_SIZE = 100
+
 
 async def store_source(
     session: AsyncSession,
@@ -158,11 +170,30 @@ async def store_employment_type(
     return found
 
 
+def parse_published_at(date_string: str) -> Optional[datetime]:
+    """Parse a publication timestamp, `None` if the format is unknown."""
+    try:
+        return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(date_string)
+    except ValueError:
+        logger.warning(f"Unknown publication date format: {date_string}")
+        return None
+
+
 async def store_vacancy(
     session: AsyncSession,
-    vacancy: Vacancy
-) -> DBVacancy:
-    """Store vacancy in database."""
+    vacancy: Vacancy,
+    backfill: bool = False
+) -> Optional[DBVacancy]:
+    """Store vacancy in database.
+
+    With `backfill`, a detail fetch is queued for the stored vacancy.
+    Returns `None` if a vacancy with the same source and external ID is
+    stored already, whatever its publication time.
+    """
     db_source = None
     db_company = None
     db_salary_type = None
@@ -215,12 +246,24 @@ async def store_vacancy(
     if db_specialization:
         specialization_id = db_specialization.id
     if vacancy.published_at:
-        date_string = vacancy.published_at.time_stamp
-        published_at = datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S%z")
+        published_at = parse_published_at(vacancy.published_at.time_stamp)
+
+    key = await crud_vacancy.claim_key(
+        session, source_id, str(vacancy.external_id)
+    )
+    if key is None:
+        return None
+    vacancy_id, first_seen_at = key
+    if published_at is None:
+        # the publication time routes the row to its monthly partition
+        published_at = first_seen_at
 
-    created = await crud_vacancy.create(
-        session,
-        obj_in={
+    # the vacancy, its links and its listing row are committed together,
+    # a failure leaves none of them behind
+    created = DBVacancy(
+        employment_types=db_employment_types,
+        **{
+            "id": vacancy_id,
             "external_id": vacancy.external_id,
             "source_id": source_id,
             "title": vacancy.title,
@@ -229,6 +272,9 @@ async def store_vacancy(
             "salary_type_id": salary_type_id,
             "salary_currency": vacancy.salary.currency,
             "salary_value": vacancy.salary.value,
+            "salary_period": vacancy.salary.period,
+            "salary_from": vacancy.salary.value_from,
+            "salary_to": vacancy.salary.value_to,
             "experience_category_id": experience_category_id,
             "location_id": location_id,
             "specialization_id": specialization_id,
@@ -237,24 +283,62 @@ async def store_vacancy(
             "url": vacancy.url
         }
     )
+    session.add(created)
+    await session.flush()
+
+    if backfill:
+        await crud_backfill_task.enqueue(session, created.id, published_at)
 
-    for db_employment_type in db_employment_types:
-        created.employment_types.append(db_employment_type)
-        await session.commit()
-        await session.refresh(created)
+    canonical_id = await link_duplicate(
+        session, created.id, source_id, minhash.vacancy_text(
+            vacancy.title,
+            vacancy.company.name if vacancy.company else None,
+            vacancy.description
+        )
+    )
+    if canonical_id is not None:
+        logger.info(f"Vacancy {created.id} duplicates {canonical_id}")
+    await crud_vacancy_listing.refresh(session, [created.id])
+    await session.commit()
+    await session.refresh(created)
 
     return created
 
 
+async def normalize_stored(
+    session: AsyncSession,
+    vacancy_ids: List[int]
+) -> None:
+    """Normalize the salaries of freshly stored vacancies.
+
+    A failing batch is logged and rolled back, the vacancies stay stored
+    and are picked up by the next full renormalization.
+    """
+    try:
+        await normalize_salaries(session, vacancy_ids)
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Failed to normalize salaries: {e}")
+
+
 async def parse_services():
     """Parse and store vacancies from all services."""
     try:
         session_gen = get_async_session()
         session = await session_gen.__anext__()
+        # new vacancies must not pile up in the default partition
+        await ensure_partitions(session)
+
+        async def known_rabotaru_ids(ids: List[str]) -> Set[str]:
+            return await crud_vacancy.get_existing_external_ids(
+                session, RABOTARU_SOURCE, ids
+            )
 
         parsers: List[VacancyParser] = [
             SuperJobParser(),
-            HHVacancyParser(),
+            # details are fetched later by the backfill worker
+            HHVacancyParser(fetch_details=False),
+            RabotaRuParser(known_ids=known_rabotaru_ids),
         ]
         date_from = datetime.now() - timedelta(days=1)
         date_to = datetime.now()
@@ -269,12 +353,22 @@ async def parse_services():
         )
         for parser in parsers:
             logger.info(f"Running parser `{parser.parser_name}`")
+            backfill = not getattr(parser, "fetch_details", True)
+            stored: List[int] = []
             async with parser:
                 async for vacancy in parser.search_vacancies(filter, 200):
                     logger.info(f"Storing vacancy {vacancy}")
                     try:
-                        await store_vacancy(session, vacancy)
+                        created = await store_vacancy(
+                            session, vacancy, backfill)
+                        if created is not None:
+                            stored.append(created.id)
                     except Exception as e:
+                        await session.rollback()
                         logger.error(f"Failed to store vacancy: {e}")
+                    if len(stored) >= SALARY_BATCH_SIZE:
+                        await normalize_stored(session, stored)
+                        stored = []
+            await normalize_stored(session, stored)
     except Exception as e:
         logger.info(f"Something went wrong while parsing: {e}")
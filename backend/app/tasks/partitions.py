@@ -0,0 +1,198 @@
+"""Maintenance of the monthly `Vacancy` partitions.
+
+Run as `python -m app.tasks.partitions`, e.g. daily from cron. Partitions
+for the coming months are created ahead of time, partitions older than
+the retention window are detached and moved to the `archive` schema,
+where they can be dumped or dropped.
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List
+
+from sqlalchemy import column, delete, func, insert, select, table, text, \
+    update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import async_session_maker
+from app.database.models import BackfillTask, Vacancy, VacancyListing, \
+    VacancyLshBand, VacancySignature
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = "archive"
+MONTHS_AHEAD = 3
+KEEP_MONTHS = 12
+
+_PARTITION_NAME = re.compile(r"^Vacancy_(\d{4})_(\d{2})$")
+_MOVING_ROWS = "vacancy.moving_rows"
+# DDL takes no bound parameters, identifiers are quoted instead
+_quote = postgresql.dialect().identifier_preparer.quote
+
+
+def add_months(month: date, months: int) -> date:
+    """Return the first day of the month *months* after *month*."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Return the name of the partition holding *month*."""
+    return f"Vacancy_{month:%Y_%m}"
+
+
+def partition_table(name: str, schema: str | None = None):
+    """Return a table clause of a partition with the `Vacancy` columns."""
+    return table(name, *(column(c.name) for c in Vacancy.__table__.c),
+                 schema=schema)
+
+
+def current_month() -> date:
+    """Return the first day of the current UTC month."""
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+async def partition_months(session: AsyncSession) -> List[date]:
+    """Return the months of the attached monthly partitions, oldest first."""
+    result = await session.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = '\"Vacancy\"'::regclass"
+    ))
+    months = []
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+async def create_partition(session: AsyncSession, month: date) -> None:
+    """Create the partition of *month*.
+
+    Rows of that month which landed in the default partition are moved
+    into the new one before it is attached, otherwise attaching fails.
+    """
+    name = partition_name(month)
+    following = add_months(month, 1)
+    await session.execute(text(
+        f"CREATE TABLE {_quote(name)} (LIKE \"Vacancy\" INCLUDING DEFAULTS)"
+    ))
+    default = partition_table("Vacancy_default")
+    moved = (
+        delete(default)
+        .where(default.c.published_at >= month,
+               default.c.published_at < following)
+        .returning(*default.c)
+        .cte("moved")
+    )
+    # keeps the vacancy_delete_cleanup trigger from dropping the rows
+    # keyed by the moved vacancies
+    await session.execute(select(func.set_config(_MOVING_ROWS, "on", True)))
+    await session.execute(
+        insert(partition_table(name))
+        .from_select([c.name for c in default.c], select(*moved.c))
+    )
+    await session.execute(select(func.set_config(_MOVING_ROWS, "off", True)))
+    await session.execute(text(
+        f"ALTER TABLE \"Vacancy\" ATTACH PARTITION {_quote(name)} "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{following.isoformat()}')"
+    ))
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    months_ahead: int = MONTHS_AHEAD
+) -> List[str]:
+    """Create missing partitions up to *months_ahead* months from now.
+
+    Returns the names of the created partitions.
+    """
+    existing = set(await partition_months(session))
+    created = []
+    month = current_month()
+    for _ in range(months_ahead + 1):
+        if month not in existing:
+            await create_partition(session, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    await session.commit()
+    for name in created:
+        logger.info(f"Created partition {name}")
+    return created
+
+
+async def archive_partition(session: AsyncSession, month: date) -> None:
+    """Detach the partition of *month* and move it to the archive schema.
+
+    Rows keyed by the archived vacancies in the listing, deduplication
+    and backfill tables are dropped, duplicates pointing to them become
+    canonical. Favorites are kept, so the vacancies reappear when the
+    partition is attached back.
+    """
+    name = partition_name(month)
+    await session.execute(text(
+        f"ALTER TABLE \"Vacancy\" DETACH PARTITION {_quote(name)}"
+    ))
+    await session.execute(text(
+        f"ALTER TABLE {_quote(name)} SET SCHEMA {_quote(ARCHIVE_SCHEMA)}"
+    ))
+    archived = select(partition_table(name, schema=ARCHIVE_SCHEMA).c.id)
+    for key in (VacancyListing.id, VacancySignature.vacancy_id,
+                VacancyLshBand.vacancy_id, BackfillTask.vacancy_id):
+        await session.execute(delete(key.table).where(key.in_(archived)))
+    for canonical_id in (Vacancy.__table__.c.canonical_id,
+                         VacancyListing.canonical_id):
+        await session.execute(
+            update(canonical_id.table)
+            .where(canonical_id.in_(archived))
+            .values(canonical_id=None)
+        )
+
+
+async def archive_partitions(
+    session: AsyncSession,
+    keep_months: int = KEEP_MONTHS
+) -> List[str]:
+    """Archive partitions older than *keep_months* months.
+
+    Returns the names of the archived partitions.
+    """
+    cutoff = add_months(current_month(), -keep_months)
+    archived = []
+    for month in await partition_months(session):
+        if month >= cutoff:
+            break
+        await archive_partition(session, month)
+        # one transaction per partition keeps the exclusive lock short
+        await session.commit()
+        archived.append(partition_name(month))
+        logger.info(f"Archived partition {partition_name(month)}")
+    return archived
+
+
+async def maintain_partitions(
+    months_ahead: int = MONTHS_AHEAD,
+    keep_months: int = KEEP_MONTHS
+) -> None:
+    """Create upcoming partitions and archive expired ones."""
+    async with async_session_maker() as session:
+        await ensure_partitions(session, months_ahead)
+        await archive_partitions(session, keep_months)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Create upcoming and archive expired vacancy partitions")
+    argparser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD,
+                           help="Months of partitions to create in advance")
+    argparser.add_argument("--keep-months", type=int, default=KEEP_MONTHS,
+                           help="Months of partitions to keep attached")
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(maintain_partitions(args.months_ahead, args.keep_months))
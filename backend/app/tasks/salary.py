@@ -0,0 +1,85 @@
+"""Salary normalization stage.
+
+Fills `Vacancy.salary_monthly_rub` and `Vacancy.salary_range` from the
+stored salary, its source, currency and pay period, using the rates of
+the `CurrencyRate` table. Run as `python -m app.tasks.salary` to
+renormalize every vacancy, e.g. after the rates were updated.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Range
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import async_session_maker
+from app.database.crud import vacancy as crud_vacancy, \
+    vacancy_listing as crud_vacancy_listing, get_currency_rates
+from app.database.models import Vacancy as DBVacancy
+from app.services.salary import monthly_rub_batch, rates_by_code
+
+logger = logging.getLogger(__name__)
+
+
+async def normalize_salaries(
+    session: AsyncSession,
+    vacancy_ids: List[int]
+) -> int:
+    """Normalize the salaries of a batch of vacancies.
+
+    Returns the number of vacancies with a salary value.
+    """
+    rows = await crud_vacancy.get_salary_rows(session, vacancy_ids)
+    if not rows:
+        return 0
+    rates = rates_by_code(await get_currency_rates(session))
+    monthly = monthly_rub_batch([row[1:] for row in rows], rates)
+
+    salaries = {}
+    for row, (amount, low, high) in zip(rows, monthly):
+        if low is None and high is None:
+            low = high = amount  # only a single value is known
+        if low is not None and high is not None and low > high:
+            # some postings swap "from" and "to"; Postgres rejects the
+            # whole batch on an inverted range
+            low, high = high, low
+        salary_range = None
+        if low is not None or high is not None:
+            salary_range = Range(low, high, bounds="[]")
+        salaries[row[0]] = (amount, salary_range)
+    await crud_vacancy.set_normalized_salaries(session, salaries)
+    await crud_vacancy_listing.refresh(session, list(salaries))
+    await session.commit()
+    return len(rows)
+
+
+async def renormalize_all(batch_size: int = 1000) -> None:
+    """Normalize the salaries of every stored vacancy."""
+    async with async_session_maker() as session:
+        last_id = 0
+        total = 0
+        while True:
+            result = await session.execute(
+                select(DBVacancy.id)
+                .where(DBVacancy.id > last_id)
+                .order_by(DBVacancy.id)
+                .limit(batch_size)
+            )
+            ids = list(result.scalars().all())
+            if not ids:
+                break
+            total += await normalize_salaries(session, ids)
+            last_id = ids[-1]
+            logger.info(f"Normalized {total} salaries")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Recompute monthly RUB salaries of all vacancies")
+    argparser.add_argument("--batch-size", type=int, default=1000)
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(renormalize_all(args.batch_size))
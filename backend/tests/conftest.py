@@ -0,0 +1,84 @@
+"""Shared fixtures of the backend tests.
+
+Tests that need PostgreSQL use the `database` fixture and are skipped
+unless `TEST_DATABASE_URL` points to a disposable database, e.g.
+`postgresql+asyncpg://postgres@localhost:5432/test`. It is migrated to
+the latest revision once per run and its tables, but the seeded ones,
+are emptied before every test.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# the settings are read on import, so they are filled in before any
+# application module is imported
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+for name, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/test",
+    "JWT_KEY": "test",
+    "PROFILE_PICTURE_DIRECTORY": "/tmp",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "5",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "1",
+    "HH_CLIENT_ID": "test",
+    "HH_CLIENT_SECRET": "test",
+    "HH_ACCESS_TOKEN": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+BACKEND = Path(__file__).parent.parent
+
+# filled in by the migrations
+SEEDED_TABLES = {"CurrencyRate"}
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    """Migrate the test database to the latest revision."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(BACKEND / "alembic.ini")), "head")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def database(migrated_database):
+    """Return a runner of coroutines against the emptied test database.
+
+    `database(scenario)` opens a session, awaits `scenario(session)` in
+    a fresh event loop and returns its result.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.database.models import Base
+
+    async def run(scenario):
+        # no pooling, connections must not outlive their event loop
+        engine = create_async_engine(migrated_database, poolclass=NullPool)
+        try:
+            async with AsyncSession(
+                engine, expire_on_commit=False
+            ) as session:
+                return await scenario(session)
+        finally:
+            await engine.dispose()
+
+    async def empty(session):
+        tables = ", ".join(f'"{table}"' for table in Base.metadata.tables
+                           if table not in SEEDED_TABLES)
+        await session.execute(text(f"TRUNCATE {tables} CASCADE"))
+        await session.commit()
+
+    asyncio.run(run(empty))
+    return lambda scenario: asyncio.run(run(scenario))
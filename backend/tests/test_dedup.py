@@ -0,0 +1,75 @@
+"""Near-duplicate linking of vacancies across sources."""
+
+from sqlalchemy import insert, select
+
+from app.api.v1.models import Company, Salary, Source, Vacancy
+from app.database.crud import vacancy_listing
+from app.database.models import Source as DBSource, \
+    Vacancy as DBVacancy, VacancyListing
+from app.tasks.dedup import index_unindexed
+from app.tasks.parsing import store_vacancy
+
+DESCRIPTION = ("Доставка заказов клиентам по городу на личном автомобиле, "
+               "гибкий график работы, еженедельные выплаты и бонусы")
+
+
+def parsed(source, external_id):
+    """Return a parsed courier vacancy of *source*."""
+    return Vacancy(
+        id=-1,
+        external_id=external_id,
+        source=Source(name=source),
+        title="Курьер на личном автомобиле",
+        description=DESCRIPTION,
+        company=Company(name="ООО Ромашка"),
+        salary=Salary(),
+        employment_types=[],
+    )
+
+
+async def canonical_ids(session):
+    """Return the canonical IDs of the stored vacancies, in ID order."""
+    return (await session.scalars(
+        select(DBVacancy.canonical_id).order_by(DBVacancy.id))).all()
+
+
+def test_only_other_sources_are_duplicates(database):
+    async def scenario(session):
+        ids = []
+        for source, external_id in (("hh.ru", "1"), ("hh.ru", "2"),
+                                    ("superjob.ru", "3")):
+            ids.append((await store_vacancy(
+                session, parsed(source, external_id))).id)
+        return ids, await canonical_ids(session)
+
+    ids, linked = database(scenario)
+
+    # the templated posting on the same source stays a vacancy of its own
+    assert linked[:2] == [None, None]
+    assert linked[2] in ids[:2]
+
+
+def test_index_unindexed_vacancies(database):
+    async def scenario(session):
+        source_ids = (await session.scalars(
+            insert(DBSource).returning(DBSource.id),
+            [{"name": "hh.ru"}, {"name": "superjob.ru"}])).all()
+        ids = (await session.scalars(
+            insert(DBVacancy).returning(DBVacancy.id),
+            [{"external_id": str(i), "source_id": source_id,
+              "title": "Курьер на личном автомобиле",
+              "description": DESCRIPTION}
+             for i, source_id in enumerate(source_ids)])).all()
+        await vacancy_listing.refresh(session, ids)
+        await session.commit()
+
+        linked = await index_unindexed(session, batch_size=1)
+        listed = (await session.scalars(
+            select(VacancyListing.canonical_id)
+            .order_by(VacancyListing.id))).all()
+        return ids, linked, await canonical_ids(session), listed
+
+    ids, linked, vacancies, listed = database(scenario)
+
+    assert linked == 1
+    assert vacancies == listed == [None, ids[0]]
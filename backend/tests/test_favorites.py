@@ -0,0 +1,74 @@
+"""Liking and unliking vacancies in bulk."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.database.crud import user as crud_user
+from app.main import app
+from app.services.jwt import create_access_token
+from app.database.models import User, Vacancy, user_favorite_vacancies
+
+
+async def seed(session):
+    """Store a user and three vacancies."""
+    user_id = await session.scalar(
+        insert(User).values(email="liker@example.com").returning(User.id))
+    vacancy_ids = (await session.scalars(
+        insert(Vacancy).returning(Vacancy.id),
+        [{"external_id": str(i), "title": f"Вакансия {i}"}
+         for i in range(3)]
+    )).all()
+    await session.commit()
+    return user_id, vacancy_ids
+
+
+async def favorites(session, user_id):
+    """Return the favorite vacancy IDs of a user."""
+    return set((await session.scalars(
+        select(user_favorite_vacancies.c.vacancy_id)
+        .where(user_favorite_vacancies.c.user_id == user_id)
+    )).all())
+
+
+def test_like_and_unlike_together(database):
+    async def scenario(session):
+        user_id, (first, second, third) = await seed(session)
+        found = await crud_user.update_favorite_vacancies(
+            session, user_id, like=[first, second, -1])
+        assert found == {first, second}
+
+        found = await crud_user.update_favorite_vacancies(
+            session, user_id, like=[second, third], unlike=[first])
+        assert found == {second, third}
+        return await favorites(session, user_id), (second, third)
+
+    liked, expected = database(scenario)
+    assert liked == set(expected)
+
+
+def test_favorites_of_missing_vacancies_are_not_counted(database):
+    async def scenario(session):
+        user_id, vacancy_ids = await seed(session)
+        await crud_user.update_favorite_vacancies(
+            session, user_id, like=vacancy_ids)
+        # the favorites of archived vacancies stay behind
+        await session.execute(insert(user_favorite_vacancies).values(
+            user_id=user_id, vacancy_id=max(vacancy_ids) + 1000))
+        await session.commit()
+        count, vacancies, _ = await crud_user.get_favorite_vacancies(
+            session, user_id, limit=2)
+        return count, len(vacancies)
+
+    assert database(scenario) == (3, 2)
+
+
+def test_like_and_unlike_of_the_same_id_is_rejected():
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/update_liked_vacancies",
+        json={"like": [1, 2], "unlike": [2, 3]},
+        headers={"Authorization": f"Bearer {create_access_token(1)}"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+"""Conversion of HH search pages."""
+
+import asyncio
+
+import pytest
+
+from app.services.datasources.base import ParserConfig
+from app.services.datasources.HHru import HHVacancyParser
+
+
+def page(*ids):
+    """Return search items with the given IDs."""
+    return [{"id": str(i), "name": "Курьер"} for i in ids]
+
+
+def convert(parser, vacancies, events):
+    """Convert a page, recording detail fetches and yields in order."""
+    async def fetch(raw_data):
+        events.append(f"fetch {raw_data['id']}")
+        return {"description": "Доставка заказов"}
+
+    parser._fetch_full_vacancy = fetch
+
+    async def run():
+        async for vacancy in parser._convert_page(vacancies, float("inf")):
+            events.append(f"yield {vacancy.external_id}")
+
+    asyncio.run(run())
+
+
+def test_details_stream_vacancy_by_vacancy(tmp_path):
+    events = []
+    convert(HHVacancyParser(ParserConfig(output_directory=str(tmp_path))),
+            page(1, 2), events)
+
+    assert events == ["fetch 1", "yield 1", "fetch 2", "yield 2"]
+
+
+def test_conversion_failure_fails_the_search(tmp_path):
+    parser = HHVacancyParser(ParserConfig(output_directory=str(tmp_path)),
+                             fetch_details=False)
+
+    with pytest.raises(ValueError, match="Failed to convert"):
+        convert(parser, [{"id": "not a number"}], [])
@@ -0,0 +1,38 @@
+"""Validation of page requests and cursors."""
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from app.api.v1.models import View
+from app.database.crud import SORT_PUBLISHED, SORT_RANK, keyset_page
+from app.database.models import Vacancy, published_sort_key
+
+
+@pytest.mark.parametrize("mode, sort_key, after", [
+    (SORT_PUBLISHED, published_sort_key(Vacancy.published_at),
+     [SORT_PUBLISHED, 1700000000, 5]),
+    (SORT_PUBLISHED, published_sort_key(Vacancy.published_at),
+     [SORT_PUBLISHED, "yesterday", 5]),
+    (SORT_PUBLISHED, published_sort_key(Vacancy.published_at),
+     [SORT_PUBLISHED, "2025-01-01T00:00:00+00:00", "5"]),
+    (SORT_RANK, func.random(), [SORT_RANK, {"rank": 1}, 5]),
+    (SORT_RANK, func.random(), [SORT_PUBLISHED, 0.5, 5]),
+])
+def test_tampered_cursor_is_rejected(mode, sort_key, after):
+    with pytest.raises(ValueError):
+        keyset_page(select(Vacancy), mode, sort_key, Vacancy.id, after,
+                    0, 20)
+
+
+def test_valid_cursor_is_accepted():
+    keyset_page(select(Vacancy), SORT_PUBLISHED,
+                published_sort_key(Vacancy.published_at), Vacancy.id,
+                [SORT_PUBLISHED, "2025-01-01T00:00:00+00:00", 5], 0, 20)
+
+
+@pytest.mark.parametrize("fields", [{"count": 0}, {"count": 20,
+                                                   "offset": -1}])
+def test_empty_or_negative_view_is_rejected(fields):
+    with pytest.raises(ValidationError):
+        View(**fields)
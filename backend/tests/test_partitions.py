@@ -0,0 +1,101 @@
+"""Maintenance of the monthly vacancy partitions."""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert, select, text
+
+from app.database.crud import vacancy_listing
+from app.database.models import Vacancy, VacancyListing, VacancySignature
+from app.tasks.partitions import ARCHIVE_SCHEMA, archive_partition, \
+    create_partition, partition_name
+
+
+def at(month: date) -> datetime:
+    """Return the middle of *month* in UTC."""
+    return datetime(month.year, month.month, 15, tzinfo=timezone.utc)
+
+
+async def partition_of(session, vacancy_id):
+    """Return the name of the partition holding a vacancy."""
+    return await session.scalar(
+        select(text("tableoid::regclass::text")).select_from(Vacancy)
+        .where(Vacancy.id == vacancy_id))
+
+
+def test_create_partition_moves_rows_out_of_default(database):
+    month = date(2199, 1, 1)
+    name = partition_name(month)
+
+    async def scenario(session):
+        vacancy_id = await session.scalar(
+            insert(Vacancy).values(external_id="1", title="Курьер",
+                                   published_at=at(month))
+            .returning(Vacancy.id))
+        session.add(VacancySignature(vacancy_id=vacancy_id, signature=b"x"))
+        await session.commit()
+        before = await partition_of(session, vacancy_id)
+        try:
+            await create_partition(session, month)
+            await session.commit()
+            return before, await partition_of(session, vacancy_id), \
+                await session.scalar(
+                    select(VacancySignature.vacancy_id)
+                    .where(VacancySignature.vacancy_id == vacancy_id))
+        finally:
+            await session.rollback()
+            await session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            await session.commit()
+
+    before, after, signature = database(scenario)
+
+    assert before == '"Vacancy_default"'
+    assert after.strip('"') == name
+    # moving rows between partitions is not a deletion
+    assert signature is not None
+
+
+def test_archive_partition_drops_dependent_rows(database):
+    month = date(1999, 1, 1)
+    name = partition_name(month)
+
+    async def scenario(session):
+        await create_partition(session, month)
+        old_id, new_id = (await session.scalars(
+            insert(Vacancy).returning(Vacancy.id),
+            [{"external_id": "old", "title": "Курьер",
+              "published_at": at(month)},
+             {"external_id": "new", "title": "Курьер",
+              "published_at": datetime.now(timezone.utc)}]
+        )).all()
+        await session.execute(
+            Vacancy.__table__.update().where(Vacancy.id == new_id)
+            .values(canonical_id=old_id))
+        session.add(VacancySignature(vacancy_id=old_id, signature=b"x"))
+        await vacancy_listing.refresh(session, [old_id, new_id])
+        await session.commit()
+        try:
+            await archive_partition(session, month)
+            await session.commit()
+            return (
+                await session.scalar(
+                    select(Vacancy.canonical_id)
+                    .where(Vacancy.id == new_id)),
+                await session.scalar(
+                    select(VacancySignature.vacancy_id)
+                    .where(VacancySignature.vacancy_id == old_id)),
+                await session.scalar(
+                    select(VacancyListing.id)
+                    .where(VacancyListing.id == old_id)),
+                await session.scalar(text(
+                    f'SELECT count(*) FROM {ARCHIVE_SCHEMA}."{name}"')),
+            )
+        finally:
+            await session.rollback()
+            await session.execute(text(
+                f'DROP TABLE IF EXISTS {ARCHIVE_SCHEMA}."{name}"'))
+            await session.commit()
+
+    canonical_id, signature, listed, archived = database(scenario)
+
+    assert (canonical_id, signature, listed) == (None, None, None)
+    assert archived == 1
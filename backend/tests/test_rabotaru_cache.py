@@ -0,0 +1,25 @@
+"""Reading the rabota.ru page cache."""
+
+from app.services.datasources.rabotaru.cache import HtmlCache
+
+URL = "https://www.rabota.ru/vacancy/12345/"
+
+
+def test_round_trip(tmp_path):
+    cache = HtmlCache(tmp_path)
+
+    cache.put(URL, "<html>страница</html>")
+
+    assert cache.get(URL) == "<html>страница</html>"
+    assert cache.hits == 1
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = HtmlCache(tmp_path)
+    cache.put(URL, "<html></html>")
+    path = cache._path(URL)
+    header, body = path.read_bytes().split(b"\n", 1)
+    path.write_bytes(header + b"\n" + body[:4] + b"garbage")
+
+    assert cache.get(URL) is None
+    assert cache.misses == 1
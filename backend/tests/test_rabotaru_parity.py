@@ -0,0 +1,44 @@
+"""The lxml and BeautifulSoup rabota.ru extractors must agree."""
+
+from dataclasses import fields
+from pathlib import Path
+
+import pytest
+
+from app.services.datasources.rabotaru.parser import (
+    VacancyDetails,
+    _extract_details_lxml,
+    _extract_details_soup,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "rabotaru"
+PAGES = sorted(FIXTURES.glob("*.html"))
+
+
+@pytest.mark.parametrize("page", PAGES, ids=lambda page: page.stem)
+@pytest.mark.parametrize("field", [f.name for f in fields(VacancyDetails)])
+def test_lxml_matches_soup(page, field):
+    html = page.read_text(encoding="utf-8")
+
+    lxml_details = _extract_details_lxml(html)
+    soup_details = _extract_details_soup(html)
+
+    assert getattr(lxml_details, field) == getattr(soup_details, field)
+
+
+def test_full_page_fields():
+    html = (FIXTURES / "full_page.html").read_text(encoding="utf-8")
+
+    details = _extract_details_lxml(html)
+
+    assert details.title == "Python-разработчик"
+    assert details.region == "Москва"
+    assert details.company == "ООО Ромашка"
+    assert details.time_stamp == "2025-09-12T10:15:00+03:00"
+    assert details.employment == "полный день"
+    assert details.experience == " опыт работы от 3 лет"
+    assert details.education == " образование высшее"
+    assert "- Разработка сервисов наFastAPI;" in details.description
+    assert "### Необходимые навыки:\n- Python\n" in details.description
+    # BeautifulSoup counts the comment as the first string of the address
+    assert details.description.endswith("\n\noffice")
@@ -0,0 +1,58 @@
+"""Recording and replaying datasource HTTP responses."""
+
+import asyncio
+from datetime import datetime
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.api.v1.models import VacancyFilter
+from app.services.datasources import HHru
+from app.services.datasources.base import ParserConfig
+from app.services.datasources.HHru import HHVacancyParser
+
+NO_FILTERS = VacancyFilter(
+    title=None, salary_min=None, salary_max=None, experience_categories=[],
+    location=None, date_published_from=None, date_published_to=None)
+
+
+class NextYear(datetime):
+    """A clock a year after the recording."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz).replace(year=datetime.now().year + 1)
+
+
+async def search(mode, archive, base_url):
+    """Return the external IDs found by an HH search with no filters."""
+    parser = HHVacancyParser(
+        ParserConfig(output_directory=str(archive.parent), http_mode=mode,
+                     http_archive=str(archive)),
+        fetch_details=False)
+    parser.BASE_URL = base_url
+    async with parser:
+        return [vacancy.external_id
+                async for vacancy in parser.search_vacancies(NO_FILTERS)]
+
+
+def test_replay_with_default_dates(tmp_path, monkeypatch):
+    archive = tmp_path / "hh.responses.ndjson.gz"
+
+    async def vacancies(request):
+        return web.json_response(
+            {"found": 1, "items": [{"id": "1", "name": "Курьер"}]})
+
+    async def record():
+        app = web.Application()
+        app.router.add_get("/vacancies", vacancies)
+        async with TestServer(app) as server:
+            base_url = str(server.make_url("")).rstrip("/")
+            return base_url, await search("record", archive, base_url)
+
+    base_url, recorded = asyncio.run(record())
+    # the default window of the replay run would start a year later
+    monkeypatch.setattr(HHru, "datetime", NextYear)
+    replayed = asyncio.run(search("replay", archive, base_url))
+
+    assert recorded == replayed == ["1"]
@@ -0,0 +1,20 @@
+"""Routing of read sessions to replicas."""
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.database import ROUND_ROBIN, ReplicaRouter
+
+
+def test_round_robin_cycles_through_replicas():
+    engines = [create_async_engine(f"postgresql+asyncpg://replica{i}/db")
+               for i in range(2)]
+    router = ReplicaRouter(engines, ROUND_ROBIN)
+
+    assert [router.choose() for _ in range(3)] == [
+        engines[0], engines[1], engines[0]]
+
+
+def test_router_needs_a_replica():
+    with pytest.raises(ValueError):
+        ReplicaRouter([], ROUND_ROBIN)
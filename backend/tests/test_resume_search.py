@@ -0,0 +1,22 @@
+"""Resume search filters."""
+
+from sqlalchemy import insert
+
+from app.database.crud import resume as crud_resume
+from app.database.models import Resume
+
+
+def test_salary_filter_excludes_resumes_without_salary(database):
+    async def scenario(session):
+        await session.execute(insert(Resume), [
+            {"external_id": "1", "title": "Курьер", "salary_value": 80000},
+            {"external_id": "2", "title": "Курьер", "salary_value": None},
+        ])
+        await session.commit()
+        results = []
+        for bounds in ({"min_salary": 50000}, {"max_salary": 100000}):
+            _, resumes, _ = await crud_resume.search(session, **bounds)
+            results.append([resume.external_id for resume in resumes])
+        return results
+
+    assert database(scenario) == [["1"], ["1"]]
@@ -0,0 +1,26 @@
+"""Conversion of salaries to roubles per month."""
+
+from decimal import Decimal
+
+from app.services.salary import monthly_rub_batch
+
+RATES = {"RUB": Decimal(1), "USD": Decimal(90)}
+
+
+def test_monthly_rub_batch():
+    rows = [
+        ("hh.ru", 100000, "RUR", None, 80000, 120000),
+        ("hh.ru", 1000, "USD", "week", None, None),
+        # fixed point, yearly
+        ("rabota.ru", 12000000, "RUB", "year", None, None),
+        ("superjob.ru", 0, "rub", None, 0, 0),
+        ("hh.ru", 100000, "XXX", None, None, None),
+    ]
+
+    assert monthly_rub_batch(rows, RATES) == [
+        (Decimal("100000.00"), Decimal("80000.00"), Decimal("120000.00")),
+        (Decimal("391050.00"), None, None),
+        (Decimal("10000.00"), None, None),
+        (None, None, None),
+        (None, None, None),
+    ]
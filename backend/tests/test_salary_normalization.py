@@ -0,0 +1,55 @@
+"""Salary normalization of stored vacancies."""
+
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import Range
+
+from app.database.models import Vacancy, VacancyListing
+from app.tasks.salary import normalize_salaries
+
+
+def test_normalize_salaries(database):
+    async def scenario(session):
+        ids = (await session.scalars(
+            insert(Vacancy).returning(Vacancy.id),
+            [
+                {"external_id": "1", "title": "Курьер",
+                 "salary_currency": "RUR", "salary_value": 100000},
+                {"external_id": "2", "title": "Повар",
+                 "salary_currency": "RUR", "salary_period": "year",
+                 "salary_from": 120000, "salary_to": 240000},
+                # the source swapped the bounds
+                {"external_id": "3", "title": "Сварщик",
+                 "salary_currency": "RUR", "salary_from": 90000,
+                 "salary_to": 60000},
+                # 0 stands for a missing salary
+                {"external_id": "4", "title": "Грузчик",
+                 "salary_currency": "RUR", "salary_value": 0,
+                 "salary_from": 0, "salary_to": 0},
+            ]
+        )).all()
+        await session.commit()
+
+        assert await normalize_salaries(session, ids) == 4
+
+        vacancies = (await session.execute(
+            select(Vacancy.salary_monthly_rub, Vacancy.salary_range)
+            .where(Vacancy.id.in_(ids)).order_by(Vacancy.id)
+        )).all()
+        listed = (await session.scalars(
+            select(VacancyListing.salary_range)
+            .where(VacancyListing.id.in_(ids)).order_by(VacancyListing.id)
+        )).all()
+        return vacancies, listed
+
+    vacancies, listed = database(scenario)
+
+    assert vacancies == [
+        (Decimal("100000.00"),
+         Range(Decimal("100000.00"), Decimal("100000.00"), bounds="[]")),
+        (None, Range(Decimal("10000.00"), Decimal("20000.00"), bounds="[]")),
+        (None, Range(Decimal("60000.00"), Decimal("90000.00"), bounds="[]")),
+        (None, None),
+    ]
+    assert listed == [salary_range for _, salary_range in vacancies]
@@ -0,0 +1,102 @@
+"""The vacancy search filters are served by their indexes."""
+
+import json
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects.postgresql import Range
+
+from app.database.crud import Explain, vacancy_conditions
+from app.database.models import ExperienceCategory, Location, Vacancy
+
+TITLES = ["Python-разработчик", "Курьер", "Бухгалтер", "Водитель",
+          "Менеджер по продажам", "Инженер-конструктор"]
+
+
+async def seed(session):
+    """Store a few thousand vacancies spread over the filter values."""
+    locations = (await session.scalars(
+        insert(Location).returning(Location.id),
+        [{"region": f"Регион {i}"} for i in range(50)]
+    )).all()
+    categories = (await session.scalars(
+        insert(ExperienceCategory).returning(ExperienceCategory.id),
+        [{"name": f"Опыт {i}"} for i in range(4)]
+    )).all()
+    await session.execute(insert(Vacancy), [
+        {
+            "external_id": str(i),
+            "title": f"{TITLES[i % len(TITLES)]} {i}",
+            "description": f"Описание вакансии номер {i}",
+            "location_id": locations[i % len(locations)],
+            "experience_category_id": categories[i % len(categories)],
+            "salary_monthly_rub": 20000 + i * 10,
+            "salary_range": Range(20000 + i * 10, 40000 + i * 10,
+                                  bounds="[]"),
+        }
+        for i in range(5000)
+    ])
+    await session.execute(text('ANALYZE "Vacancy"'))
+    await session.commit()
+    return locations, categories
+
+
+def index_scans(plan):
+    """Yield the index names of the index scan nodes of a plan."""
+    if plan["Node Type"] in ("Index Scan", "Index Only Scan",
+                             "Bitmap Index Scan"):
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from index_scans(child)
+
+
+async def scanned_indexes(session, index, **filters):
+    """Return the plan's scanned indexes that belong to *index*.
+
+    The partitions have their own copies of the indexes of `Vacancy`,
+    attached to the parent index.
+    """
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    statement = select(Vacancy.id).where(
+        *await vacancy_conditions(session, Vacancy, **filters))
+    plan = (await session.execute(Explain(statement))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    family = set((await session.scalars(
+        text("SELECT i.inhrelid::regclass::text FROM pg_inherits i "
+             "WHERE i.inhparent = CAST(:index AS regclass)"),
+        {"index": f'"{index}"'}
+    )).all())
+    family.add(index)
+    scanned = set(index_scans(plan[0]["Plan"]))
+    await session.rollback()
+    return {name.strip('"') for name in scanned} & {
+        name.strip('"') for name in family}
+
+
+@pytest.mark.parametrize("index, filters", [
+    ("ix_Vacancy_location_id_experience_category_id",
+     lambda locations, categories: {
+         "location_id": locations[3],
+         "experience_category_ids": [categories[1]],
+     }),
+    ("ix_Vacancy_experience_category_id",
+     lambda locations, categories: {
+         "experience_category_ids": [categories[2]],
+     }),
+    ("ix_Vacancy_title_trgm",
+     lambda locations, categories: {"title": "конструктор"}),
+    ("ix_Vacancy_salary_range",
+     lambda locations, categories: {
+         "min_salary": 60000, "max_salary": 61000,
+     }),
+    ("ix_Vacancy_search_vector",
+     lambda locations, categories: {"query": "бухгалтер"}),
+])
+def test_filter_uses_index(database, index, filters):
+    async def scenario(session):
+        locations, categories = await seed(session)
+        return await scanned_indexes(
+            session, index, **filters(locations, categories))
+
+    assert database(scenario)
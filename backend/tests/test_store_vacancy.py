@@ -0,0 +1,106 @@
+"""Storing parsed vacancies."""
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.api.v1.models import Salary, Source, TimeStamp, Vacancy
+from app.database.models import Vacancy as DBVacancy, VacancyKey, \
+    VacancyListing
+from app.tasks import parsing
+from app.tasks.parsing import store_vacancy
+
+
+def parsed(published_at=None):
+    """Return a parsed vacancy, published at *published_at* if given."""
+    return Vacancy(
+        id=-1,
+        external_id="123456",
+        source=Source(name="hh.ru"),
+        title="Python-разработчик",
+        description="Разработка backend-сервисов на Python и PostgreSQL",
+        salary=Salary(currency="RUR", value=150000),
+        employment_types=[],
+        published_at=(TimeStamp(time_stamp=published_at)
+                      if published_at else None),
+    )
+
+
+async def stored(session):
+    """Return the stored vacancies as (ID, publication time)."""
+    return (await session.execute(
+        select(DBVacancy.id, DBVacancy.published_at)
+    )).all()
+
+
+def test_vacancy_without_date_is_stored_once(database):
+    async def scenario(session):
+        created = await store_vacancy(session, parsed())
+        again = await store_vacancy(session, parsed())
+        first_seen_at = await session.scalar(
+            select(VacancyKey.first_seen_at)
+            .where(VacancyKey.vacancy_id == created.id))
+        return created.id, again, await stored(session), first_seen_at
+
+    vacancy_id, again, rows, first_seen_at = database(scenario)
+
+    assert again is None
+    # filed under the time the vacancy was first seen
+    assert rows == [(vacancy_id, first_seen_at)]
+
+
+def test_republished_vacancy_is_stored_once(database):
+    async def scenario(session):
+        await store_vacancy(session, parsed("2025-01-10T10:00:00+0300"))
+        again = await store_vacancy(
+            session, parsed("2025-03-02T09:00:00+0300"))
+        return again, await stored(session)
+
+    again, rows = database(scenario)
+
+    assert again is None
+    assert len(rows) == 1
+
+
+def test_vacancy_is_stored_with_its_listing_row(database):
+    async def scenario(session):
+        vacancy_id = (await store_vacancy(
+            session, parsed(), backfill=True)).id
+        # nothing is left uncommitted
+        await session.rollback()
+        return vacancy_id, await session.scalar(
+            select(VacancyListing.id).where(VacancyListing.id == vacancy_id))
+
+    vacancy_id, listing_id = database(scenario)
+
+    assert listing_id == vacancy_id
+
+
+def test_failed_store_leaves_no_rows(database, monkeypatch):
+    async def fail(*args):
+        raise RuntimeError("listing refresh failed")
+
+    monkeypatch.setattr(parsing.crud_vacancy_listing, "refresh", fail)
+
+    async def scenario(session):
+        with pytest.raises(RuntimeError):
+            await store_vacancy(session, parsed())
+        await session.rollback()
+        counts = []
+        for model in (DBVacancy, VacancyKey, VacancyListing):
+            counts.append(await session.scalar(
+                select(func.count()).select_from(model)))
+        return counts
+
+    assert database(scenario) == [0, 0, 0]
+
+
+def test_direct_insert_cannot_reuse_a_key(database):
+    async def scenario(session):
+        created = await store_vacancy(session, parsed())
+        await session.execute(insert(DBVacancy).values(
+            external_id="123456", source_id=created.source_id,
+            title="Копия", published_at=func.now()))
+
+    with pytest.raises(IntegrityError):
+        database(scenario)
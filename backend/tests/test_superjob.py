@@ -0,0 +1,39 @@
+"""Conversion of SuperJob API vacancies."""
+
+import pytest
+
+from app.services.datasources.SuperJob import convert_superjob_vacancy
+
+
+def superjob_vacancy(payment_from, payment_to):
+    """Return a SuperJob API vacancy object with the given payment."""
+    return {
+        "id": 1,
+        "id_client": 100,
+        "link": "https://www.superjob.ru/vakansii/kurer-1.html",
+        "profession": "Курьер",
+        "vacancyRichText": "<p>Доставка заказов</p>",
+        "client": {"title": "ООО Ромашка"},
+        "currency": "rub",
+        "payment_from": payment_from,
+        "payment_to": payment_to,
+        "experience": {"title": "Без опыта"},
+        "town": {"title": "Москва"},
+        "type_of_work": {"title": "Полный рабочий день"},
+        "date_published": "1700000000",
+        "phone": None,
+    }
+
+
+@pytest.mark.parametrize("payment_from, payment_to, expected", [
+    # 0 is SuperJob's "not set"
+    (0, 0, (None, None, None)),
+    (50000, 0, (50000, 50000, None)),
+    (0, 70000, (70000, None, 70000)),
+    (50000, 70000, (60000, 50000, 70000)),
+])
+def test_salary(payment_from, payment_to, expected):
+    salary = convert_superjob_vacancy(
+        superjob_vacancy(payment_from, payment_to)).salary
+
+    assert (salary.value, salary.value_from, salary.value_to) == expected
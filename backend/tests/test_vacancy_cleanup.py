@@ -0,0 +1,79 @@
+"""Rows keyed by a vacancy are removed with it."""
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.database.models import BackfillTask, EmploymentType, User, \
+    Vacancy, VacancyKey, VacancyListing, VacancyLshBand, VacancySignature, \
+    user_favorite_vacancies, vacancy_employment_type
+from app.database.crud import vacancy_listing
+
+
+def test_deleting_a_vacancy_removes_its_rows(database):
+    async def scenario(session):
+        vacancy_id, duplicate_id = (await session.scalars(
+            insert(Vacancy).returning(Vacancy.id),
+            [{"external_id": "1", "title": "Курьер"},
+             {"external_id": "2", "title": "Курьер"}]
+        )).all()
+        await session.execute(
+            update(Vacancy).where(Vacancy.id == duplicate_id)
+            .values(canonical_id=vacancy_id))
+        employment_type_id = await session.scalar(
+            insert(EmploymentType).values(name="Полная занятость")
+            .returning(EmploymentType.id))
+        user_id = await session.scalar(
+            insert(User).values(email="cleanup@example.com")
+            .returning(User.id))
+        session.add_all([
+            VacancySignature(vacancy_id=vacancy_id, signature=b"x"),
+            VacancyLshBand(band=0, bucket=1, vacancy_id=vacancy_id),
+            BackfillTask(vacancy_id=vacancy_id),
+        ])
+        await session.execute(insert(vacancy_employment_type).values(
+            vacancy_id=vacancy_id, employment_type_id=employment_type_id))
+        await session.execute(insert(user_favorite_vacancies).values(
+            user_id=user_id, vacancy_id=vacancy_id))
+        await vacancy_listing.refresh(session, [vacancy_id, duplicate_id])
+        await session.commit()
+
+        await session.execute(delete(Vacancy).where(Vacancy.id == vacancy_id))
+        await session.commit()
+
+        left = {}
+        for key in (VacancySignature.vacancy_id, VacancyLshBand.vacancy_id,
+                    BackfillTask.vacancy_id, VacancyKey.vacancy_id,
+                    VacancyListing.id, vacancy_employment_type.c.vacancy_id,
+                    user_favorite_vacancies.c.vacancy_id):
+            left[str(key)] = await session.scalar(
+                select(func.count()).where(key == vacancy_id))
+        canonical_ids = (await session.execute(
+            select(Vacancy.canonical_id, VacancyListing.canonical_id)
+            .join(VacancyListing, VacancyListing.id == Vacancy.id)
+            .where(Vacancy.id == duplicate_id)
+        )).one()
+        return left, tuple(canonical_ids)
+
+    left, canonical_ids = database(scenario)
+
+    assert left == dict.fromkeys(left, 0)
+    assert canonical_ids == (None, None)
+
+
+def test_moving_a_vacancy_keeps_its_rows(database):
+    async def scenario(session):
+        vacancy_id = await session.scalar(
+            insert(Vacancy).values(external_id="1", title="Курьер")
+            .returning(Vacancy.id))
+        session.add(VacancySignature(vacancy_id=vacancy_id, signature=b"x"))
+        await session.commit()
+
+        # an older publication time moves the row to another partition
+        await session.execute(
+            update(Vacancy).where(Vacancy.id == vacancy_id)
+            .values(published_at=func.now() - func.make_interval(0, 2)))
+        await session.commit()
+        return await session.scalar(
+            select(func.count()).where(
+                VacancySignature.vacancy_id == vacancy_id))
+
+    assert database(scenario) == 1